@@ -0,0 +1,106 @@
+"""
+Fixed-timestep game loop with render interpolation.
+
+Generated games move things per frame (``self.x += self.vx``) or by the
+frame's measured ``dt``. Either way, the simulation depends on the frame rate:
+a slow frame changes collisions, and a headless run cannot be sped up without
+changing the outcome. ``FixedStepLoop`` separates simulation from rendering:
+
+- frame time goes into an accumulator, and ``update(dt)`` runs once per whole
+  fixed step in it, always with the same ``dt``. At most ``max_steps`` run per
+  frame; older time is dropped, so a long stall cannot spiral;
+- ``render(alpha)`` runs once per frame. ``alpha`` is the fraction of a step
+  left in the accumulator, for drawing moving objects at
+  ``lerp(previous, current, alpha)`` instead of snapping to the last step;
+- in uncapped mode every frame runs exactly one step with ``alpha`` 1.0,
+  whatever time the clock reports. A session is then a pure function of its
+  inputs per frame, and with an uncapped clock it runs as fast as the
+  machine allows. The headless harness turns this on for every game it runs
+  by setting ``UNCAPPED_ENV``, and its clock skips the frame-rate wait.
+
+``stats()`` reports steps, frames and the simulation time dropped by the
+``max_steps`` clamp.
+"""
+import os
+from typing import Any, Callable, Dict, Optional
+
+import pygame
+
+
+DEFAULT_STEP_HZ = 60
+DEFAULT_MAX_STEPS = 5
+# Set to "1" by headless.run_headless: one fixed step per frame
+UNCAPPED_ENV = "GAMEKIT_UNCAPPED"
+# Absorbs float error so 60 frames of 1/60 s make exactly 60 steps
+_EPSILON = 1e-9
+
+
+def uncapped_from_env() -> bool:
+    return os.environ.get(UNCAPPED_ENV, "") not in ("", "0")
+
+
+def lerp(previous: float, current: float, alpha: float) -> float:
+    """Value between the last two simulation steps, for drawing."""
+    return previous + (current - previous) * alpha
+
+
+class FixedStepLoop:
+    """Runs ``update(dt)`` at ``step_hz`` and ``render(alpha)`` once per frame, at up to ``fps`` frames a second.
+
+    ``uncapped`` defaults to the ``GAMEKIT_UNCAPPED`` environment variable.
+    """
+
+    def __init__(self, step_hz: float = DEFAULT_STEP_HZ, fps: float = DEFAULT_STEP_HZ,
+                 max_steps: int = DEFAULT_MAX_STEPS, uncapped: Optional[bool] = None):
+        self.dt = 1.0 / step_hz
+        self.fps = fps
+        self.max_steps = max(1, max_steps)
+        self.uncapped = uncapped_from_env() if uncapped is None else uncapped
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        self.steps = 0
+        self.frames = 0
+        self.dropped = 0.0
+        self.running = True
+
+    def advance(self, frame_seconds: float) -> int:
+        """Add a frame's time to the accumulator; returns how many steps are due."""
+        if self.uncapped:
+            self.alpha = 1.0
+            return 1
+        self.accumulator += frame_seconds
+        steps = int((self.accumulator + _EPSILON) // self.dt)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.dropped += self.accumulator - steps * self.dt
+            self.accumulator = steps * self.dt
+        self.accumulator = max(0.0, self.accumulator - steps * self.dt)
+        self.alpha = min(1.0, self.accumulator / self.dt)
+        return steps
+
+    def tick(self, clock: Any, update: Callable[[float], Any]) -> float:
+        """One frame: wait for the frame cap, run the due steps; returns ``alpha`` for rendering."""
+        # The cap goes to the clock even when uncapped: the headless harness reads it for replay timing
+        milliseconds = clock.tick(self.fps)
+        for _ in range(self.advance(milliseconds / 1000.0)):
+            update(self.dt)
+            self.steps += 1
+        self.frames += 1
+        return self.alpha
+
+    def run(self, update: Callable[[float], Any], render: Callable[[float], Any],
+            handle_events: Optional[Callable[[], Any]] = None, clock: Optional[Any] = None) -> None:
+        """Loop until ``stop()`` is called (or an exception, e.g. ``SystemExit``, leaves it)."""
+        clock = clock if clock is not None else pygame.time.Clock()
+        while self.running:
+            if handle_events is not None:
+                handle_events()
+            render(self.tick(clock, update))
+
+    def stop(self) -> None:
+        self.running = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"step_hz": round(1.0 / self.dt, 3), "uncapped": self.uncapped, "steps": self.steps,
+                "frames": self.frames, "dropped_s": round(self.dropped, 4),
+                "steps_per_frame": round(self.steps / self.frames, 3) if self.frames else None}
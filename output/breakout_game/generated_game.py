@@ -2,6 +2,8 @@ import pygame
 import sys
 import random
 
+from gamekit.loop import FixedStepLoop, lerp
+
 # Game Configuration Constants
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
@@ -19,6 +21,7 @@ MAX_LIVES = 3
 POWERUP_WIDTH = 30
 POWERUP_HEIGHT = 20
 FPS = 60
+STEP_HZ = 60  # Simulation steps per second; speeds below are per step
 
 # Colors
 WHITE = (255, 255, 255)
@@ -81,12 +84,14 @@ class Ball:
         self.vx = random.choice([-self.speed, self.speed])
         self.vy = -self.speed
         self.launched = False
+        self.prev_x, self.prev_y = self.x, self.y
 
     def launch(self):
         self.launched = True
 
     def update(self, paddle, bricks, powerups, score):
         try:
+            self.prev_x, self.prev_y = self.x, self.y
             if not self.launched:
                 self.x = paddle.x + paddle.width // 2
                 self.y = paddle.y - self.radius - 1
@@ -146,9 +151,11 @@ class Ball:
     def off_screen(self):
         return self.y - self.radius > SCREEN_HEIGHT
 
-    def draw(self, surface):
-        pygame.draw.circle(surface, BLUE, (int(self.x), int(self.y)), self.radius)
-        pygame.draw.circle(surface, WHITE, (int(self.x), int(self.y)), self.radius, 2)
+    def draw(self, surface, alpha=1.0):
+        # Drawn between the last two simulation steps, so motion stays smooth when frames and steps drift apart
+        center = (int(lerp(self.prev_x, self.x, alpha)), int(lerp(self.prev_y, self.y, alpha)))
+        pygame.draw.circle(surface, BLUE, center, self.radius)
+        pygame.draw.circle(surface, WHITE, center, self.radius, 2)
 
 
 class Brick:
@@ -256,6 +263,7 @@ class Game:
         self.start_level(self.level_number)
         self.left_pressed = False
         self.right_pressed = False
+        self.loop = FixedStepLoop(STEP_HZ, fps=FPS)
 
     def load_highscore(self):
         try:
@@ -369,11 +377,15 @@ class Game:
         instr_surf = self.font.render("←/→ or Mouse to move. SPACE/MOUSE to launch ball.", True, GRAY)
         self.screen.blit(instr_surf, (SCREEN_WIDTH // 2 - instr_surf.get_width() // 2, SCREEN_HEIGHT - 38))
 
-    def draw(self):
+    def step(self, dt):
+        if not self.game_over and not self.level.is_cleared():
+            self.update()
+
+    def draw(self, alpha=1.0):
         self.screen.fill(BLACK)
         self.level.draw(self.screen)
         self.paddle.draw(self.screen)
-        self.ball.draw(self.screen)
+        self.ball.draw(self.screen, alpha)
         for powerup in self.powerups:
             powerup.draw(self.screen)
         self.draw_hud()
@@ -389,12 +401,8 @@ class Game:
 
     def run(self):
         try:
-            while True:
-                self.clock.tick(FPS)
-                self.handle_events()
-                if not self.game_over and not self.level.is_cleared():
-                    self.update()
-                self.draw()
+            # Fixed simulation steps, rendered once per frame with interpolation
+            self.loop.run(self.step, self.draw, self.handle_events, clock=self.clock)
         except Exception:
             pygame.quit()
             sys.exit()
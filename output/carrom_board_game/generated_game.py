@@ -4,6 +4,8 @@ import math
 import random
 import logging
 
+from gamekit.physics import DiscWorld
+
 # Constants and color palette
 SCREEN_WIDTH = 1000
 SCREEN_HEIGHT = 800
@@ -20,8 +22,10 @@ STRIKER_MIN_POWER = 6.0
 STRIKER_POWER_STEP = 1.5
 
 FRICTION = 0.992
+FRICTION_PER_UNIT = FRICTION ** (20 * FPS / 1000)  # Physics dt is in 20 ms units; FRICTION is per 60 FPS frame
 ELASTICITY = 0.97
 COIN_MIN_SPEED = 0.08
+COIN_SLEEP_FRAMES = 3  # Frames below COIN_MIN_SPEED before a coin stops being simulated
 
 MAX_PLAYERS = 4
 WHITE_COIN_COUNT = 9
@@ -203,91 +207,47 @@ class Board:
 class PhysicsEngine:
     def __init__(self, board):
         self.board = board
+        self.bodies = []
+        self.world = DiscWorld(WHITE_COIN_COUNT + BLACK_COIN_COUNT + 2,
+                               bounds=(board.left, board.top, board.right, board.bottom),
+                               friction=FRICTION_PER_UNIT, wall_restitution=ELASTICITY, wall_damping=ELASTICITY,
+                               min_speed=COIN_MIN_SPEED, sleep_frames=COIN_SLEEP_FRAMES)
+        self.sync_bodies()
+    def sync_bodies(self):
+        # Rebuild the world from the board; only needed when coins are pocketed or the striker is replaced or reset
+        self.bodies = [c for c in self.board.coins if not c.is_pocketed]
+        if self.board.striker and not self.board.striker.is_pocketed:
+            self.bodies.append(self.board.striker)
+        self.world.clear()
+        for body in self.bodies:
+            self.world.add(body.position, body.radius, velocity=body.velocity,
+                           asleep=not (body.velocity[0] or body.velocity[1]))
+    def launch(self, body):
+        # The one velocity the game sets itself: the striker's shot
+        i = self.bodies.index(body)
+        self.world.pos[i] = body.position
+        self.world.set_velocity(i, body.velocity)
     def update_coin_positions(self, dt):
-        for coin in self.board.coins:
-            coin.update_position(dt)
-            coin.apply_friction()
-            self.handle_boundaries(coin)
-        if self.board.striker:
-            self.board.striker.update_position(dt)
-            self.board.striker.apply_friction()
-            self.handle_boundaries(self.board.striker)
-    def handle_boundaries(self, coin):
-        if coin.is_pocketed:
-            return
-        x, y = coin.position
-        r = coin.radius
-        # Left wall
-        if x - r < self.board.left:
-            coin.position[0] = self.board.left + r
-            coin.velocity[0] *= -ELASTICITY
-            coin.velocity[1] *= ELASTICITY
-            Renderer.play_sfx("coin_bounce_wall")
-        # Right wall
-        if x + r > self.board.right:
-            coin.position[0] = self.board.right - r
-            coin.velocity[0] *= -ELASTICITY
-            coin.velocity[1] *= ELASTICITY
-            Renderer.play_sfx("coin_bounce_wall")
-        # Top wall
-        if y - r < self.board.top:
-            coin.position[1] = self.board.top + r
-            coin.velocity[1] *= -ELASTICITY
-            coin.velocity[0] *= ELASTICITY
+        # Integration, friction, walls and collisions for all coins at once, sub-stepped so fast shots cannot tunnel
+        world = self.world
+        events = world.step(dt)
+        # Sleeping coins are neither simulated nor copied back
+        if events["moved"]:
+            positions, velocities = world.pos.tolist(), world.vel.tolist()
+            for i in events["moved"]:
+                body = self.bodies[i]
+                body.position, body.velocity = positions[i], velocities[i]
+                body.rect.center = (int(body.position[0]), int(body.position[1]))
+        for _ in events["wall_hits"]:
             Renderer.play_sfx("coin_bounce_wall")
-        # Bottom wall
-        if y + r > self.board.bottom:
-            coin.position[1] = self.board.bottom - r
-            coin.velocity[1] *= -ELASTICITY
-            coin.velocity[0] *= ELASTICITY
-            Renderer.play_sfx("coin_bounce_wall")
-    def resolve_collisions(self):
-        coins = list(self.board.coins) + [self.board.striker]
-        n = len(coins)
-        for i in range(n):
-            for j in range(i+1, n):
-                c1, c2 = coins[i], coins[j]
-                if c1.is_pocketed or c2.is_pocketed:
-                    continue
-                dx = c2.position[0]-c1.position[0]
-                dy = c2.position[1]-c1.position[1]
-                dist = math.hypot(dx, dy)
-                min_dist = c1.radius + c2.radius
-                if dist < min_dist and dist != 0:
-                    nx, ny = dx/dist, dy/dist
-                    rel_vel = ((c2.velocity[0]-c1.velocity[0])*nx +
-                               (c2.velocity[1]-c1.velocity[1])*ny)
-                    if rel_vel < 0:
-                        imp = -2*rel_vel / (1 + 1)
-                        c1.velocity[0] -= imp*nx
-                        c1.velocity[1] -= imp*ny
-                        c2.velocity[0] += imp*nx
-                        c2.velocity[1] += imp*ny
-                        # Separate the coins
-                        overlap = min_dist - dist + 0.5
-                        c1.position[0] -= nx*overlap/2
-                        c1.position[1] -= ny*overlap/2
-                        c2.position[0] += nx*overlap/2
-                        c2.position[1] += ny*overlap/2
-                        if c1.coin_type=="striker" or c2.coin_type=="striker":
-                            Renderer.play_sfx("striker_hit_coin")
-                        else:
-                            Renderer.play_sfx("coin_hit_coin")
-    def apply_friction(self):
-        for coin in self.board.coins:
-            coin.apply_friction()
-        if self.board.striker:
-            self.board.striker.apply_friction()
+        for i, j in events["contacts"]:
+            if self.bodies[i].coin_type=="striker" or self.bodies[j].coin_type=="striker":
+                Renderer.play_sfx("striker_hit_coin")
+            else:
+                Renderer.play_sfx("coin_hit_coin")
     def coins_are_moving(self):
-        moving = False
-        for coin in self.board.coins:
-            if not coin.is_pocketed and (abs(coin.velocity[0]) > COIN_MIN_SPEED or abs(coin.velocity[1]) > COIN_MIN_SPEED):
-                moving = True
-                break
-        s = self.board.striker
-        if s and not s.is_pocketed and (abs(s.velocity[0]) > COIN_MIN_SPEED or abs(s.velocity[1]) > COIN_MIN_SPEED):
-            moving = True
-        return moving
+        # The world counts awake bodies as they wake and sleep, so this is O(1)
+        return self.world.awake_count > 0
 
 # Player and score logic
 class Player:
@@ -737,10 +697,10 @@ class Game:
         if self.state.current_state == GameState.AIM:
             pass # wait for input
             if not self.board.striker.velocity == [0.0,0.0]:
+                self.physics_engine.launch(self.board.striker)
                 self.state.change_state(GameState.SHOOT)
         elif self.state.current_state == GameState.SHOOT:
             self.physics_engine.update_coin_positions(dt)
-            self.physics_engine.resolve_collisions()
             if not self.physics_engine.coins_are_moving():
                 self.state.change_state(GameState.PHYSICS)
         elif self.state.current_state == GameState.PHYSICS:
@@ -856,6 +816,7 @@ class Game:
                 s.is_pocketed = True
                 Renderer.play_sfx("coin_pocketed")
                 self.board.striker = Striker((SCREEN_WIDTH//2, SCREEN_HEIGHT//2+BOARD_SIZE//2-86))
+        self.physics_engine.sync_bodies()
         # Scorer update
         current_player = self.turn_manager.get_current_player(self.players)
         self.scorer.update_score(current_player, pocketed_this_turn)
@@ -875,6 +836,7 @@ class Game:
         self.input_handler.aiming = False
     def prepare_next_turn(self):
         self.board.striker = Striker((SCREEN_WIDTH//2, SCREEN_HEIGHT//2+BOARD_SIZE//2-86))
+        self.physics_engine.sync_bodies()
     def check_game_over(self):
         # Finished when all coins and queen pocketed
         coins_left = self.get_coins_left()
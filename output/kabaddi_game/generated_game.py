@@ -3,6 +3,8 @@ import sys
 import random
 from enum import Enum, auto
 
+from gamekit.text import get_font, render_text
+
 # Constants (Theme colors, court, game)
 SCREEN_WIDTH = 960
 SCREEN_HEIGHT = 600
@@ -77,14 +79,14 @@ class Player(pygame.sprite.Sprite):
         glow = COLOR_CYAN if self.is_raider and self.breath_meter > 25 else COLOR_DANGER if self.is_raider else self.color
         pygame.draw.circle(self.image, glow, (self.radius, self.radius), self.radius+3)
         pygame.draw.circle(self.image, self.color, (self.radius, self.radius), self.radius-3)
-        font = pygame.font.SysFont(FONT_NAME, 24)
+        font = get_font(FONT_NAME, 24)
         text_color = COLOR_WHITE if self.color != COLOR_WHITE else COLOR_SLATE
-        text = font.render(str(self.jersey_num), True, text_color)
+        text = render_text(str(self.jersey_num), font, text_color)
         text_rect = text.get_rect(center=(self.radius, self.radius))
         self.image.blit(text, text_rect)
         if self.is_raider:
-            rfont = pygame.font.SysFont(FONT_NAME, 16, bold=True)
-            rtext = rfont.render("R", True, COLOR_CYAN)
+            rfont = get_font(FONT_NAME, 16, bold=True)
+            rtext = render_text("R", rfont, COLOR_CYAN)
             self.image.blit(rtext, (self.radius-15, self.radius-18))
     def move(self, dx, dy, court_rect):
         nx = self.position[0] + dx
@@ -239,7 +241,7 @@ class Renderer:
     def __init__(self, screen, font):
         self.screen = screen
         self.font = font
-        self.small_font = pygame.font.SysFont(FONT_NAME, 18)
+        self.small_font = get_font(FONT_NAME, 18)
     def draw_court(self):
         court_rect = pygame.Rect(COURT_MARGIN, COURT_MARGIN, SCREEN_WIDTH-2*COURT_MARGIN, SCREEN_HEIGHT-2*COURT_MARGIN)
         self.screen.fill(COLOR_SAND)
@@ -256,17 +258,17 @@ class Renderer:
             for player in team.players:
                 if player.is_raider:
                     if player.breath_meter < 25:
-                        warn_txt = self.small_font.render("Breath Low! Retreat!", True, COLOR_DANGER)
+                        warn_txt = render_text("Breath Low! Retreat!", self.small_font, COLOR_DANGER)
                         self.screen.blit(warn_txt, (player.position[0]-50, player.position[1]-38))
     def draw_ui(self, game, state):
         # Scoreboard
         bar = pygame.Rect(SCREEN_WIDTH//2-130, 18, 260, 44)
         pygame.draw.rect(self.screen, COLOR_SLATE, bar, border_radius=12)
-        tA = self.font.render(f"Red: {game.teams[0].score}", True, COLOR_WHITE)
-        tB = self.font.render(f"Blue: {game.teams[1].score}", True, COLOR_WHITE)
+        tA = render_text(f"Red: {game.teams[0].score}", self.font, COLOR_WHITE)
+        tB = render_text(f"Blue: {game.teams[1].score}", self.font, COLOR_WHITE)
         self.screen.blit(tA, (SCREEN_WIDTH//2-120, 26))
         self.screen.blit(tB, (SCREEN_WIDTH//2+36, 26))
-        rnd_txt = self.font.render(f"Round {game.round_manager.current_round+1}/{ROUNDS_PER_MATCH}", True, COLOR_GOLD)
+        rnd_txt = render_text(f"Round {game.round_manager.current_round+1}/{ROUNDS_PER_MATCH}", self.font, COLOR_GOLD)
         self.screen.blit(rnd_txt, (SCREEN_WIDTH//2-70, 62))
         # Breath Meter
         for team in game.teams:
@@ -278,41 +280,41 @@ class Renderer:
                 breath_col = COLOR_CYAN if r.breath_meter > 25 else COLOR_DANGER
                 width = int(140*r.breath_meter/BREATH_MAX)
                 pygame.draw.rect(self.screen, breath_col, (meter_x, 80, width, 18), border_radius=8)
-                btxt = self.small_font.render(f"Breath: {int(r.breath_meter)}", True, COLOR_SLATE)
+                btxt = render_text(f"Breath: {int(r.breath_meter)}", self.small_font, COLOR_SLATE)
                 self.screen.blit(btxt, (meter_x+28, 82))
         # Substitution/Info panel
         info_rect = pygame.Rect(24, SCREEN_HEIGHT-70, SCREEN_WIDTH-48, 44)
         pygame.draw.rect(self.screen, COLOR_SLATE, info_rect, border_radius=12)
         txt = "Space: Tag | Enter: Retreat | T: Tackle | P: Pause"
-        control_txt = self.small_font.render(txt, True, COLOR_WHITE)
+        control_txt = render_text(txt, self.small_font, COLOR_WHITE)
         self.screen.blit(control_txt, (info_rect.left+18, info_rect.top+8))
         # Pause indication
         if state.current_state == GameStateEnum.PAUSE:
             pause_overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
             pause_overlay.fill((38, 50, 56, 160))
             self.screen.blit(pause_overlay, (0,0))
-            pausetxt = self.font.render("PAUSED", True, COLOR_GOLD)
+            pausetxt = render_text("PAUSED", self.font, COLOR_GOLD)
             self.screen.blit(pausetxt, (SCREEN_WIDTH//2-60, SCREEN_HEIGHT//2-30))
 
     def draw_menu(self):
         self.screen.fill(COLOR_SAND)
-        title = pygame.font.SysFont(FONT_NAME, 54, bold=True).render("Kabaddi Game", True, COLOR_GOLD)
+        title = render_text("Kabaddi Game", get_font(FONT_NAME, 54, bold=True), COLOR_GOLD)
         self.screen.blit(title, (SCREEN_WIDTH//2-title.get_width()//2, 60))
-        start_btn = pygame.font.SysFont(FONT_NAME, 36).render("Start New Match", True, COLOR_RED)
+        start_btn = render_text("Start New Match", get_font(FONT_NAME, 36), COLOR_RED)
         self.screen.blit(start_btn, (SCREEN_WIDTH//2-start_btn.get_width()//2, 170))
-        team_txt = pygame.font.SysFont(FONT_NAME, 24, bold=True).render("Team Red vs Team Blue", True, COLOR_SLATE)
+        team_txt = render_text("Team Red vs Team Blue", get_font(FONT_NAME, 24, bold=True), COLOR_SLATE)
         self.screen.blit(team_txt, (SCREEN_WIDTH//2-team_txt.get_width()//2, 226))
-        info = self.small_font.render("Press Enter to Start | P: Settings | H: Help", True, COLOR_SLATE)
+        info = render_text("Press Enter to Start | P: Settings | H: Help", self.small_font, COLOR_SLATE)
         self.screen.blit(info, (SCREEN_WIDTH//2-info.get_width()//2, 290))
     def draw_game_over(self, winner, game):
         self.screen.fill(COLOR_SAND)
-        overtxt = pygame.font.SysFont(FONT_NAME, 54, bold=True).render("Game Over!", True, COLOR_GOLD)
+        overtxt = render_text("Game Over!", get_font(FONT_NAME, 54, bold=True), COLOR_GOLD)
         self.screen.blit(overtxt, (SCREEN_WIDTH//2-overtxt.get_width()//2, 80))
-        winner_txt = pygame.font.SysFont(FONT_NAME, 36).render(f"Winner: {winner}", True, COLOR_GREEN)
+        winner_txt = render_text(f"Winner: {winner}", get_font(FONT_NAME, 36), COLOR_GREEN)
         self.screen.blit(winner_txt, (SCREEN_WIDTH//2-winner_txt.get_width()//2, 164))
-        sc_txt = self.font.render(f"Red: {game.teams[0].score}   Blue: {game.teams[1].score}", True, COLOR_SLATE)
+        sc_txt = render_text(f"Red: {game.teams[0].score}   Blue: {game.teams[1].score}", self.font, COLOR_SLATE)
         self.screen.blit(sc_txt, (SCREEN_WIDTH//2-sc_txt.get_width()//2, 220))
-        btn = pygame.font.SysFont(FONT_NAME, 28, bold=True).render("Enter: Replay | Esc: Menu", True, COLOR_GOLD)
+        btn = render_text("Enter: Replay | Esc: Menu", get_font(FONT_NAME, 28, bold=True), COLOR_GOLD)
         self.screen.blit(btn, (SCREEN_WIDTH//2-btn.get_width()//2, 310))
 
 # Round Manager (Singleton/manager)
@@ -494,7 +496,7 @@ def main():
         pygame.init()
         screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption('Kabaddi Game')
-        font = pygame.font.SysFont(FONT_NAME, 32, bold=True)
+        font = get_font(FONT_NAME, 32, bold=True)
         clock = pygame.time.Clock()
         game = Game(screen, font)
         dt = 0
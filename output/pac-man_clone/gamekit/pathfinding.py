@@ -0,0 +1,162 @@
+"""
+Breadth-first distance fields and next-hop tables over a ``TileGrid``.
+
+Chasing AI in maze games tends to be greedy: step along the axis towards the
+target, or pick a random direction when a wall is in the way. Ghosts then
+get stuck behind walls. Running a path search per ghost per frame in Python
+is too slow, but the searches repeat: every ghost chases the same target,
+and the target changes tile only every few frames.
+
+- ``bfs(grid, col, row)`` floods the open tiles from one target tile. For
+  every tile it records the distance to the target and the first step
+  towards it.
+- ``NextHopTable`` caches one flood per target tile. A maze that does not
+  change is flooded at most once per tile per process, lazily or all at once
+  with ``build()``. ``direction(from, to)`` is then two list lookups.
+  ``next_hop_table(grid)`` shares a table between every grid with the same
+  layout.
+- ``DistanceField`` follows a moving target (the player). ``update`` only
+  fetches a new flood when the target enters another tile, and every chaser
+  reads the same field, so the per-ghost cost is O(1).
+
+Moves are 4-connected and never leave the grid. Directions are ``(dx, dy)``
+tile steps, so they can be passed straight to a game's ``can_move(dx, dy)``.
+"""
+import collections
+from array import array
+from typing import Dict, Optional, Tuple
+
+from .grid import TileGrid
+
+
+DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+UNREACHABLE = -1
+# Next-hop codes: 0 is "none" (the target itself, or unreachable), i + 1 is DIRECTIONS[i]
+_STEP_CODES = (None,) + DIRECTIONS
+
+Field = Tuple[array, bytearray]
+
+
+def bfs(grid: TileGrid, col: int, row: int) -> Field:
+    """(distances, next-hop codes) for every tile, flooded from the target tile (col, row)."""
+    cols, rows, solid = grid.cols, grid.rows, grid.solid
+    distances = array("i", [UNREACHABLE]) * (cols * rows)
+    hops = bytearray(cols * rows)
+    if not (0 <= col < cols and 0 <= row < rows) or solid[row * cols + col]:
+        return distances, hops
+    start = row * cols + col
+    distances[start] = 0
+    queue = collections.deque([start])
+    while queue:
+        index = queue.popleft()
+        c, r = index % cols, index // cols
+        next_distance = distances[index] + 1
+        for code, (dx, dy) in enumerate(DIRECTIONS, 1):
+            nc, nr = c + dx, r + dy
+            if 0 <= nc < cols and 0 <= nr < rows:
+                neighbour = nr * cols + nc
+                if distances[neighbour] == UNREACHABLE and not solid[neighbour]:
+                    distances[neighbour] = next_distance
+                    # The neighbour reaches the target by stepping back to this tile: the opposite direction
+                    hops[neighbour] = code + 1 if code % 2 else code - 1
+                    queue.append(neighbour)
+    return distances, hops
+
+
+class NextHopTable:
+    """Per-target BFS floods of a maze that does not change, cached once computed."""
+
+    def __init__(self, grid: TileGrid):
+        self.grid = grid
+        self._fields: Dict[int, Field] = {}
+        self.floods = 0
+
+    def field(self, col: int, row: int) -> Field:
+        """(distances, next-hop codes) towards (col, row), flooded on first use."""
+        if not (0 <= col < self.grid.cols and 0 <= row < self.grid.rows):
+            return bfs(self.grid, col, row)  # Nothing reaches a target outside the grid; not worth a cache entry
+        key = row * self.grid.cols + col
+        field = self._fields.get(key)
+        if field is None:
+            field = self._fields[key] = bfs(self.grid, col, row)
+            self.floods += 1
+        return field
+
+    def build(self) -> None:
+        """Flood from every open tile up front: cols * rows bytes per open tile."""
+        grid = self.grid
+        for index, solid in enumerate(grid.solid):
+            if not solid:
+                self.field(index % grid.cols, index // grid.cols)
+
+    def direction(self, from_col: int, from_row: int, to_col: int, to_row: int) -> Optional[Tuple[int, int]]:
+        """First step of a shortest path, or None at the target or when it cannot be reached."""
+        grid = self.grid
+        if not (0 <= from_col < grid.cols and 0 <= from_row < grid.rows):
+            return None
+        return _STEP_CODES[self.field(to_col, to_row)[1][from_row * grid.cols + from_col]]
+
+    def distance(self, from_col: int, from_row: int, to_col: int, to_row: int) -> int:
+        """Steps on a shortest path, or ``UNREACHABLE``."""
+        grid = self.grid
+        if not (0 <= from_col < grid.cols and 0 <= from_row < grid.rows):
+            return UNREACHABLE
+        return self.field(to_col, to_row)[0][from_row * grid.cols + from_col]
+
+    def stats(self) -> Dict[str, int]:
+        tiles = self.grid.cols * self.grid.rows
+        return {"targets": len(self._fields), "floods": self.floods, "bytes": len(self._fields) * tiles * 5}
+
+
+_tables: Dict[Tuple[int, int, bytes], NextHopTable] = {}
+
+
+def next_hop_table(grid: TileGrid) -> NextHopTable:
+    """The shared table for grids with this layout; the grid must not change afterwards."""
+    key = (grid.cols, grid.rows, bytes(grid.solid))
+    table = _tables.get(key)
+    if table is None:
+        table = _tables[key] = NextHopTable(grid)
+    return table
+
+
+class DistanceField:
+    """Distances and first steps towards a moving target, refreshed only when it changes tile.
+
+    With ``static`` (the default) floods come from the shared ``NextHopTable``,
+    so a tile the target has visited before costs nothing. Pass
+    ``static=False`` for grids that change, to flood afresh each time.
+    """
+
+    def __init__(self, grid: TileGrid, static: bool = True):
+        self.grid = grid
+        self.table = next_hop_table(grid) if static else None
+        self.target: Optional[Tuple[int, int]] = None
+        self.recomputes = 0
+        self._distances, self._hops = bfs(grid, -1, -1)
+
+    def update(self, col: int, row: int) -> bool:
+        """Point the field at the target's tile; returns True if it moved to another tile."""
+        if self.target == (col, row):
+            return False
+        self.target = (col, row)
+        self.recomputes += 1
+        if self.table is not None:
+            self._distances, self._hops = self.table.field(col, row)
+        else:
+            self._distances, self._hops = bfs(self.grid, col, row)
+        return True
+
+    def _index(self, col: int, row: int) -> int:
+        if 0 <= col < self.grid.cols and 0 <= row < self.grid.rows:
+            return row * self.grid.cols + col
+        return -1
+
+    def distance(self, col: int, row: int) -> int:
+        index = self._index(col, row)
+        return self._distances[index] if index >= 0 else UNREACHABLE
+
+    def direction(self, col: int, row: int) -> Optional[Tuple[int, int]]:
+        """First step from (col, row) towards the target, or None."""
+        index = self._index(col, row)
+        return _STEP_CODES[self._hops[index]] if index >= 0 else None
@@ -2,6 +2,9 @@ import pygame
 import sys
 import random
 
+from gamekit.grid import TileGrid
+from gamekit.pathfinding import DistanceField
+
 # Game constants
 SCREEN_WIDTH = 608
 SCREEN_HEIGHT = 672
@@ -11,6 +14,7 @@ MAZE_COLS = 19
 FPS = 60
 PLAYER_SPEED = 4
 GHOST_SPEED = 2
+GHOST_WANDER = 0.15  # Chance a ghost takes a random turn at a tile center instead of chasing
 
 # Colors
 BLACK = (0, 0, 0)
@@ -54,12 +58,15 @@ class Maze:
         self.layout = layout
         self.dots = []
         self.walls = []
+        self.grid = None
         self.player_start = None
         self.ghost_starts = []
         self.parse_maze()
 
     def parse_maze(self):
         # Parse maze layout, populate dots, walls, player and ghost start positions
+        # Wall tiles also go into an occupancy grid, so collision checks index tiles instead of scanning walls
+        self.grid = TileGrid.from_layout(self.layout, TILE_SIZE)
         for row_idx, row in enumerate(self.layout):
             for col_idx, cell in enumerate(row):
                 x = col_idx * TILE_SIZE
@@ -135,11 +142,7 @@ class Player:
         # Predict next position and check collision with wall
         next_x = self.x + dx * PLAYER_SPEED
         next_y = self.y + dy * PLAYER_SPEED
-        bbox = pygame.Rect(next_x - self.radius, next_y - self.radius, self.radius * 2, self.radius * 2)
-        for wall in self.maze.walls:
-            if bbox.colliderect(wall):
-                return False
-        return True
+        return not self.maze.grid.circle_blocked(next_x, next_y, self.radius)
 
     def set_next_direction(self, direction):
         self.next_direction = direction
@@ -159,33 +162,20 @@ class Ghost:
         self.rect = pygame.Rect(self.x - self.radius, self.y - self.radius, self.radius * 2, self.radius * 2)
         self.move_counter = 0
 
-    def update(self, player_pos):
-        # Simple AI: try to move toward player, but randomly change directions
+    def update(self, chase):
+        # Turns are only possible at tile centers; there, follow the shortest path to the player
         self.move_counter += 1
-        if self.move_counter % 13 == 0:
-            options = self.possible_directions()
-            # Prefer direction toward player if possible
-            px, py = player_pos
-            dx = px - self.x
-            dy = py - self.y
-            preferred = []
-            if abs(dx) > abs(dy):
-                if dx > 0:
-                    preferred.append((1, 0))
-                else:
-                    preferred.append((-1, 0))
-            if dy > 0:
-                preferred.append((0, 1))
+        if self.x % TILE_SIZE == TILE_SIZE // 2 and self.y % TILE_SIZE == TILE_SIZE // 2:
+            step = chase.direction(*self.maze.grid.tile_at(self.x, self.y))
+            if step is not None and random.random() >= GHOST_WANDER:
+                self.direction = step
             else:
-                preferred.append((0, -1))
-            # Pick preferred if not blocked
-            for pref in preferred:
-                if pref in options:
-                    self.direction = pref
-                    break
-            else:
-                if options:
-                    self.direction = random.choice(options)
+                options = self.possible_directions()
+                # Wandering ghosts do not double back unless it is the only way out
+                reverse = (-self.direction[0], -self.direction[1])
+                forward = [d for d in options if d != reverse]
+                if forward or options:
+                    self.direction = random.choice(forward or options)
 
         if self.can_move(*self.direction):
             self.x += self.direction[0] * GHOST_SPEED
@@ -203,11 +193,7 @@ class Ghost:
     def can_move(self, dx, dy):
         next_x = self.x + dx * GHOST_SPEED
         next_y = self.y + dy * GHOST_SPEED
-        bbox = pygame.Rect(next_x - self.radius, next_y - self.radius, self.radius * 2, self.radius * 2)
-        for wall in self.maze.walls:
-            if bbox.colliderect(wall):
-                return False
-        return True
+        return not self.maze.grid.circle_blocked(next_x, next_y, self.radius)
 
     def possible_directions(self):
         directions = []
@@ -256,6 +242,8 @@ class Game:
         # Start positions from maze
         player_pos = self.maze.player_start if self.maze.player_start else (TILE_SIZE * MAZE_COLS // 2, TILE_SIZE * (MAZE_ROWS // 2))
         self.player = Player(player_pos[0], player_pos[1], self.maze)
+        # One distance field from the player's tile, shared by every ghost
+        self.chase = DistanceField(self.maze.grid)
         self.ghosts = []
         color_idx = 0
         if not self.maze.ghost_starts:
@@ -300,8 +288,9 @@ class Game:
             return
 
         self.player.update()
+        self.chase.update(*self.maze.grid.tile_at(self.player.x, self.player.y))
         for ghost in self.ghosts:
-            ghost.update((self.player.x, self.player.y))
+            ghost.update(self.chase)
 
         # Collisions with dots
         player_rect = pygame.Rect(self.player.x - self.player.radius, self.player.y - self.player.radius, self.player.radius * 2, self.player.radius * 2)
@@ -3,6 +3,8 @@ import sys
 import math
 import random
 
+from gamekit.physics import DiscWorld
+
 # Constants
 SCREEN_WIDTH = 900
 SCREEN_HEIGHT = 600
@@ -81,6 +83,9 @@ class Ball(pygame.sprite.Sprite):
         self.thrown_by = None
         self.color = (220, 80, 80)
         self.team_color = team_color
+        self.world = DiscWorld(1, bounds=(None, None, None, SCREEN_HEIGHT), gravity=(0, 0.48),
+                               wall_restitution=0.58, wall_damping=0.72)
+        self.world.add((x, y), BALL_RADIUS)
 
     def throw(self, angle, power):
         # Throw with given angle and power
@@ -90,19 +95,26 @@ class Ball(pygame.sprite.Sprite):
         self.active = True
         self.throwing = True
 
-    def update(self):
+    def update(self, on_substep=None):
+        """Sub-stepped flight; ``on_substep(ball)`` checks hits between sub-steps and returns True to stop."""
         if self.active:
-            self.vy += 0.48  # Gravity
-            self.x += self.vx
-            self.y += self.vy
-            # Bounce off floor
-            if self.y + self.radius > SCREEN_HEIGHT:
-                self.vy = -abs(self.vy) * 0.58
-                self.y = SCREEN_HEIGHT - self.radius
-                # Slow down
-                self.vx *= 0.72
-                if abs(self.vy) < 1 and abs(self.vx) < 1:
-                    self.active = False
+            world = self.world
+            world.pos[0] = self.x, self.y
+            world.vel[0] = self.vx, self.vy
+
+            def substep(w):
+                self.x, self.y = w.pos[0].tolist()
+                self.vx, self.vy = w.vel[0].tolist()
+                stop = on_substep is not None and on_substep(self)
+                w.vel[0] = self.vx, self.vy  # A hit may have slowed the ball
+                return stop or not self.active
+
+            # Floor bounce and slowdown happen in the world
+            result = world.step(1.0, substep)
+            self.x, self.y = world.pos[0].tolist()
+            self.vx, self.vy = world.vel[0].tolist()
+            if result["wall_hits"] and abs(self.vy) < 1 and abs(self.vx) < 1:
+                self.active = False
             if self.x < 0 or self.x > SCREEN_WIDTH:
                 self.active = False
 
@@ -441,17 +453,9 @@ class Game:
 
     def update_play(self):
         # Ball physics and collision
-        self.ball.update()
+        self.ball.update(self.hit_stones)
         for stone in self.stones:
             stone.update()
-            if stone.active and self.ball.active:
-                # Collision
-                if self.ball.get_rect().colliderect(stone.rect):
-                    stone.active = False
-                    stone.vx = self.ball.vx * random.uniform(0.8, 1.4) + random.randint(-3, 3)
-                    stone.vy = self.ball.vy * random.uniform(0.5, 1.2) + random.randint(-2, 3)
-                    self.ball.vy *= 0.52
-                    self.ball.vx *= 0.45
         for p in self.players:
             p.update(self.ball, self.stones, self.stack_status())
         if self.ball.active:
@@ -470,6 +474,16 @@ class Game:
         self.check_rebuilding()
         self.check_timer()
 
+    def hit_stones(self, ball):
+        # Checked every physics sub-step, so a fast ball cannot pass through a thin stone
+        for stone in self.stones:
+            if stone.active and ball.get_rect().colliderect(stone.rect):
+                stone.active = False
+                stone.vx = ball.vx * random.uniform(0.8, 1.4) + random.randint(-3, 3)
+                stone.vy = ball.vy * random.uniform(0.5, 1.2) + random.randint(-2, 3)
+                ball.vy *= 0.52
+                ball.vx *= 0.45
+
     def check_rebuilding(self):
         # Detect if stack is rebuilt
         stones_placed = [s for s in self.stones if s.active]
@@ -6,6 +6,11 @@ import time
 import traceback
 from pygame import gfxdraw
 
+from gamekit.glow import shared_cache
+from gamekit.pool import ObjectPool
+
+GLOW_CACHE = shared_cache()
+
 # =============================
 # Game Constants and Settings
 # =============================
@@ -154,33 +159,37 @@ class Particle:
 
 class ParticlePool:
     def __init__(self, pool_size=NEON_PARTICLE_POOL):
-        self.pool = [Particle() for _ in range(pool_size)]
+        self.particles = ObjectPool(Particle, pool_size)
+        self.pool = self.particles.slots
 
     def spawn(self, *args, **kwargs):
-        for p in self.pool:
-            if not p.active:
-                p.spawn(*args, **kwargs)
-                return p
-        return None
+        p = self.particles.acquire()
+        if p is not None:
+            p.spawn(*args, **kwargs)
+        return p
+
+    def respawn(self, p, *args, **kwargs):
+        # Reuse a specific slot, live or not
+        self.particles.activate(p)
+        p.spawn(*args, **kwargs)
 
     def update(self, dt):
-        for p in self.pool:
-            if p.active:
-                p.update(dt)
+        for p in self.particles.active:
+            p.update(dt)
+        self.particles.retain(lambda p: p.active)
 
     def render(self, surface):
-        for p in self.pool:
-            if p.active:
-                s = int(p.size * (0.9 + 0.1*p.alpha))
-                color = tuple(
-                    int(clamp(pc * p.alpha + 40 * (1-p.alpha), 0, 255)) for pc in p.color
-                )
-                if p.type == "trail":
-                    pygame.gfxdraw.filled_circle(surface, int(p.x), int(p.y), s, color)
-                    pygame.gfxdraw.aacircle(surface, int(p.x), int(p.y), s, color)
-                elif p.type == "burst":
-                    pygame.gfxdraw.filled_circle(surface, int(p.x), int(p.y), int(s*1.25), color)
-                    pygame.gfxdraw.aacircle(surface, int(p.x), int(p.y), int(s*1.25), color)
+        for p in self.particles:
+            s = int(p.size * (0.9 + 0.1*p.alpha))
+            color = tuple(
+                int(clamp(pc * p.alpha + 40 * (1-p.alpha), 0, 255)) for pc in p.color
+            )
+            if p.type == "trail":
+                pygame.gfxdraw.filled_circle(surface, int(p.x), int(p.y), s, color)
+                pygame.gfxdraw.aacircle(surface, int(p.x), int(p.y), s, color)
+            elif p.type == "burst":
+                pygame.gfxdraw.filled_circle(surface, int(p.x), int(p.y), int(s*1.25), color)
+                pygame.gfxdraw.aacircle(surface, int(p.x), int(p.y), int(s*1.25), color)
 
 # =============================
 # Paddle Entity
@@ -238,8 +247,7 @@ class Paddle:
             glow_lvl = int(40*pulse_flash + 46 - i*10)
             glow_alpha = clamp(90 - i*15 + 65*pulse_flash, 0, 150)
             glow_rect = paddle_rect.inflate(10+i*5,10+i*4)
-            surf = pygame.Surface(glow_rect.size, pygame.SRCALPHA)
-            pygame.draw.rect(surf, (*self.color, glow_alpha), surf.get_rect(), border_radius=18)
+            surf = GLOW_CACHE.rect(glow_rect.size, self.color, glow_alpha, border_radius=18)
             surface.blit(surf, glow_rect.topleft)
 
 # =======================
@@ -331,20 +339,30 @@ class Ball:
     def serve_animation(self, dt):
         self.serve_time += dt
 
-    def render(self, surface, flash_f=0.0):
-        # Under Ball Shadow
-        shadow_col = color_lerp(DEEP_NAVY_BLUE, PALE_GREY, 0.17)
-        s_rect = pygame.Rect(int(self.x-BALL_SIZE//2+8), int(self.y-BALL_SIZE//2+8), BALL_SIZE, BALL_SIZE)
-        surf_shadow = pygame.Surface(s_rect.size, pygame.SRCALPHA)
-        pygame.draw.ellipse(surf_shadow, (*shadow_col, int(66+38*flash_f)), surf_shadow.get_rect())
-        surface.blit(surf_shadow, s_rect.topleft)
-        # Ball Glow Layer
+    def render_shadow(self, shadow_col, alpha):
+        surf_shadow = pygame.Surface((BALL_SIZE, BALL_SIZE), pygame.SRCALPHA)
+        pygame.draw.ellipse(surf_shadow, (*shadow_col, alpha), surf_shadow.get_rect())
+        return surf_shadow
+
+    def render_glow(self, flash_f):
         glow_rad = int(self.size*1.55)
         glow_surf = pygame.Surface((glow_rad*2,glow_rad*2), pygame.SRCALPHA)
         for g in range(9,0,-1):
-            c_val = int(220 + g*4 * flash_f)
             col = color_lerp(NEON_CYAN, NEON_WHITE, g/9)
             pygame.gfxdraw.filled_circle(glow_surf, glow_rad, glow_rad, int(glow_rad*0.7)+g*2, (*col, clamp(58+g*17-int(80*flash_f),0,180)))
+        return glow_surf
+
+    def render(self, surface, flash_f=0.0):
+        # Under Ball Shadow
+        shadow_col = color_lerp(DEEP_NAVY_BLUE, PALE_GREY, 0.17)
+        s_rect = pygame.Rect(int(self.x-BALL_SIZE//2+8), int(self.y-BALL_SIZE//2+8), BALL_SIZE, BALL_SIZE)
+        shadow_alpha = int(66+38*flash_f)
+        surf_shadow = GLOW_CACHE.sprite(("ball_shadow", shadow_alpha), lambda: self.render_shadow(shadow_col, shadow_alpha))
+        surface.blit(surf_shadow, s_rect.topleft)
+        # Ball Glow Layer (cached per flash step)
+        flash_step = round(flash_f, 2)
+        glow_surf = GLOW_CACHE.sprite(("ball_glow", flash_step), lambda: self.render_glow(flash_step))
+        glow_rad = glow_surf.get_width() // 2
         bs = int(self.size / 2)
         pygame.gfxdraw.filled_circle(surface, int(self.x), int(self.y), bs, NEON_WHITE)
         surface.blit(glow_surf, (self.x-glow_rad, self.y-glow_rad), special_flags=pygame.BLEND_ADD)
@@ -613,14 +631,14 @@ class RenderingSystem:
             if i<(SCREEN_HEIGHT//2):
                 c = color_lerp(BG_GRAD_TOP,BG_GRAD_MID,min(1, t*1.2))
             else:
-                c = color_lerp(BG_GRAD_MID,BG_GRAD_BOT,min(1,(t-0.24)*1.2))
+                c = color_lerp(BG_GRAD_MID,BG_GRAD_BOT,max(0, min(1, (t-0.24)*1.2)))
             pygame.gfxdraw.hline(grad,0,SCREEN_WIDTH-1,i,c)
         surface.blit(grad,(0,0))
         # Floating ambient particles
         for j in range(36):
             ap = self.ambient_particles.pool[j]
             if not ap.active or random.random()>0.012:
-                ap.spawn(
+                self.ambient_particles.respawn(ap,
                     random.randint(64,SCREEN_WIDTH-82),
                     random.randint(44,SCREEN_HEIGHT-44),
                     random.uniform(-6.5,7.7),
@@ -630,6 +648,12 @@ class RenderingSystem:
         self.ambient_particles.update(dt)
         self.ambient_particles.render(surface)
 
+    def render_line_glow(self, x1, y1, x2, y2, col, g):
+        glow = pygame.Surface((abs(x2-x1)+14,abs(y2-y1)+14),pygame.SRCALPHA)
+        pygame.draw.line(glow,(col[0],col[1],col[2],85-g*17),
+        (7,7),(abs(x2-x1)+7,abs(y2-y1)+7),max(4-g*2,1))
+        return glow
+
     def draw_court(self, surface, dt):
         # Neon court lines
         neon_lines = [
@@ -642,9 +666,8 @@ class RenderingSystem:
             col = NEON_WHITE if i>1 else (NEON_CYAN if i==0 else NEON_MAGENTA)
             pygame.gfxdraw.line(surface,x1,y1,x2,y2,col)
             for g in range(4):
-                glow = pygame.Surface((abs(x2-x1)+14,abs(y2-y1)+14),pygame.SRCALPHA)
-                pygame.draw.line(glow,(col[0],col[1],col[2],85-g*17),
-                (7,7),(abs(x2-x1)+7,abs(y2-y1)+7),max(4-g*2,1))
+                glow = GLOW_CACHE.sprite(("court_line", x1, y1, x2, y2, col, g),
+                                         lambda: self.render_line_glow(x1, y1, x2, y2, col, g))
                 surface.blit(glow, (min(x1,x2)-7,min(y1,y2)-7), special_flags=pygame.BLEND_ADD)
         # Neon corners (pulse anim)
         pulse = math.sin(time.time()*2.1)*0.5+0.5
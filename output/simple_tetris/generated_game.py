@@ -3,6 +3,8 @@ import sys
 import random
 import time
 
+from gamekit.bitboard import BitBoard, piece_masks
+
 # Game configuration constants
 WINDOW_WIDTH = 400
 WINDOW_HEIGHT = 600
@@ -92,6 +94,9 @@ TETROMINOS = {
     ]
 }
 
+# Row bitmasks of every rotation, computed once; collision tests use these instead of block lists
+TETROMINO_MASKS = {key: piece_masks(rotations) for key, rotations in TETROMINOS.items()}
+
 # Tetromino colors
 TETROMINO_COLORS = {
     'I': (0, 240, 240),
@@ -107,15 +112,16 @@ TETROMINO_COLORS = {
 ANIM_COLOR = (255, 255, 255)
 
 class Tetromino:
-    def __init__(self, shape, grid):
+    def __init__(self, shape, board):
         self.shape_key = shape
         self.rot = 0
         self.shapes = TETROMINOS[self.shape_key]
+        self.masks = TETROMINO_MASKS[self.shape_key]
         self.color = TETROMINO_COLORS[self.shape_key]
         self.size = len(self.shapes[0])
         self.x = GRID_WIDTH // 2 - self.size // 2
         self.y = 0
-        self.grid = grid  # allows access to grid for collision
+        self.board = board  # allows access to the board for collision
 
     def get_blocks(self, x_offset=0, y_offset=0, rot_idx=None):
         blocks = []
@@ -130,12 +136,7 @@ class Tetromino:
     def can_move(self, dx, dy, rot_change=0):
         try:
             new_rot = (self.rot + rot_change) % len(self.shapes)
-            for x, y in self.get_blocks(dx, dy, new_rot):
-                if x < 0 or x >= GRID_WIDTH or y < 0 or y >= GRID_HEIGHT:
-                    return False
-                if self.grid[y][x]:
-                    return False
-            return True
+            return self.board.fits(self.masks[new_rot], self.x + dx, self.y + dy)
         except Exception as ex:
             return False
 
@@ -177,8 +178,9 @@ class TetrisGame:
         self.reset()
 
     def reset(self):
-        # Initialize playfield (empty grid)
-        self.grid = [[0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+        # Initialize playfield: one bitmask per row, colors kept separately for drawing
+        self.board = BitBoard(GRID_WIDTH, GRID_HEIGHT)
+        self.locked_rows = []
         # Score, level, speed
         self.score = 0
         self.level = 1
@@ -202,23 +204,17 @@ class TetrisGame:
             self.bag = list(TETROMINOS.keys())
             random.shuffle(self.bag)
         shape = self.bag.pop()
-        return Tetromino(shape, self.grid)
+        return Tetromino(shape, self.board)
 
     def lock_tetromino(self):
-        # Place current tetromino on grid
-        for x, y in self.tetromino.get_blocks():
-            if y < 0:
-                continue  # Ignore blocks above visible grid
-            self.grid[y][x] = self.tetromino.color
+        # Place current tetromino on the board; can_move keeps every block inside the well
+        piece = self.tetromino
+        self.locked_rows = self.board.place(piece.masks[piece.rot], piece.x, piece.y, piece.color)
         self.tetromino = None
 
     def line_clear_check(self):
-        # Find complete rows
-        full_rows = []
-        for y in range(GRID_HEIGHT):
-            if all(self.grid[y]):
-                full_rows.append(y)
-        return full_rows
+        # Only rows the last piece touched can have become full
+        return self.board.full_rows(self.locked_rows)
 
     def animate_line_clear(self, lines):
         # Start line clear animation
@@ -228,9 +224,7 @@ class TetrisGame:
 
     def perform_line_clear(self):
         # Clear lines and shift above down
-        for y in sorted(self.anim_lines):
-            del self.grid[y]
-            self.grid.insert(0, [0 for _ in range(GRID_WIDTH)])
+        self.board.clear_rows(self.anim_lines)
         # Update score and level
         line_count = len(self.anim_lines)
         self.lines_cleared += line_count
@@ -265,7 +259,7 @@ class TetrisGame:
 
     def spawn_new_tetromino(self):
         self.tetromino = self.next_piece
-        self.tetromino.grid = self.grid
+        self.tetromino.board = self.board
         self.next_piece = self.get_next_piece()
         # Check for game over (if spawn collides)
         if not self.tetromino.can_move(0, 0):
@@ -333,11 +327,8 @@ class TetrisGame:
         play_rect = pygame.Rect(px, py, GRID_WIDTH * BLOCK_SIZE, GRID_HEIGHT * BLOCK_SIZE)
         pygame.draw.rect(self.screen, (18, 18, 28), play_rect)
         # Draw locked blocks
-        for y in range(GRID_HEIGHT):
-            for x in range(GRID_WIDTH):
-                color = self.grid[y][x]
-                if color:
-                    self.draw_block(x, y, color, px, py)
+        for x, y, color in self.board.cells():
+            self.draw_block(x, y, color, px, py)
         # Animate cleared lines (flash white)
         if self.animating:
             for y in self.anim_lines:
@@ -0,0 +1,4 @@
+"""
+Game kit modules this game imports, copied from crew_python_game_builder.gamekit
+when it was published. Regenerate with ``python -m crew_python_game_builder.vendoring``.
+"""
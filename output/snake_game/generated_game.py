@@ -4,6 +4,9 @@ import sys
 import math
 import os
 
+from gamekit.particles import ParticleSystem
+from gamekit.text import blit_text, get_font
+
 # --- CONSTANTS ---
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
@@ -38,23 +41,8 @@ def lerp_color(c1, c2, t):
 
 def draw_text(surface, text, size, color, x, y, font_name=None, center=True, bold=True, shadow=True):
     """Draw neon-style text with optional shadow."""
-    font = pygame.font.Font(font_name or None, size)
-    if bold:
-        font.set_bold(True)
-    text_surface = font.render(text, True, color)
-    rect = text_surface.get_rect()
-    if center:
-        rect.center = (x, y)
-    else:
-        rect.topleft = (x, y)
-    if shadow:
-        shadow_surface = font.render(text, True, (30,30,60))
-        shadow_rect = rect.copy()
-        shadow_rect.x += 2
-        shadow_rect.y += 2
-        surface.blit(shadow_surface, shadow_rect)
-    surface.blit(text_surface, rect)
-    return rect
+    font = get_font(font_name, size, bold=bold)
+    return blit_text(surface, text, (x, y), font, color, center=center, shadow=(30,30,60) if shadow else None)
 
 def draw_rounded_rect(surface, rect, color, radius):
     """Draw filled rounded rectangle."""
@@ -77,51 +65,6 @@ def save_high_score(score):
     except Exception:
         pass
 
-# --- PARTICLE SYSTEM ---
-class Particle:
-    def __init__(self, pos, vel, color, life, radius, glow=False):
-        self.pos = list(pos)
-        self.vel = list(vel)
-        self.color = color
-        self.life = life
-        self.radius = radius
-        self.glow = glow
-
-    def update(self):
-        self.pos[0] += self.vel[0]
-        self.pos[1] += self.vel[1]
-        self.life -= 1
-
-    def draw(self, surface):
-        if self.glow:
-            s = pygame.Surface((self.radius*4, self.radius*4), pygame.SRCALPHA)
-            pygame.draw.circle(s, (*self.color[:3], 60), (self.radius*2,self.radius*2), self.radius*2)
-            surface.blit(s, (self.pos[0]-self.radius*2, self.pos[1]-self.radius*2))
-        pygame.draw.circle(surface, self.color, (int(self.pos[0]), int(self.pos[1])), self.radius)
-
-class ParticleManager:
-    def __init__(self):
-        self.particles = []
-
-    def spawn(self, pos, count, spread, base_vel, color, life, radius, glow=False):
-        for _ in range(count):
-            angle = random.uniform(0, 2*math.pi)
-            speed = random.uniform(0.5, spread)
-            vel = [base_vel[0]+math.cos(angle)*speed, base_vel[1]+math.sin(angle)*speed]
-            self.particles.append(
-                Particle(pos, vel, color, life+random.randint(-4,4), radius+random.randint(-1,1), glow)
-            )
-
-    def update(self):
-        for p in self.particles[:]:
-            p.update()
-            if p.life <= 0:
-                self.particles.remove(p)
-
-    def draw(self, surface):
-        for p in self.particles:
-            p.draw(surface)
-
 # --- FOOD CLASS ---
 class Food:
     TYPES = ['normal', 'speed', 'bonus', 'freeze']
@@ -362,7 +305,7 @@ class SnakeGame:
         self.game_state = LOADING
         self.state_transition = 0
         self.transitioning_to = None
-        self.particle_mgr = ParticleManager()
+        self.particle_mgr = ParticleSystem(capacity=1024)
         self.achieve_mgr = AchievementManager()
         self.bg_anim_phase = 0.0
         self.snake = None
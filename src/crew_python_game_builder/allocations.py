@@ -0,0 +1,380 @@
+"""
+Per-frame allocation and leak profiler for generated games.
+
+Runs a game headless (optionally under a recorded session, see recording.py)
+and watches memory three ways, without editing the game:
+
+- tracemalloc, restricted to the game file: the transient high-water mark of
+  every frame (``reset_peak`` at each frame boundary) and, every
+  ``sample_every`` frames, live bytes per source line;
+- constructor counting: ``pygame.Surface``, ``pygame.font.Font``/``SysFont``
+  and the ``pygame.transform`` functions are wrapped and every call is charged
+  to the game line that made it. This catches per-frame churn that tracemalloc
+  cannot see, because pixel buffers and fonts are allocated by SDL, not Python.
+  A ``Particle.draw`` that builds a surface per particle, or an
+  ``update_avatar`` that builds fonts on every call, shows up here;
+- entity scans: at the same samples, every live instance of a class defined
+  in the game is counted, along with the length of its list, dict, set and
+  deque attributes (``ParticleManager.particles``), and the ``stats()`` of
+  every game kit pool or particle system a game object holds. The hit rates
+  and sizes of the shared glow and text caches are reported at the end.
+
+A series that keeps growing after warm-up is reported as a leak. So is a line
+whose live bytes keep growing, and a call site that constructs objects every
+frame is reported as per-frame churn. A pool that ran out of objects is
+reported with its peak, so its size can be raised to match real play.
+"""
+import argparse
+import ast
+import collections
+import json
+import os
+import sys
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .headless import FrameHook, game_objects, run_headless
+
+
+DEFAULT_PROFILE_FRAMES = 600
+DEFAULT_SAMPLE_EVERY = 30
+# Samples taken before a game is considered warmed up (menus, level load)
+WARMUP_SAMPLES = 1
+# Minimum growth after warm-up before a series counts as a leak
+MIN_ENTITY_GROWTH = 50
+MIN_LINE_GROWTH_BYTES = 64 * 1024
+# Share of sample-to-sample steps that must not shrink for a series to count as growing
+MONOTONIC_SHARE = 0.8
+# Constructions per frame at one call site that count as per-frame churn
+CHURN_PER_FRAME = 1.0
+
+GAMEKIT_PACKAGE = "crew_python_game_builder.gamekit"
+# Published games import their own copy of the kit under this name (see vendoring.py)
+LOCAL_GAMEKIT_PACKAGE = "gamekit"
+# Game kit modules with a process-wide shared_cache() whose stats are reported
+GAMEKIT_CACHES = ("glow", "text")
+_COUNTED_TRANSFORMS = ("scale", "smoothscale", "rotate", "rotozoom", "flip", "scale2x")
+
+
+def enclosing_names(source: str) -> Dict[int, str]:
+    """Line number -> qualified name of the innermost function or class around it."""
+    names: Dict[int, str] = {}
+
+    def visit(node: ast.AST, prefix: str) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                qualname = f"{prefix}.{child.name}" if prefix else child.name
+                for line in range(child.lineno, (child.end_lineno or child.lineno) + 1):
+                    names[line] = qualname
+                visit(child, qualname)
+            else:
+                visit(child, prefix)
+
+    try:
+        visit(ast.parse(source), "")
+    except SyntaxError:
+        pass
+    return names
+
+
+# Code objects Python names after the expression rather than a def
+_EXPRESSION_CODE = {ast.Lambda: "<lambda>", ast.ListComp: "<listcomp>", ast.SetComp: "<setcomp>",
+                    ast.DictComp: "<dictcomp>", ast.GeneratorExp: "<genexpr>"}
+
+
+def code_names(source: str) -> Dict[Tuple[int, str], str]:
+    """(first line, code name) of each code object, as profilers key it -> readable qualified name.
+
+    A decorated function's code object starts at its first decorator, and
+    lambdas and comprehensions get their own code objects; these are named
+    after the function they sit in, e.g. ``color_lerp.<listcomp>``.
+    """
+    names: Dict[Tuple[int, str], str] = {}
+
+    def visit(node: ast.AST, prefix: str) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                qualname = f"{prefix}.{child.name}" if prefix else child.name
+                first = min([child.lineno] + [decorator.lineno for decorator in child.decorator_list])
+                names[(first, child.name)] = qualname
+                visit(child, qualname)
+            elif type(child) in _EXPRESSION_CODE:
+                code_name = _EXPRESSION_CODE[type(child)]
+                qualname = f"{prefix}.{code_name}" if prefix else code_name
+                names.setdefault((child.lineno, code_name), qualname)
+                visit(child, qualname)
+            else:
+                visit(child, prefix)
+
+    try:
+        visit(ast.parse(source), "")
+    except SyntaxError:
+        pass
+    return names
+
+
+def is_growing(values: List[float], min_growth: float) -> bool:
+    """True when ``values`` (after warm-up) rose by ``min_growth`` and mostly never shrank."""
+    values = values[WARMUP_SAMPLES:]
+    if len(values) < 3 or values[-1] - values[0] < min_growth:
+        return False
+    steps = list(zip(values, values[1:]))
+    return sum(1 for before, after in steps if after >= before) >= MONOTONIC_SHARE * len(steps)
+
+
+class ConstructionCounter:
+    """Counts pygame surface, font and transform constructions per game source line."""
+
+    def __init__(self, game_path: str):
+        self.game_path = os.path.abspath(game_path)
+        self.counts: collections.Counter = collections.Counter()  # (call label, line) -> count
+        self._counting = False
+
+    def install(self, hook: FrameHook) -> Callable[[], None]:
+        """Wrap the constructors; returns the undo callable."""
+        import pygame
+
+        originals: List[Tuple[Any, str, Any]] = [
+            (pygame, "Surface", pygame.Surface),
+            (pygame.font, "Font", pygame.font.Font),
+            (pygame.font, "SysFont", pygame.font.SysFont),
+        ] + [(pygame.transform, name, getattr(pygame.transform, name))
+             for name in _COUNTED_TRANSFORMS if hasattr(pygame.transform, name)]
+
+        counter = self
+
+        class CountedSurface(pygame.Surface):
+            def __init__(self, *args, **kwargs):
+                counter._count("pygame.Surface")
+                super().__init__(*args, **kwargs)
+
+        class CountedFont(pygame.font.Font):
+            def __init__(self, *args, **kwargs):
+                counter._count("pygame.font.Font")
+                super().__init__(*args, **kwargs)
+
+        def counted(label: str, function: Callable) -> Callable:
+            def wrapper(*args, **kwargs):
+                if self._counting:
+                    return function(*args, **kwargs)
+                self._count(label)
+                # Fonts built inside SysFont are charged to the SysFont call only
+                self._counting = True
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self._counting = False
+            return wrapper
+
+        pygame.Surface = CountedSurface
+        pygame.font.Font = CountedFont
+        pygame.font.SysFont = counted("pygame.font.SysFont", pygame.font.SysFont)
+        for name in _COUNTED_TRANSFORMS:
+            if hasattr(pygame.transform, name):
+                setattr(pygame.transform, name, counted(f"pygame.transform.{name}", getattr(pygame.transform, name)))
+
+        def restore() -> None:
+            for owner, name, original in originals:
+                setattr(owner, name, original)
+
+        return restore
+
+    def _count(self, label: str) -> None:
+        if self._counting:
+            return
+        frame = sys._getframe(2)
+        while frame is not None and frame.f_code.co_filename != self.game_path:
+            frame = frame.f_back
+        if frame is not None:
+            self.counts[(label, frame.f_lineno)] += 1
+
+
+class AllocationProfiler:
+    """Collects allocation and entity statistics while a game runs under ``run_headless``."""
+
+    def __init__(self, game_path: str, sample_every: int = DEFAULT_SAMPLE_EVERY):
+        self.game_path = os.path.abspath(game_path)
+        self.sample_every = max(1, sample_every)
+        self.hook: Optional[FrameHook] = None
+        self.frame_peaks: List[int] = []
+        self.samples: List[int] = []
+        self.line_bytes: Dict[int, List[int]] = collections.defaultdict(list)
+        self.entities: Dict[str, List[int]] = collections.defaultdict(list)
+        self.pools: Dict[int, Dict[str, Any]] = {}  # id(pool) -> owner attribute and stats
+        self.constructions = ConstructionCounter(game_path)
+        self._frame_start = 0
+
+    # Hooks -------------------------------------------------------------------
+
+    def install(self, hook: FrameHook) -> Callable[[], None]:
+        """Start tracemalloc and wrap pygame constructors; returns the undo callable."""
+        self.hook = hook
+        restore_constructors = self.constructions.install(hook)
+        tracemalloc.start(1)
+        self._frame_start = tracemalloc.get_traced_memory()[0]
+
+        def restore() -> None:
+            tracemalloc.stop()
+            restore_constructors()
+            self._entity_counts()  # Final pool stats
+
+        return restore
+
+    def on_frame(self, frame: int) -> None:
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        self.frame_peaks.append(max(0, peak - self._frame_start))
+        tracemalloc.reset_peak()
+        if frame % self.sample_every == 0:
+            self._sample(frame)
+        self._frame_start = tracemalloc.get_traced_memory()[0]
+
+    # Sampling ----------------------------------------------------------------
+
+    def _sample(self, frame: int) -> None:
+        self.samples.append(frame)
+        snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, self.game_path)])
+        sizes = {stat.traceback[0].lineno: stat.size for stat in snapshot.statistics("lineno")}
+        for line in set(sizes) | set(self.line_bytes):
+            series = self.line_bytes[line]
+            series.extend([0] * (len(self.samples) - 1 - len(series)))
+            series.append(sizes.get(line, 0))
+        for name, count in self._entity_counts().items():
+            series = self.entities[name]
+            series.extend([0] * (len(self.samples) - 1 - len(series)))
+            series.append(count)
+
+    def _entity_counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = collections.Counter()
+        for obj in game_objects(self.game_path):
+            name = type(obj).__name__
+            counts[f"{name} instances"] += 1
+            for attribute, value in getattr(obj, "__dict__", {}).items():
+                if isinstance(value, (list, dict, set, collections.deque)):
+                    counts[f"{name}.{attribute}"] += len(value)
+                elif type(value).__module__.startswith((GAMEKIT_PACKAGE + ".", LOCAL_GAMEKIT_PACKAGE + ".")) \
+                        and hasattr(value, "stats"):
+                    stats = value.stats()
+                    if "exhausted" in stats:
+                        self.pools[id(value)] = {"name": f"{name}.{attribute}", **stats}
+        return counts
+
+    # Report ------------------------------------------------------------------
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        with open(self.game_path, "r", encoding="utf-8") as file:
+            names = enclosing_names(file.read())
+        frames = max(1, self.hook.frames if self.hook else len(self.frame_peaks))
+
+        def where(line: int) -> str:
+            return f"line {line}" + (f" in {names[line]}" if line in names else "")
+
+        peaks = sorted(self.frame_peaks)
+        churn = [{"call": label, "where": where(line), "line": line, "count": count,
+                  "per_frame": round(count / frames, 2)}
+                 for (label, line), count in self.constructions.counts.most_common()]
+        leaks = []
+        for name, series in self.entities.items():
+            if is_growing(series, MIN_ENTITY_GROWTH):
+                leaks.append({"kind": "entities", "name": name, "samples": series})
+        for line, series in self.line_bytes.items():
+            if is_growing(series, MIN_LINE_GROWTH_BYTES):
+                leaks.append({"kind": "memory", "name": where(line), "line": line, "samples": series})
+        live = sorted(((series[-1], line) for line, series in self.line_bytes.items() if series), reverse=True)
+        findings = [f"{entry['call']} built {entry['per_frame']}x per frame at {entry['where']}"
+                    for entry in churn if entry["per_frame"] >= CHURN_PER_FRAME]
+        findings += [f"{leak['name']} keeps growing: {leak['samples'][WARMUP_SAMPLES]} -> {leak['samples'][-1]}"
+                     for leak in leaks]
+        pools = sorted(self.pools.values(), key=lambda pool: (pool["name"], -pool["capacity"]))
+        findings += [f"{pool['name']} ran out {pool['exhausted']} times (capacity {pool['capacity']}, "
+                     f"{pool['acquired']} handed out)" for pool in pools if pool["exhausted"]]
+        caches = {name: sys.modules[f"{package}.{name}"].shared_cache().stats()
+                  for package in (GAMEKIT_PACKAGE, LOCAL_GAMEKIT_PACKAGE) for name in GAMEKIT_CACHES
+                  if f"{package}.{name}" in sys.modules}
+        findings += [f"{name} cache evicted {cache['evictions']} entries at its cap (hit rate {cache['hit_rate']:.0%})"
+                     for name, cache in caches.items() if cache["evictions"]]
+        return {
+            "game_path": self.game_path,
+            "frames": frames,
+            "sample_frames": self.samples,
+            "frame_alloc_kb": {
+                "mean": round(sum(peaks) / len(peaks) / 1024, 2) if peaks else None,
+                "p95": round(peaks[min(len(peaks) - 1, int(len(peaks) * 0.95))] / 1024, 2) if peaks else None,
+                "max": round(peaks[-1] / 1024, 2) if peaks else None,
+            },
+            "constructions": churn[:top],
+            "live_lines": [{"where": where(line), "line": line, "kb": round(size / 1024, 2)} for size, line in live[:top]],
+            "entities": {name: series for name, series in sorted(self.entities.items())
+                         if any(series)},
+            "pools": pools,
+            "caches": caches,
+            "leaks": leaks,
+            "findings": findings,
+        }
+
+
+def profile_game(game_path: str, max_frames: int = DEFAULT_PROFILE_FRAMES, sample_every: int = DEFAULT_SAMPLE_EVERY,
+                 recording_path: Optional[str] = None, top: int = 10) -> Dict[str, Any]:
+    """Run ``game_path`` headless under the profiler; ``recording_path`` replays a recorded session as input."""
+    profiler = AllocationProfiler(game_path, sample_every=sample_every)
+    hooks = []
+    if recording_path:
+        from .recording import Player, Recording
+        hooks.append(Player(Recording.load(recording_path)).install)
+    hooks.append(profiler.install)
+    result = run_headless(game_path, max_frames=max_frames, on_frame=profiler.on_frame, hooks=hooks)
+    report = profiler.report(top=top)
+    report["status"] = result["status"]
+    report["error"] = result["error"]
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [f"{report['game_path']}: {report['status']} after {report['frames']} frames"]
+    if report.get("error"):
+        lines.append(f"  error: {report['error']}")
+    alloc = report["frame_alloc_kb"]
+    lines.append(f"  Python allocations per frame: mean {alloc['mean']} KB, p95 {alloc['p95']} KB, max {alloc['max']} KB")
+    if report["constructions"]:
+        lines.append("  Constructions in the game code:")
+        for entry in report["constructions"]:
+            lines.append(f"    {entry['count']:>8} ({entry['per_frame']:>7}/frame)  {entry['call']:<28} {entry['where']}")
+    if report["live_lines"]:
+        lines.append("  Live Python memory by line at the last sample:")
+        for entry in report["live_lines"]:
+            lines.append(f"    {entry['kb']:>10} KB  {entry['where']}")
+    if report["pools"]:
+        lines.append("  Pools (peak live / capacity, times exhausted):")
+        for pool in report["pools"]:
+            lines.append(f"    {pool['peak_active']:>6} / {pool['capacity']:<6} {pool['exhausted']:>8}x  {pool['name']}")
+    for name, cache in report["caches"].items():
+        if cache["hits"] + cache["misses"]:
+            size = (f"{cache['bytes'] / 1024:.0f} of {cache['max_bytes'] / 1024:.0f} KB" if "bytes" in cache
+                    else f"{cache['entries']} of {cache['max_entries']} entries")
+            lines.append(f"  {name.capitalize()} cache: {cache['hit_rate']:.1%} hits, {size}, {cache['evictions']} evictions")
+    lines.append("  Findings:" if report["findings"] else "  No per-frame churn or leaks found.")
+    lines.extend(f"    - {finding}" for finding in report["findings"])
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line interface: profile one game's allocations."""
+    parser = argparse.ArgumentParser(prog="allocations", description="Profile per-frame allocations and leaks of a generated game.")
+    parser.add_argument("game_path", help="Path to generated_game.py")
+    parser.add_argument("--frames", type=int, default=DEFAULT_PROFILE_FRAMES)
+    parser.add_argument("--sample-every", type=int, default=DEFAULT_SAMPLE_EVERY,
+                        help="Frames between line and entity samples")
+    parser.add_argument("--recording", help="Drive the game with a recorded session (see `recording record`)")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    report = profile_game(args.game_path, max_frames=args.frames, sample_every=args.sample_every,
+                          recording_path=args.recording, top=args.top)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0 if report["status"] != "crashed" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
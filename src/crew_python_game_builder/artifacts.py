@@ -0,0 +1,360 @@
+"""
+Content-addressed, deduplicated artifact store for generated games.
+
+Build outputs are split into content-defined chunks (a Gear rolling hash, so
+an edit in one function only changes the chunks around it), each chunk is
+stored once under its SHA-256 and optionally zlib-compressed. A build is a
+snapshot manifest listing the chunks of every file, so regenerated builds
+share all unchanged blobs.
+
+``output/<game_name>/`` is kept as the ``latest`` view: files are written to a
+temporary name in the same folder and moved into place with ``os.replace``,
+so a reader never sees a half-written file. Files the previously checked-out
+snapshot contained and the new one does not are removed before the
+``.snapshot`` marker names it; anything else in the folder (a game's save
+data, files a user added) is left alone.
+
+Layout::
+
+    output/.store/objects/ab/cdef...          chunk blobs
+    output/.store/snapshots/<game>/<id>.json  snapshot manifests
+    output/.store/lock                        store-wide lock file
+
+Commits and checkouts hold the lock shared and ``prune``/``gc`` hold it
+exclusively, so ``gc`` never collects chunks a running commit has written or
+deduplicated against before its manifest lands.
+"""
+import argparse
+import contextlib
+import datetime
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+DEFAULT_STORE_PATH = os.path.join("output", ".store")
+LATEST_MARKER = ".snapshot"
+LOCK_FILE = "lock"
+
+# Content-defined chunking parameters (bytes)
+# Generated games are 10-40 KiB of source, so chunks are kept small enough for
+# a regenerated file to share most of its blobs with the previous build.
+MIN_CHUNK = 1024
+# ~4 KiB average. The mask tests the high bits of the Gear hash, which mix the
+# last 32 bytes; the low bits only see the last few and runs of indentation
+# bias them badly.
+AVG_CHUNK_MASK = ((1 << 12) - 1) << 20
+MAX_CHUNK = 32 * 1024
+
+# Blob header byte: compressed or raw payload
+_ZLIB = b"z"
+_RAW = b"r"
+
+# Fixed pseudo-random table for the Gear hash; seeded so chunk boundaries are stable across runs
+_GEAR = random.Random(0x6A6).sample(range(1 << 32), 256)
+
+
+def iter_chunks(data: bytes) -> Iterator[bytes]:
+    """Split ``data`` into content-defined chunks."""
+    size = len(data)
+    start = 0
+    while start < size:
+        end = min(start + MAX_CHUNK, size)
+        boundary = end
+        fingerprint = 0
+        position = start + MIN_CHUNK
+        # Bytes before MIN_CHUNK still feed the hash so boundaries depend only on content
+        for index in range(start, min(position, end)):
+            fingerprint = ((fingerprint << 1) + _GEAR[data[index]]) & 0xFFFFFFFF
+        for index in range(position, end):
+            fingerprint = ((fingerprint << 1) + _GEAR[data[index]]) & 0xFFFFFFFF
+            if not fingerprint & AVG_CHUNK_MASK:
+                boundary = index + 1
+                break
+        yield data[start:boundary]
+        start = boundary
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Write ``data`` to ``path`` through a temporary file and an atomic rename."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ArtifactStore:
+    """Chunked, compressed, versioned storage for ``output/<game_name>`` folders."""
+
+    def __init__(self, root: str = DEFAULT_STORE_PATH, compress: bool = True):
+        self.root = root
+        self.compress = compress
+        self.objects_dir = os.path.join(root, "objects")
+        self.snapshots_dir = os.path.join(root, "snapshots")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+
+    @contextlib.contextmanager
+    def _locked(self, exclusive: bool = False) -> Iterator[None]:
+        """Hold the store-wide lock: shared for commit/checkout, exclusive for prune/gc."""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.root, LOCK_FILE), "a+b") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    # ------------------------------------------------------------------
+    # Blobs
+    # ------------------------------------------------------------------
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def put_chunk(self, chunk: bytes) -> str:
+        """Store a chunk once and return its digest."""
+        digest = hashlib.sha256(chunk).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            if self.compress:
+                packed = zlib.compress(chunk, 9)
+                payload = _ZLIB + packed if len(packed) < len(chunk) else _RAW + chunk
+            else:
+                payload = _RAW + chunk
+            atomic_write(path, payload)
+        return digest
+
+    def get_chunk(self, digest: str) -> bytes:
+        with open(self._object_path(digest), "rb") as file:
+            payload = file.read()
+        chunk = zlib.decompress(payload[1:]) if payload[:1] == _ZLIB else payload[1:]
+        if hashlib.sha256(chunk).hexdigest() != digest:
+            raise ValueError(f"Corrupt chunk {digest}")
+        return chunk
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+    def _manifest_path(self, game_name: str, snapshot_id: str) -> str:
+        return os.path.join(self.snapshots_dir, game_name, f"{snapshot_id}.json")
+
+    def commit(self, game_name: str, source_dir: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Store every file under ``source_dir`` as a new snapshot and return its id."""
+        with self._locked():
+            files: Dict[str, Dict[str, Any]] = {}
+            for directory, _, names in os.walk(source_dir):
+                for name in sorted(names):
+                    if name.startswith(".tmp-") or name == LATEST_MARKER:
+                        continue
+                    path = os.path.join(directory, name)
+                    relative = os.path.relpath(path, source_dir).replace(os.sep, "/")
+                    with open(path, "rb") as file:
+                        data = file.read()
+                    files[relative] = {
+                        "sha256": hashlib.sha256(data).hexdigest(),
+                        "size": len(data),
+                        "chunks": [self.put_chunk(chunk) for chunk in iter_chunks(data)],
+                    }
+
+            content_hash = hashlib.sha256(json.dumps(files, sort_keys=True).encode("utf-8")).hexdigest()
+            snapshot_id = f"{datetime.datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{content_hash[:8]}"
+            manifest = {
+                "game_name": game_name,
+                "snapshot_id": snapshot_id,
+                "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                "metadata": metadata or {},
+                "files": files,
+            }
+            atomic_write(self._manifest_path(game_name, snapshot_id),
+                         json.dumps(manifest, indent=2).encode("utf-8"))
+            return snapshot_id
+
+    def load_manifest(self, game_name: str, snapshot_id: Optional[str] = None) -> Dict[str, Any]:
+        """Load a snapshot manifest; the newest one when ``snapshot_id`` is omitted."""
+        if snapshot_id is None:
+            snapshots = self.list_snapshots(game_name)
+            if not snapshots:
+                raise FileNotFoundError(f"No snapshots stored for '{game_name}'")
+            snapshot_id = snapshots[-1]
+        with open(self._manifest_path(game_name, snapshot_id), "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def list_snapshots(self, game_name: str) -> List[str]:
+        """Snapshot ids of a game, oldest first."""
+        directory = os.path.join(self.snapshots_dir, game_name)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-5] for name in os.listdir(directory) if name.endswith(".json"))
+
+    def list_games(self) -> List[str]:
+        return sorted(os.listdir(self.snapshots_dir))
+
+    def read_file(self, game_name: str, relative_path: str, snapshot_id: Optional[str] = None) -> bytes:
+        entry = self.load_manifest(game_name, snapshot_id)["files"][relative_path]
+        return b"".join(self.get_chunk(digest) for digest in entry["chunks"])
+
+    def checkout(self, game_name: str, dest_dir: str, snapshot_id: Optional[str] = None) -> str:
+        """Materialize a snapshot into ``dest_dir`` file by file with atomic renames.
+
+        Files unchanged since the currently materialized snapshot are left alone.
+        Files listed in that snapshot (named by the ``.snapshot`` marker) but not
+        in the new one are removed; files no snapshot tracked, such as a game's
+        high-score file, are kept. Returns the snapshot id that was checked out.
+        """
+        with self._locked():
+            manifest = self.load_manifest(game_name, snapshot_id)
+            previous = self._materialized_files(game_name, dest_dir)
+            for relative, entry in manifest["files"].items():
+                target = os.path.join(dest_dir, *relative.split("/"))
+                if os.path.exists(target) and os.path.getsize(target) == entry["size"]:
+                    with open(target, "rb") as file:
+                        if hashlib.sha256(file.read()).hexdigest() == entry["sha256"]:
+                            continue
+                atomic_write(target, b"".join(self.get_chunk(digest) for digest in entry["chunks"]))
+            self._remove_stale_files(dest_dir, set(previous) - set(manifest["files"]))
+            # The marker is written last: it only names a snapshot once every file is in place
+            atomic_write(os.path.join(dest_dir, LATEST_MARKER), manifest["snapshot_id"].encode("utf-8"))
+            return manifest["snapshot_id"]
+
+    def _materialized_files(self, game_name: str, dest_dir: str) -> Dict[str, Any]:
+        """Files of the snapshot the ``.snapshot`` marker in ``dest_dir`` names; empty if unknown."""
+        try:
+            with open(os.path.join(dest_dir, LATEST_MARKER), "r", encoding="utf-8") as file:
+                snapshot_id = file.read().strip()
+            return self.load_manifest(game_name, snapshot_id)["files"] if snapshot_id else {}
+        except (OSError, ValueError):
+            # No marker yet, or its snapshot was pruned: nothing is known to be ours to delete
+            return {}
+
+    @staticmethod
+    def _remove_stale_files(dest_dir: str, stale: Set[str]) -> None:
+        """Delete the ``stale`` relative paths under ``dest_dir``, then any folders they leave empty."""
+        root = os.path.normpath(dest_dir)
+        for relative in sorted(stale):
+            path = os.path.join(root, *relative.split("/"))
+            if os.path.isfile(path):
+                os.remove(path)
+            directory = os.path.dirname(path)
+            while directory != root and os.path.isdir(directory) and not os.listdir(directory):
+                os.rmdir(directory)
+                directory = os.path.dirname(directory)
+
+    # ------------------------------------------------------------------
+    # Housekeeping
+    # ------------------------------------------------------------------
+    def prune(self, game_name: str, keep: int) -> List[str]:
+        """Delete all but the newest ``keep`` snapshots of a game. Run ``gc`` afterwards."""
+        with self._locked(exclusive=True):
+            snapshots = self.list_snapshots(game_name)
+            removed = snapshots[:-keep] if keep > 0 else snapshots
+            for snapshot_id in removed:
+                os.remove(self._manifest_path(game_name, snapshot_id))
+            return removed
+
+    def gc(self) -> int:
+        """Remove chunks no snapshot references. Returns the number of blobs removed."""
+        with self._locked(exclusive=True):
+            referenced = set()
+            for game_name in self.list_games():
+                for snapshot_id in self.list_snapshots(game_name):
+                    for entry in self.load_manifest(game_name, snapshot_id)["files"].values():
+                        referenced.update(entry["chunks"])
+            removed = 0
+            for prefix in os.listdir(self.objects_dir):
+                prefix_dir = os.path.join(self.objects_dir, prefix)
+                for name in os.listdir(prefix_dir):
+                    if prefix + name not in referenced:
+                        os.remove(os.path.join(prefix_dir, name))
+                        removed += 1
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Logical size of all snapshots versus bytes actually stored."""
+        logical = 0
+        snapshots = 0
+        for game_name in self.list_games():
+            for snapshot_id in self.list_snapshots(game_name):
+                snapshots += 1
+                logical += sum(entry["size"] for entry in self.load_manifest(game_name, snapshot_id)["files"].values())
+        stored = 0
+        blobs = 0
+        for directory, _, names in os.walk(self.objects_dir):
+            for name in names:
+                blobs += 1
+                stored += os.path.getsize(os.path.join(directory, name))
+        return {
+            "snapshots": snapshots,
+            "blobs": blobs,
+            "logical_bytes": logical,
+            "stored_bytes": stored,
+            "ratio": round(stored / logical, 4) if logical else None,
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line interface for browsing and restoring stored builds."""
+    parser = argparse.ArgumentParser(prog="artifacts", description="Manage stored game build snapshots.")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Path to the artifact store")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    listing = sub.add_parser("list", help="List snapshots of a game, or all games")
+    listing.add_argument("game", nargs="?")
+
+    checkout = sub.add_parser("checkout", help="Restore a snapshot into a folder")
+    checkout.add_argument("game")
+    checkout.add_argument("snapshot", nargs="?", help="Defaults to the newest snapshot")
+    checkout.add_argument("--dest", help="Defaults to output/<game>")
+
+    prune = sub.add_parser("prune", help="Keep only the newest snapshots of a game")
+    prune.add_argument("game")
+    prune.add_argument("--keep", type=int, default=10)
+
+    sub.add_parser("gc", help="Delete unreferenced blobs")
+    sub.add_parser("stats", help="Show deduplication and compression savings")
+
+    args = parser.parse_args(argv)
+    store = ArtifactStore(args.store)
+
+    if args.command == "list":
+        if args.game:
+            for snapshot_id in store.list_snapshots(args.game):
+                print(snapshot_id)
+        else:
+            for game_name in store.list_games():
+                print(f"{game_name}: {len(store.list_snapshots(game_name))} snapshots")
+    elif args.command == "checkout":
+        dest = args.dest or os.path.join(os.path.dirname(os.path.abspath(args.store)), args.game)
+        print(store.checkout(args.game, dest, args.snapshot))
+    elif args.command == "prune":
+        removed = store.prune(args.game, args.keep)
+        print(f"Removed {len(removed)} snapshots, {store.gc()} blobs")
+    elif args.command == "gc":
+        print(f"Removed {store.gc()} blobs")
+    elif args.command == "stats":
+        print(json.dumps(store.stats(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,457 @@
+"""
+SQLite catalog of crew builds.
+
+Every ``CrewPythonGameBuilder`` run records one row in ``builds`` (inputs hash,
+token usage, validation and benchmark results) plus one row per task in
+``task_runs``. The history answers questions such as "slowest code_task in the
+last 50 builds" or "FPS trend for pong", and backs the scheduling estimate and
+regression gate helpers below.
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import statistics
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+
+DEFAULT_CATALOG_PATH = os.path.join("output", "build_catalog.db")
+
+# Metrics a regression gate can check, and whether higher values are better
+GATE_METRICS = {
+    "fps": True,
+    "peak_memory_mb": False,
+    "duration_s": False,
+    "total_tokens": False,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    game_key TEXT NOT NULL,
+    game_name TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    duration_s REAL,
+    status TEXT NOT NULL DEFAULT 'running',
+    inputs_hash TEXT,
+    config_hash TEXT,
+    total_tokens INTEGER,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    successful_requests INTEGER,
+    syntax_valid INTEGER,
+    validation_errors INTEGER,
+    validation_warnings INTEGER,
+    validation_json TEXT,
+    fps REAL,
+    peak_memory_mb REAL,
+    benchmark_json TEXT,
+    snapshot_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_builds_game_started ON builds (game_key, started_at);
+CREATE INDEX IF NOT EXISTS idx_builds_inputs_hash ON builds (inputs_hash);
+
+CREATE TABLE IF NOT EXISTS task_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    build_id INTEGER NOT NULL REFERENCES builds (id) ON DELETE CASCADE,
+    task_name TEXT NOT NULL,
+    agent TEXT,
+    duration_s REAL NOT NULL,
+    output_chars INTEGER,
+    model TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_task_runs_build ON task_runs (build_id);
+CREATE INDEX IF NOT EXISTS idx_task_runs_task_duration ON task_runs (task_name, duration_s);
+
+CREATE TABLE IF NOT EXISTS repairs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    build_id INTEGER NOT NULL REFERENCES builds (id) ON DELETE CASCADE,
+    attempt INTEGER NOT NULL,
+    error TEXT,
+    region TEXT,
+    start_line INTEGER,
+    end_line INTEGER,
+    succeeded INTEGER NOT NULL,
+    tokens INTEGER,
+    latency_s REAL,
+    tokens_saved INTEGER,
+    latency_saved_s REAL
+);
+CREATE INDEX IF NOT EXISTS idx_repairs_build ON repairs (build_id);
+
+CREATE TABLE IF NOT EXISTS review_patches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    build_id INTEGER NOT NULL REFERENCES builds (id) ON DELETE CASCADE,
+    title TEXT,
+    severity TEXT,
+    start_line INTEGER,
+    end_line INTEGER,
+    status TEXT NOT NULL,
+    reason TEXT,
+    fps_before REAL,
+    fps_after REAL
+);
+CREATE INDEX IF NOT EXISTS idx_review_patches_build ON review_patches (build_id);
+"""
+
+# Columns added after the first release of the catalog, applied to older databases on open
+MIGRATIONS = {
+    "builds": [("snapshot_id", "TEXT")],
+    "task_runs": [("model", "TEXT")],
+}
+
+# Rough characters-per-token ratio, used where crewAI only reports crew-wide token totals
+CHARS_PER_TOKEN = 4
+
+
+def hash_payload(payload: Any) -> str:
+    """Stable SHA-256 of any JSON-serializable payload."""
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def hash_files(paths: Iterable[str]) -> str:
+    """SHA-256 over the contents of several files, in the given order."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.encode("utf-8"))
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                digest.update(file.read())
+    return digest.hexdigest()
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+class RunCatalog:
+    """Thin wrapper around the SQLite build catalog."""
+
+    def __init__(self, path: str = DEFAULT_CATALOG_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_task_runs_agent_model ON task_runs (agent, model)")
+
+    def _migrate(self) -> None:
+        for table, columns in MIGRATIONS.items():
+            existing = {row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            for name, column_type in columns:
+                if name not in existing:
+                    with self.conn:
+                        self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "RunCatalog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def start_build(self, game_key: str, game_name: str, inputs_hash: str, config_hash: str) -> int:
+        """Insert a build in the ``running`` state and return its id."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO builds (game_key, game_name, started_at, inputs_hash, config_hash) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (game_key, game_name, _now(), inputs_hash, config_hash),
+            )
+        return cursor.lastrowid
+
+    def record_task(self, build_id: int, task_name: str, agent: Optional[str],
+                    duration_s: float, output_chars: Optional[int] = None,
+                    model: Optional[str] = None) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO task_runs (build_id, task_name, agent, duration_s, output_chars, model) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (build_id, task_name, agent, duration_s, output_chars, model),
+            )
+
+    def record_repair(self, build_id: int, attempt: Dict[str, Any]) -> None:
+        """Store one repair attempt as reported by ``RepairLoop.run``."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO repairs (build_id, attempt, error, region, start_line, end_line, succeeded, "
+                "tokens, latency_s, tokens_saved, latency_saved_s) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (build_id, attempt["attempt"], attempt["error"], attempt["region"], attempt["start_line"],
+                 attempt["end_line"], int(attempt["succeeded"]), attempt["tokens"], attempt["latency_s"],
+                 attempt["tokens_saved"], attempt["latency_saved_s"]),
+            )
+
+    def record_review_patch(self, build_id: int, result: Dict[str, Any]) -> None:
+        """Store the outcome of one review patch as reported by ``apply_findings``."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO review_patches (build_id, title, severity, start_line, end_line, status, reason, "
+                "fps_before, fps_after) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (build_id, result["title"], result["severity"], result["start_line"], result["end_line"],
+                 result["status"], result["reason"], result["fps_before"], result["fps_after"]),
+            )
+
+    def finish_build(self, build_id: int, status: str, duration_s: float,
+                     token_usage: Optional[Dict[str, Any]] = None,
+                     validation: Optional[Dict[str, Any]] = None,
+                     benchmark: Optional[Dict[str, Any]] = None,
+                     snapshot_id: Optional[str] = None) -> None:
+        """Complete a build row with its final status and measurements."""
+        token_usage = token_usage or {}
+        validation = validation or {}
+        benchmark = benchmark or {}
+        with self.conn:
+            self.conn.execute(
+                """
+                UPDATE builds SET
+                    finished_at = ?, duration_s = ?, status = ?,
+                    total_tokens = ?, prompt_tokens = ?, completion_tokens = ?, successful_requests = ?,
+                    syntax_valid = ?, validation_errors = ?, validation_warnings = ?, validation_json = ?,
+                    fps = ?, peak_memory_mb = ?, benchmark_json = ?, snapshot_id = ?
+                WHERE id = ?
+                """,
+                (
+                    _now(), duration_s, status,
+                    token_usage.get("total_tokens"), token_usage.get("prompt_tokens"),
+                    token_usage.get("completion_tokens"), token_usage.get("successful_requests"),
+                    None if not validation else int(bool(validation.get("syntax_valid"))),
+                    len(validation.get("errors", [])) if validation else None,
+                    len(validation.get("warnings", [])) if validation else None,
+                    json.dumps(validation) if validation else None,
+                    benchmark.get("fps"), benchmark.get("peak_memory_mb"),
+                    json.dumps(benchmark) if benchmark else None,
+                    snapshot_id,
+                    build_id,
+                ),
+            )
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def resolve_game_key(self, game: str) -> str:
+        """Accept either a game key or part of a game name, like ``crewai run`` does."""
+        row = self.conn.execute(
+            "SELECT game_key FROM builds WHERE game_key = ? OR lower(game_name) LIKE ? "
+            "ORDER BY id DESC LIMIT 1",
+            (game, f"%{game.lower()}%"),
+        ).fetchone()
+        return row["game_key"] if row else game
+
+    def recent_builds(self, game: Optional[str] = None, last: int = 20) -> List[sqlite3.Row]:
+        if game:
+            return self.conn.execute(
+                "SELECT * FROM builds WHERE game_key = ? ORDER BY id DESC LIMIT ?",
+                (self.resolve_game_key(game), last),
+            ).fetchall()
+        return self.conn.execute("SELECT * FROM builds ORDER BY id DESC LIMIT ?", (last,)).fetchall()
+
+    def slowest_tasks(self, task_name: str, last: int = 50, limit: int = 10) -> List[sqlite3.Row]:
+        """Slowest runs of ``task_name`` among the last ``last`` builds."""
+        return self.conn.execute(
+            """
+            SELECT t.duration_s, t.agent, t.output_chars, b.id AS build_id, b.game_key, b.started_at
+            FROM task_runs t JOIN builds b ON b.id = t.build_id
+            WHERE t.task_name = ? AND b.id IN (SELECT id FROM builds ORDER BY id DESC LIMIT ?)
+            ORDER BY t.duration_s DESC LIMIT ?
+            """,
+            (task_name, last, limit),
+        ).fetchall()
+
+    def metric_trend(self, game: str, metric: str, last: int = 20) -> List[sqlite3.Row]:
+        """Chronological values of one ``builds`` metric for a game."""
+        if metric not in GATE_METRICS and metric not in ("completion_tokens", "prompt_tokens"):
+            raise ValueError(f"Unknown metric '{metric}'")
+        rows = self.conn.execute(
+            f"SELECT id, started_at, {metric} AS value FROM builds "
+            f"WHERE game_key = ? AND {metric} IS NOT NULL ORDER BY id DESC LIMIT ?",
+            (self.resolve_game_key(game), last),
+        ).fetchall()
+        return list(reversed(rows))
+
+    def expected_task_durations(self, game: Optional[str] = None, last: int = 20) -> Dict[str, float]:
+        """Median duration per task over recent successful builds, for scheduling."""
+        query = (
+            "SELECT t.task_name, t.duration_s FROM task_runs t JOIN builds b ON b.id = t.build_id "
+            "WHERE b.status = 'completed'"
+        )
+        params: List[Any] = []
+        if game:
+            query += " AND b.game_key = ?"
+            params.append(self.resolve_game_key(game))
+        query += " AND b.id IN (SELECT id FROM builds ORDER BY id DESC LIMIT ?)"
+        params.append(last)
+
+        durations: Dict[str, List[float]] = {}
+        for row in self.conn.execute(query, params):
+            durations.setdefault(row["task_name"], []).append(row["duration_s"])
+        return {name: statistics.median(values) for name, values in durations.items()}
+
+    def expected_build_duration(self, game: str, last: int = 20) -> Optional[float]:
+        """Median end-to-end duration of recent completed builds of ``game``."""
+        values = [
+            row["duration_s"] for row in self.conn.execute(
+                "SELECT duration_s FROM builds WHERE game_key = ? AND status = 'completed' "
+                "AND duration_s IS NOT NULL ORDER BY id DESC LIMIT ?",
+                (self.resolve_game_key(game), last),
+            )
+        ]
+        return statistics.median(values) if values else None
+
+    def model_history(self, agent: str, last: int = 50) -> List[sqlite3.Row]:
+        """Recent task runs of ``agent`` with the model used and whether the build succeeded.
+
+        A run counts as successful when its build completed and, if the build was
+        validated, the generated code had valid syntax.
+        """
+        return self.conn.execute(
+            """
+            SELECT t.task_name, t.model, t.duration_s, t.output_chars, b.id AS build_id,
+                   (b.status = 'completed' AND COALESCE(b.syntax_valid, 1) = 1) AS succeeded
+            FROM task_runs t JOIN builds b ON b.id = t.build_id
+            WHERE t.agent = ? AND t.model IS NOT NULL
+            ORDER BY t.id DESC LIMIT ?
+            """,
+            (agent, last),
+        ).fetchall()
+
+    def check_regression(self, build_id: int, baseline: int = 10,
+                         tolerance: float = 0.10) -> Dict[str, Any]:
+        """Compare a build against the median of the previous ``baseline`` builds of the same game.
+
+        A metric regresses when it is worse than the baseline median by more
+        than ``tolerance`` (a fraction). Metrics missing on either side are skipped.
+        """
+        build = self.conn.execute("SELECT * FROM builds WHERE id = ?", (build_id,)).fetchone()
+        if build is None:
+            raise ValueError(f"Build {build_id} not found")
+
+        history = self.conn.execute(
+            "SELECT * FROM builds WHERE game_key = ? AND id < ? AND status = 'completed' "
+            "ORDER BY id DESC LIMIT ?",
+            (build["game_key"], build_id, baseline),
+        ).fetchall()
+
+        report: Dict[str, Any] = {"build_id": build_id, "game_key": build["game_key"],
+                                  "baseline_builds": len(history), "passed": True, "metrics": {}}
+        for metric, higher_is_better in GATE_METRICS.items():
+            values = [row[metric] for row in history if row[metric] is not None]
+            current = build[metric]
+            if current is None or not values:
+                continue
+            reference = statistics.median(values)
+            if reference == 0:
+                continue
+            change = (current - reference) / reference
+            regressed = change < -tolerance if higher_is_better else change > tolerance
+            report["metrics"][metric] = {
+                "current": current,
+                "baseline_median": reference,
+                "change": round(change, 4),
+                "regressed": regressed,
+            }
+            if regressed:
+                report["passed"] = False
+        return report
+
+
+def _print_rows(rows: List[sqlite3.Row], columns: List[str]) -> None:
+    if not rows:
+        print("No matching builds recorded.")
+        return
+    print("  ".join(f"{column:>14}" for column in columns))
+    for row in rows:
+        print("  ".join(f"{str(row[column]):>14}" for column in columns))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line interface for querying the build catalog."""
+    parser = argparse.ArgumentParser(prog="catalog", description="Query the game build catalog.")
+    parser.add_argument("--db", default=DEFAULT_CATALOG_PATH, help="Path to the catalog database")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    repairs = sub.add_parser("repairs", help="Targeted repairs and what they saved")
+    repairs.add_argument("--last", type=int, default=20)
+
+    patches = sub.add_parser("patches", help="Review patches and whether they were kept")
+    patches.add_argument("--last", type=int, default=20)
+
+    history = sub.add_parser("history", help="List recent builds")
+    history.add_argument("game", nargs="?")
+    history.add_argument("--last", type=int, default=20)
+
+    slowest = sub.add_parser("slowest", help="Slowest runs of a task, e.g. code_task")
+    slowest.add_argument("task")
+    slowest.add_argument("--last", type=int, default=50, help="Only consider the last N builds")
+    slowest.add_argument("--limit", type=int, default=10)
+
+    trend = sub.add_parser("trend", help="Trend of a metric for one game, e.g. fps for pong")
+    trend.add_argument("game")
+    trend.add_argument("--metric", default="fps")
+    trend.add_argument("--last", type=int, default=20)
+
+    estimate = sub.add_parser("estimate", help="Expected task durations from history")
+    estimate.add_argument("game", nargs="?")
+    estimate.add_argument("--last", type=int, default=20)
+
+    gate = sub.add_parser("gate", help="Fail if a build regressed against its history")
+    gate.add_argument("build_id", type=int, nargs="?", help="Defaults to the latest build")
+    gate.add_argument("--baseline", type=int, default=10)
+    gate.add_argument("--tolerance", type=float, default=0.10)
+
+    args = parser.parse_args(argv)
+
+    with RunCatalog(args.db) as catalog:
+        if args.command == "history":
+            _print_rows(catalog.recent_builds(args.game, args.last),
+                        ["id", "game_key", "started_at", "status", "duration_s", "total_tokens", "fps"])
+        elif args.command == "repairs":
+            rows = catalog.conn.execute(
+                "SELECT r.*, b.game_key FROM repairs r JOIN builds b ON b.id = r.build_id "
+                "ORDER BY r.id DESC LIMIT ?", (args.last,)
+            ).fetchall()
+            _print_rows(rows, ["build_id", "game_key", "region", "start_line", "succeeded",
+                               "tokens", "tokens_saved", "latency_s", "latency_saved_s"])
+        elif args.command == "patches":
+            rows = catalog.conn.execute(
+                "SELECT p.*, b.game_key FROM review_patches p JOIN builds b ON b.id = p.build_id "
+                "ORDER BY p.id DESC LIMIT ?", (args.last,)
+            ).fetchall()
+            _print_rows(rows, ["build_id", "game_key", "severity", "start_line", "status", "fps_before", "fps_after"])
+        elif args.command == "slowest":
+            _print_rows(catalog.slowest_tasks(args.task, args.last, args.limit),
+                        ["build_id", "game_key", "started_at", "agent", "duration_s"])
+        elif args.command == "trend":
+            _print_rows(catalog.metric_trend(args.game, args.metric, args.last), ["id", "started_at", "value"])
+        elif args.command == "estimate":
+            for task_name, seconds in sorted(catalog.expected_task_durations(args.game, args.last).items()):
+                print(f"{task_name:>20}  {seconds:8.1f}s")
+        elif args.command == "gate":
+            build_id = args.build_id
+            if build_id is None:
+                latest = catalog.recent_builds(last=1)
+                if not latest:
+                    print("No builds recorded.")
+                    return 1
+                build_id = latest[0]["id"]
+            report = catalog.check_regression(build_id, args.baseline, args.tolerance)
+            print(json.dumps(report, indent=2))
+            return 0 if report["passed"] else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
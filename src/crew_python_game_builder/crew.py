@@ -1,10 +1,28 @@
-from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
+from crewai import Agent, Crew, LLM, Process, Task
+from crewai.project import CrewBase, agent, crew, task, before_kickoff, after_kickoff
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from typing import List
+from typing import Any, Dict, List, Optional
 import os
+import shutil
+import threading
+import time
+import json
 import datetime
-from .tools.custom_tool import CodeValidationTool, GameArchitectureTool, PerformanceOptimizerTool
+from .tools.custom_tool import CodeValidationTool, ComponentSearchTool, GameArchitectureTool, PerformanceOptimizerTool
+from .catalog import RunCatalog, DEFAULT_CATALOG_PATH, hash_payload, hash_files
+from .headless import benchmark_game
+from .sandbox import start_shared_pool
+from .artifacts import ArtifactStore, DEFAULT_STORE_PATH
+from .settings import SystemConfig, load_system_config
+from .routing import ModelRouter
+from .repair import RepairLoop, crewai_completion, find_error
+from .patches import ReviewFindings, apply_findings, load_findings
+from .modular import ModularGenerationLLM
+from .snippets import component_references
+from .gamekit import gamekit_reference
+from .vendoring import vendor_gamekit
+
+CONFIG_DIR = os.path.join(os.path.dirname(__file__), 'config')
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
 # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
@@ -18,14 +36,318 @@ class CrewPythonGameBuilder():
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
     
-    def __init__(self, game_name: str = None):
+    def __init__(self, game_name: str = None, game_key: str = None, catalog_path: str = DEFAULT_CATALOG_PATH,
+                 config_overrides: Optional[Dict[str, Any]] = None, environment: Optional[str] = None):
         """Initialize the crew with an optional game name for folder organization"""
         super().__init__()
+        # Typed system_config.yaml, with environment and per-run overrides applied
+        self.settings: SystemConfig = load_system_config(environment=environment, overrides=config_overrides)
         self.game_name = game_name or f"game_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.game_key = game_key or self.game_name
         self.output_folder = f"output/{self.game_name}"
+        # Tasks write into a private staging folder; the output folder is only
+        # updated from the artifact store once the whole build has succeeded
+        self.staging_folder = f"output/.staging/{self.game_name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
         
-        # Create the output folder if it doesn't exist
+        # Create the output folders if they don't exist
         os.makedirs(self.output_folder, exist_ok=True)
+        os.makedirs(self.staging_folder, exist_ok=True)
+
+        # Build history is recorded in the SQLite run catalog
+        self.catalog_path = catalog_path
+        self.build_id: Optional[int] = None
+        self._build_started = 0.0
+        self._last_task_mark = 0.0
+        self.task_durations: Dict[str, float] = {}
+
+        # Model routing: which model each agent got, and agent roles back to agents.yaml keys
+        self.router = ModelRouter(self.settings, catalog_path)
+        self.agent_models: Dict[str, str] = {}
+        self._agent_roles: Dict[str, str] = {}
+        self._agent_option_cache: Dict[str, Dict[str, Any]] = {}
+        self._inputs: Dict[str, Any] = {}
+
+    # Run catalog bookkeeping: one build row per kickoff, one task row per task
+    @before_kickoff
+    def start_build_record(self, inputs):
+        """Open a catalog row for this build before any task runs"""
+        config_files = [os.path.join(CONFIG_DIR, name) for name in ('agents.yaml', 'tasks.yaml', 'system_config.yaml')]
+        with RunCatalog(self.catalog_path) as catalog:
+            self.build_id = catalog.start_build(
+                game_key=self.game_key,
+                game_name=self.game_name,
+                inputs_hash=hash_payload(inputs),
+                # Covers the YAML files plus any environment or per-run overrides
+                config_hash=hash_payload({'files': hash_files(config_files), 'settings': self.settings.model_dump()}),
+            )
+        self._build_started = self._last_task_mark = time.perf_counter()
+        self._inputs = dict(inputs or {})
+        return inputs
+
+    @before_kickoff
+    def start_sandbox_pool(self, inputs):
+        """Warm the sandbox workers in the background while the design tasks run"""
+        sandbox = self.settings.sandbox_settings
+        if sandbox.enabled:
+            threading.Thread(
+                target=start_shared_pool,
+                kwargs={'workers': sandbox.workers, 'cpu_limit_s': sandbox.cpu_limit_s,
+                        'memory_limit_mb': sandbox.memory_limit_mb, 'wall_timeout_s': sandbox.wall_timeout_s},
+                daemon=True,
+            ).start()
+        return inputs
+
+    @before_kickoff
+    def add_component_references(self, inputs):
+        """Retrieve components of earlier games for code_task's {component_references}"""
+        snippet_settings = self.settings.snippet_settings
+        if not snippet_settings.enabled or not snippet_settings.max_references:
+            references = "None."
+        else:
+            references = component_references(
+                inputs.get('game', ''),
+                limit=snippet_settings.max_references,
+                max_chars=snippet_settings.max_reference_chars,
+                max_snippet_chars=snippet_settings.max_snippet_chars,
+                min_score=snippet_settings.min_score,
+                # A regenerated game must not be shown the output it is replacing
+                exclude_games=[self.game_name],
+            )
+        inputs['component_references'] = references
+        self._inputs['component_references'] = references
+        return inputs
+
+    @before_kickoff
+    def add_gamekit_reference(self, inputs):
+        """Describe the game kit modules for code_task's {gamekit_reference}"""
+        gamekit_settings = self.settings.gamekit_settings
+        reference = gamekit_reference(gamekit_settings.modules) if gamekit_settings.enabled else "None."
+        inputs['gamekit_reference'] = reference
+        self._inputs['gamekit_reference'] = reference
+        return inputs
+
+    def record_task_output(self, output) -> None:
+        """Task callback: tasks run sequentially, so each duration is the time since the previous one finished"""
+        now = time.perf_counter()
+        duration = now - self._last_task_mark
+        self._last_task_mark = now
+        if self.build_id is None:
+            return
+        task_name = getattr(output, 'name', None) or 'unknown_task'
+        self.task_durations[task_name] = duration
+        role = (getattr(output, 'agent', None) or '').strip()
+        agent_name = self._agent_roles.get(role, role or None)
+        with RunCatalog(self.catalog_path) as catalog:
+            catalog.record_task(
+                self.build_id,
+                task_name=task_name,
+                agent=agent_name,
+                duration_s=round(duration, 3),
+                output_chars=len(getattr(output, 'raw', '') or ''),
+                model=self.agent_models.get(agent_name),
+            )
+
+    @after_kickoff
+    def finish_build_record(self, result):
+        """Validate and benchmark the generated game, then close the catalog row"""
+        token_usage = getattr(result, 'token_usage', None)
+        if token_usage is not None and hasattr(token_usage, 'model_dump'):
+            token_usage = token_usage.model_dump()
+        self._finish_build('completed', token_usage=token_usage)
+        return result
+
+    def mark_build_failed(self) -> None:
+        """Close the catalog row of a build whose kickoff raised"""
+        self._finish_build('failed')
+
+    def _finish_build(self, status: str, token_usage: Optional[dict] = None) -> None:
+        validation = None
+        benchmark = None
+        repair_attempts: List[dict] = []
+        review_patches: Optional[dict] = None
+        game_path = os.path.join(self.staging_folder, 'generated_game.py')
+        if os.path.exists(game_path):
+            validation, benchmark = self._check_game(game_path, run_benchmark=status == 'completed')
+            if (status == 'completed' and self.settings.repair_settings.enabled
+                    and find_error(validation, benchmark, game_path)):
+                repair_attempts = self._repair_game(game_path, validation, benchmark)
+                if repair_attempts:
+                    validation, benchmark = self._check_game(game_path, run_benchmark=True)
+            if status == 'completed' and self.settings.review_patch_settings.enabled:
+                review_patches = self._apply_review_patches(game_path, validation, benchmark)
+                if review_patches is not None:
+                    validation, benchmark = review_patches['validation'], review_patches['benchmark']
+
+        snapshot_id = self._publish_outputs() if status == 'completed' else None
+        shutil.rmtree(self.staging_folder, ignore_errors=True)
+
+        if self.build_id is None:
+            return
+        with RunCatalog(self.catalog_path) as catalog:
+            for attempt in repair_attempts:
+                catalog.record_repair(self.build_id, attempt)
+            for result in (review_patches or {}).get('patches', []):
+                catalog.record_review_patch(self.build_id, result)
+            catalog.finish_build(
+                self.build_id,
+                status=status,
+                duration_s=round(time.perf_counter() - self._build_started, 3),
+                token_usage=token_usage,
+                validation=validation,
+                benchmark=benchmark,
+                snapshot_id=snapshot_id,
+            )
+
+    def _check_game(self, game_path: str, run_benchmark: bool):
+        """Syntax validation plus, when enabled, the headless frame benchmark"""
+        with open(game_path, 'r', encoding='utf-8') as file:
+            validation = json.loads(CodeValidationTool()._run(file.read()))
+        benchmark = None
+        if run_benchmark and validation.get('syntax_valid') and self.settings.integration_settings.run_performance_test:
+            benchmark = benchmark_game(game_path)
+        return validation, benchmark
+
+    def _repair_game(self, game_path: str, validation: dict, benchmark: Optional[dict]) -> List[dict]:
+        """Fix the failing region of the generated game instead of regenerating the whole file"""
+        repair_settings = self.settings.repair_settings
+        model = repair_settings.model or self.agent_models.get('senior_engineer_agent') or self.settings.default_model()
+        print(f"🔧 Generated game fails validation, repairing with {model}")
+        loop = RepairLoop(
+            crewai_completion(model, repair_settings.temperature),
+            max_attempts=repair_settings.max_attempts,
+            runtime_check_frames=repair_settings.runtime_check_frames,
+            context_lines=repair_settings.context_lines,
+            # This build's own code_task is what a full regeneration would cost again
+            full_regeneration_latency_s=self.task_durations.get('code_task'),
+        )
+        report = loop.run(game_path, validation, benchmark)
+        for attempt in report['attempts']:
+            print(f"   attempt {attempt['attempt']}: {attempt['region']} (lines {attempt['start_line']}-{attempt['end_line']}) "
+                  f"{'fixed' if attempt['succeeded'] else 'still failing'}, ~{attempt['tokens_saved']} tokens saved")
+        return report['attempts']
+
+    def _apply_review_patches(self, game_path: str, validation: dict, benchmark: Optional[dict]) -> Optional[dict]:
+        """Apply review_patch_task's diffs one by one, keeping those that don't regress"""
+        findings_path = os.path.join(self.staging_folder, 'review_findings.json')
+        if not os.path.exists(findings_path):
+            return None
+        try:
+            findings = load_findings(findings_path)
+        except ValueError as e:
+            print(f"⚠️ Could not read review findings: {e}")
+            return None
+
+        patch_settings = self.settings.review_patch_settings
+        report = apply_findings(
+            game_path,
+            findings,
+            check=lambda path: self._check_game(path, run_benchmark=True),
+            max_patches=patch_settings.max_patches,
+            fps_tolerance=patch_settings.fps_tolerance,
+            baseline=(validation, benchmark),
+        )
+        print(f"🩹 Applied {report['applied']} of {len(report['patches'])} review patches")
+        return report
+
+    def _publish_outputs(self) -> str:
+        """Snapshot the staged outputs into the artifact store and refresh the latest view"""
+        crew_settings = self.settings.crew_settings
+        store = ArtifactStore(DEFAULT_STORE_PATH, compress=crew_settings.compress_outputs)
+        # Published games must run without this package installed
+        if os.path.exists(os.path.join(self.staging_folder, 'generated_game.py')):
+            vendored = vendor_gamekit(self.staging_folder)
+            if vendored:
+                print(f"📦 Copied game kit modules into the game: {', '.join(vendored)}")
+        snapshot_id = store.commit(self.game_name, self.staging_folder,
+                                   metadata={'game_key': self.game_key, 'build_id': self.build_id})
+        store.checkout(self.game_name, self.output_folder, snapshot_id)
+        if not crew_settings.create_backups:
+            # Without backups only the latest snapshot is kept
+            store.prune(self.game_name, keep=1)
+            store.gc()
+        return snapshot_id
+
+    def _agent_options(self, agent_name: str) -> Dict[str, Any]:
+        """Agent keyword arguments from agent_settings, capped by the crew-wide budgets
+
+        Computed once per agent, so the router is consulted once even when two
+        agents are built from the same config (see ``_code_agent``).
+        """
+        if agent_name not in self._agent_option_cache:
+            self._agent_option_cache[agent_name] = self._build_agent_options(agent_name)
+        return dict(self._agent_option_cache[agent_name])
+
+    def _build_agent_options(self, agent_name: str) -> Dict[str, Any]:
+        agent_settings = self.settings.agent_settings.for_agent(agent_name)
+        crew_settings = self.settings.crew_settings
+        options: Dict[str, Any] = {
+            'allow_delegation': agent_settings.allow_delegation,
+            'verbose': crew_settings.verbose_logging,
+            'max_iter': min(agent_settings.max_iter, crew_settings.max_iterations),
+            'max_execution_time': min(agent_settings.max_execution_time, crew_settings.execution_timeout),
+            'memory': agent_settings.memory and crew_settings.memory_enabled,
+        }
+        # Only build an explicit LLM when routing or the config asks for a model or temperature
+        decision = self.router.choose(agent_name)
+        if decision is not None:
+            print(f"🔀 {agent_name}: {decision.model} ({decision.reason})")
+            # The latency budget doubles as the request timeout; litellm then tries the fallbacks
+            options['llm'] = LLM(model=decision.model, temperature=agent_settings.temperature,
+                                 timeout=decision.latency_budget_s, fallbacks=decision.fallbacks)
+            model = decision.model
+        elif agent_settings.model or agent_settings.temperature is not None:
+            model = agent_settings.model or self.settings.default_model()
+            options['llm'] = LLM(model=model, temperature=agent_settings.temperature)
+        else:
+            model = self.settings.default_model()
+
+        self.agent_models[agent_name] = model
+        self._agent_roles[self.agents_config[agent_name]['role'].strip()] = agent_name  # type: ignore[index]
+        return options
+
+    def _validation_tool(self) -> CodeValidationTool:
+        """Validation tool for agents, with a sandboxed smoke run when configured"""
+        sandbox = self.settings.sandbox_settings
+        return CodeValidationTool(smoke_frames=sandbox.validation_smoke_frames if sandbox.enabled else 0)
+
+    def _optimizer_tool(self) -> PerformanceOptimizerTool:
+        """Performance tool for agents, with sandboxed runtime profiling when configured"""
+        sandbox = self.settings.sandbox_settings
+        return PerformanceOptimizerTool(profile_frames=sandbox.optimizer_profile_frames if sandbox.enabled else 0)
+
+    def _design_context(self) -> Dict[str, Any]:
+        """Game spec and design documents the earlier tasks wrote to staging, for modular generation"""
+        references = self._inputs.get('component_references', '')
+        if self._inputs.get('gamekit_reference', 'None.') != 'None.':
+            references += "\n\nGAME KIT modules to import instead of re-implementing:\n" + self._inputs['gamekit_reference']
+        context: Dict[str, Any] = {'game': self._inputs.get('game', ''), 'references': references}
+        for key, file_name in (('architecture', 'architecture_design.md'), ('ui_spec', 'ui_design_specs.md'),
+                               ('audio_spec', 'audio_design_specs.md')):
+            path = os.path.join(self.staging_folder, file_name)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as file:
+                    context[key] = file.read()
+        return context
+
+    def _code_agent(self) -> Agent:
+        """Agent for code_task: the senior engineer, or its modular-generation twin"""
+        modular = self.settings.modular_generation
+        if not modular.enabled:
+            return self.senior_engineer_agent()
+        options = self._agent_options('senior_engineer_agent')
+        delegate = options.get('llm') or LLM(model=self.agent_models['senior_engineer_agent'])
+        options['llm'] = ModularGenerationLLM(
+            delegate,
+            load_context=self._design_context,
+            min_classes=modular.min_classes,
+            max_workers=modular.max_workers,
+            max_modules=modular.max_modules,
+        )
+        return Agent(
+            config=self.agents_config['senior_engineer_agent'], # type: ignore[index]
+            tools=[self._validation_tool(), GameArchitectureTool(), self._optimizer_tool(), ComponentSearchTool()],
+            **options
+        )
 
     # Learn more about YAML configuration files here:
     # Agents: https://docs.crewai.com/concepts/agents#yaml-configuration-recommended
@@ -37,49 +359,37 @@ class CrewPythonGameBuilder():
     def senior_engineer_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['senior_engineer_agent'], # type: ignore[index]
-            tools=[CodeValidationTool(), GameArchitectureTool(), PerformanceOptimizerTool()],
-            allow_delegation=False,
-            verbose=True,
-            max_iter=3,  # Allow multiple iterations for complex games
-            memory=True  # Enable memory for better context retention
+            tools=[self._validation_tool(), GameArchitectureTool(), self._optimizer_tool(), ComponentSearchTool()],
+            **self._agent_options('senior_engineer_agent')
         )
     
     @agent
     def ui_ux_designer_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['ui_ux_designer_agent'], # type: ignore[index]
-            allow_delegation=False,
-            verbose=True,
-            memory=True
+            **self._agent_options('ui_ux_designer_agent')
         )
     
     @agent
     def audio_engineer_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['audio_engineer_agent'], # type: ignore[index]
-            allow_delegation=False,
-            verbose=True,
-            memory=True
+            **self._agent_options('audio_engineer_agent')
         )
     
     @agent
     def qa_engineer_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['qa_engineer_agent'], # type: ignore[index]
-            tools=[CodeValidationTool(), PerformanceOptimizerTool()],
-            allow_delegation=False,
-            verbose=True,
-            memory=True
+            tools=[self._validation_tool(), self._optimizer_tool()],
+            **self._agent_options('qa_engineer_agent')
         )
     
     @agent
     def chief_qa_engineer_agent(self) -> Agent:
         return Agent(
             config=self.agents_config['chief_qa_engineer_agent'], # type: ignore[index]
-            allow_delegation=True,
-            verbose=True,
-            memory=True,
-            max_execution_time=300  # Allow more time for comprehensive evaluation
+            **self._agent_options('chief_qa_engineer_agent')
         )
 
     # To learn more about structured task outputs,
@@ -90,7 +400,7 @@ class CrewPythonGameBuilder():
         return Task(
             config=self.tasks_config['architecture_task'], # type: ignore[index]
             agent=self.senior_engineer_agent(),
-            output_file=f'{self.output_folder}/architecture_design.md'
+            output_file=f'{self.staging_folder}/architecture_design.md'
         )
 
     @task
@@ -98,7 +408,7 @@ class CrewPythonGameBuilder():
         return Task(
             config=self.tasks_config['ui_design_task'], # type: ignore[index]
             agent=self.ui_ux_designer_agent(),
-            output_file=f'{self.output_folder}/ui_design_specs.md',
+            output_file=f'{self.staging_folder}/ui_design_specs.md',
             context=[self.architecture_task()]  # Depends on architecture
         )
 
@@ -107,7 +417,7 @@ class CrewPythonGameBuilder():
         return Task(
             config=self.tasks_config['audio_design_task'], # type: ignore[index]
             agent=self.audio_engineer_agent(),
-            output_file=f'{self.output_folder}/audio_design_specs.md',
+            output_file=f'{self.staging_folder}/audio_design_specs.md',
             context=[self.architecture_task()]  # Depends on architecture
         )
 
@@ -115,8 +425,8 @@ class CrewPythonGameBuilder():
     def code_task(self) -> Task:
         return Task(
             config=self.tasks_config['code_task'], # type: ignore[index]
-            agent=self.senior_engineer_agent(),
-            output_file=f'{self.output_folder}/generated_game.py',
+            agent=self._code_agent(),
+            output_file=f'{self.staging_folder}/generated_game.py',
             context=[self.architecture_task(), self.ui_design_task(), self.audio_design_task()]  # Use all design specs
         )
 
@@ -125,16 +435,26 @@ class CrewPythonGameBuilder():
         return Task(
             config=self.tasks_config['review_task'], # type: ignore[index]
             agent=self.qa_engineer_agent(),
-            output_file=f'{self.output_folder}/code_review.md',
+            output_file=f'{self.staging_folder}/code_review.md',
             context=[self.code_task()]  # Review the generated code
         )
 
+    @task
+    def review_patch_task(self) -> Task:
+        return Task(
+            config=self.tasks_config['review_patch_task'], # type: ignore[index]
+            agent=self.qa_engineer_agent(),
+            output_file=f'{self.staging_folder}/review_findings.json',
+            output_pydantic=ReviewFindings,
+            context=[self.code_task(), self.review_task()]  # Findings with patches for the reviewed code
+        )
+
     @task
     def evaluate_task(self) -> Task:
         return Task(
             config=self.tasks_config['evaluate_task'], # type: ignore[index]
             agent=self.chief_qa_engineer_agent(),
-            output_file=f'{self.output_folder}/final_evaluation.md',
+            output_file=f'{self.staging_folder}/final_evaluation.md',
             context=[self.architecture_task(), self.ui_design_task(), self.audio_design_task(), 
                     self.code_task(), self.review_task()]  # Comprehensive evaluation
         )
@@ -145,10 +465,18 @@ class CrewPythonGameBuilder():
         # To learn how to add knowledge sources to your crew, check out the documentation:
         # https://docs.crewai.com/concepts/knowledge#what-is-knowledge
 
+        crew_settings = self.settings.crew_settings
+        options: Dict[str, Any] = {}
+        if crew_settings.process_type == 'hierarchical':
+            # https://docs.crewai.com/how-to/Hierarchical/ - the manager needs its own LLM
+            options['manager_llm'] = self.settings.default_model()
+
         return Crew(
             agents=self.agents, # Automatically created by the @agent decorator
             tasks=self.tasks, # Automatically created by the @task decorator
-            process=Process.sequential,
-            verbose=True,
-            # process=Process.hierarchical, # In case you wanna use that instead https://docs.crewai.com/how-to/Hierarchical/
+            process=Process(crew_settings.process_type),
+            verbose=crew_settings.verbose_logging,
+            memory=crew_settings.memory_enabled,
+            task_callback=self.record_task_output,
+            **options
         )
@@ -0,0 +1,497 @@
+"""
+Crash fuzzer for generated games.
+
+Each fuzz session runs a game headless in a sandbox worker for a fixed number
+of frames while ``InputFuzzer`` feeds it random but state-aware input:
+
+- held keys, drawn from the ``K_*`` constants the game's source uses;
+- key-mash bursts and idle stretches, so input also lands mid-animation and
+  mid-transition;
+- clicks aimed at the rects of the game's live buttons (found on the game's
+  own objects every few frames), plus random clicks and mouse motion.
+
+Everything is seeded. A session is reproducible from its seed, and the input
+the game saw is captured with ``recording.Recorder``.
+
+Generated games wrap their loops in ``except Exception`` blocks. Waiting for
+the process to die would therefore miss most bugs. ``ExceptionWatcher`` traces
+the game's own frames, ignoring line events, and stops the session at the first
+bug-type exception (``TypeError``, ``IndexError``...), caught or not, unless a
+handler that names that exception type encloses the raise. That kind of handler
+is deliberate, as in ``except KeyError`` for a lookup.
+
+Crashes are deduplicated by exception type plus the game frames they were
+raised through. For each unique crash, the shortest session is minimized with
+delta debugging: chunks of input events are dropped while the same crash still
+reproduces, with candidate replays running in parallel. The result is saved as
+a recording that ``fuzz replay`` or ``recording play`` can run.
+"""
+import argparse
+import ast
+import collections
+import concurrent.futures
+import contextlib
+import hashlib
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .allocations import enclosing_names
+from .headless import FrameHook, game_objects, run_headless
+from .recording import Player, Recorder, Recording, file_sha256
+
+
+SESSION_HANDLER = "crew_python_game_builder.fuzz:fuzz_session"
+REPLAY_HANDLER = "crew_python_game_builder.fuzz:replay_crash"
+DEFAULT_FUZZ_ROOT = os.path.join("output", ".fuzz")
+DEFAULT_SESSIONS = 200
+DEFAULT_SESSION_FRAMES = 600
+DEFAULT_SESSION_TIMEOUT_S = 30
+DEFAULT_MAX_REPLAYS = 48
+# Fixed wall-clock epoch for the virtual clock, so time.time() never varies between sessions
+FUZZ_EPOCH = 1_700_000_000.0
+# Game frames (innermost first) that identify a crash
+SIGNATURE_DEPTH = 5
+# Frames between refreshes of the clickable targets
+TARGET_REFRESH_FRAMES = 30
+
+# Exception types that point at a bug even when a broad handler swallows them
+BUG_TYPES = (AssertionError, AttributeError, IndexError, KeyError, NameError, RecursionError,
+             TypeError, ValueError, ZeroDivisionError)
+_BROAD_HANDLERS = {None, "Exception", "BaseException"}
+_KEY_NAME = re.compile(r"\bK_[A-Za-z0-9_]+\b")
+_CLICKABLE_NAME = re.compile(r"button|btn|menu|option|choice|tab|card|slot", re.IGNORECASE)
+_CALLBACK_ATTRIBUTES = ("callback", "action", "on_click", "command", "handler")
+_LIMIT_STATUSES = ("timeout", "cpu_limit", "memory_limit", "killed")
+
+
+# Input -----------------------------------------------------------------------
+
+def game_keys(source: str) -> List[str]:
+    """``K_*`` constant names the game's source refers to."""
+    return sorted(set(_KEY_NAME.findall(source)))
+
+
+class InputFuzzer:
+    """Seeded input generator; ``step`` runs once per frame and posts that frame's events."""
+
+    PRESS_RATE = 0.2
+    MASH_RATE = 0.02
+    IDLE_RATE = 0.02
+    MOTION_RATE = 0.08
+    CLICK_RATE = 0.05
+    AIMED_CLICK_SHARE = 0.7
+
+    def __init__(self, seed: int, game_path: str, key_names: List[str]):
+        import pygame
+
+        self.rng = random.Random(seed)
+        self.game_path = game_path
+        self.keys = [getattr(pygame, name) for name in key_names if hasattr(pygame, name)] or [
+            pygame.K_SPACE, pygame.K_RETURN, pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT]
+        self.scheduled: Dict[int, List[Any]] = collections.defaultdict(list)
+        self.targets: List[Any] = []
+        self.idle_until = 0
+
+    def _key_event(self, event_type: int, key: int) -> Any:
+        import pygame
+
+        return pygame.event.Event(event_type, key=key, mod=0, scancode=0,
+                                  unicode=chr(key) if 32 <= key < 127 and event_type == pygame.KEYDOWN else "")
+
+    def _screen_size(self) -> Tuple[int, int]:
+        import pygame
+
+        surface = pygame.display.get_surface()
+        return surface.get_size() if surface is not None else (800, 600)
+
+    def _clickable_rects(self) -> List[Any]:
+        """Rects of live buttons: game objects that look clickable and their button containers."""
+        import pygame
+
+        rects = []
+        for obj in game_objects(self.game_path):
+            attributes = getattr(obj, "__dict__", {})
+            rect = attributes.get("rect")
+            if isinstance(rect, pygame.Rect) and (_CLICKABLE_NAME.search(type(obj).__name__) or any(
+                    callable(attributes.get(name)) for name in _CALLBACK_ATTRIBUTES)):
+                rects.append(rect)
+            for name, value in attributes.items():
+                if not _CLICKABLE_NAME.search(name):
+                    continue
+                values = value.values() if isinstance(value, dict) else value if isinstance(value, (list, tuple)) else [value]
+                rects.extend(item for item in values if isinstance(item, pygame.Rect))
+        return rects
+
+    def step(self, frame: int) -> None:
+        import pygame
+
+        for event in self.scheduled.pop(frame, []):
+            pygame.event.post(event)
+        if frame < self.idle_until:
+            return
+        rng = self.rng
+        if frame % TARGET_REFRESH_FRAMES == 1:
+            self.targets = self._clickable_rects()
+        if rng.random() < self.IDLE_RATE:
+            # Let animations and transitions run, then hit them with input
+            self.idle_until = frame + rng.randint(10, 90)
+            return
+        if rng.random() < self.PRESS_RATE:
+            key = rng.choice(self.keys)
+            pygame.event.post(self._key_event(pygame.KEYDOWN, key))
+            self.scheduled[frame + rng.randint(1, 30)].append(self._key_event(pygame.KEYUP, key))
+        if rng.random() < self.MASH_RATE:
+            for key in rng.sample(self.keys, min(len(self.keys), rng.randint(3, 6))):
+                pygame.event.post(self._key_event(pygame.KEYDOWN, key))
+                self.scheduled[frame + 1].append(self._key_event(pygame.KEYUP, key))
+        width, height = self._screen_size()
+        if rng.random() < self.MOTION_RATE:
+            pos = (rng.randrange(width), rng.randrange(height))
+            pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)))
+        if rng.random() < self.CLICK_RATE:
+            if self.targets and rng.random() < self.AIMED_CLICK_SHARE:
+                target = rng.choice(self.targets)
+                pos = (rng.randint(target.left, max(target.left, target.right - 1)),
+                       rng.randint(target.top, max(target.top, target.bottom - 1)))
+            else:
+                pos = (rng.randrange(width), rng.randrange(height))
+            button = 1 if rng.random() < 0.85 else rng.choice((2, 3))
+            pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)))
+            pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=button))
+            self.scheduled[frame + rng.randint(1, 5)].append(
+                pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=button))
+
+
+# Crash detection -------------------------------------------------------------
+
+def specific_handlers(source: str) -> List[Tuple[int, int, set]]:
+    """``(first line, last line, exception names)`` of try bodies with narrowly typed handlers."""
+    ranges = []
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return ranges
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Try) or not node.body:
+            continue
+        names = set()
+        for handler in node.handlers:
+            types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+            for item in types:
+                name = item.attr if isinstance(item, ast.Attribute) else getattr(item, "id", None)
+                if name not in _BROAD_HANDLERS:
+                    names.add(name)
+        if names:
+            ranges.append((node.body[0].lineno, node.body[-1].end_lineno, names))
+    return ranges
+
+
+class ExceptionWatcher:
+    """Traces game frames for exception events and keeps the first bug-type exception."""
+
+    def __init__(self, game_path: str):
+        self.game_path = os.path.abspath(game_path)
+        with open(self.game_path, "r", encoding="utf-8") as file:
+            source = file.read()
+        self.names = enclosing_names(source)
+        self.handlers = specific_handlers(source)
+        self.hook: Optional[FrameHook] = None
+        self.crash: Optional[Dict[str, Any]] = None
+        self.last: Optional[Dict[str, Any]] = None
+        self._last_exception: Optional[BaseException] = None
+
+    def _game_stack(self, frame: Any) -> List[Any]:
+        stack = []
+        while frame is not None:
+            if frame.f_code.co_filename == self.game_path:
+                stack.append(frame)
+            frame = frame.f_back
+        return stack
+
+    def _expected(self, exc_type: type, stack: List[Any]) -> bool:
+        handled = {cls.__name__ for cls in exc_type.__mro__} - {"Exception", "BaseException", "object"}
+        return any(first <= frame.f_lineno <= last and names & handled
+                   for frame in stack for first, last, names in self.handlers)
+
+    def describe(self, exc: BaseException, stack: List[Any]) -> Dict[str, Any]:
+        where = [[self.names.get(frame.f_lineno, frame.f_code.co_name), frame.f_lineno]
+                 for frame in stack[:SIGNATURE_DEPTH]]
+        signature = type(exc).__name__ + " at " + " < ".join(f"{name}:{line}" for name, line in where)
+        return {
+            "signature": signature,
+            "id": hashlib.sha1(signature.encode("utf-8")).hexdigest()[:12],
+            "type": type(exc).__name__,
+            "message": str(exc)[:300],
+            "frame": self.hook.frames if self.hook else 0,
+            "stack": where,
+            "caught": True,
+        }
+
+    def install(self, hook: FrameHook) -> Callable[[], None]:
+        self.hook = hook
+
+        def local(frame, event, arg):
+            if event == "exception":
+                exc_type, exc, _ = arg
+                if exc is not self._last_exception:
+                    self._last_exception = exc
+                    stack = self._game_stack(frame)
+                    self.last = self.describe(exc, stack)
+                    if self.crash is None and issubclass(exc_type, BUG_TYPES) and not self._expected(exc_type, stack):
+                        self.crash = self.last
+                        # Stop at the end of this frame; a swallowed error would repeat every frame
+                        hook.max_frames = min(hook.max_frames, hook.frames + 1)
+            return local
+
+        def trace(frame, event, arg):
+            if frame.f_code.co_filename != self.game_path:
+                return None
+            frame.f_trace_lines = False
+            return local
+
+        previous = sys.gettrace()
+        sys.settrace(trace)
+
+        def restore() -> None:
+            sys.settrace(previous)
+
+        return restore
+
+    def outcome(self, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The run's crash: a watched bug-type exception, else whatever escaped the game."""
+        crash = self.crash
+        if result["status"] == "crashed":
+            crash = dict(self.last or crash or {"signature": result["error"], "type": "unknown", "message": result["error"],
+                                                "frame": self.hook.frames if self.hook else 0, "stack": []})
+            crash.setdefault("id", hashlib.sha1(crash["signature"].encode("utf-8")).hexdigest()[:12])
+            crash["caught"] = False
+            crash["traceback"] = result.get("traceback")
+        return crash
+
+
+# Sandbox handlers ------------------------------------------------------------
+
+@contextlib.contextmanager
+def _scratch_copy(game_path: str) -> Iterator[str]:
+    """Run from a private copy of the game's folder, so high-score and save files never leak between sessions."""
+    scratch = tempfile.mkdtemp(prefix="fuzz_")
+    try:
+        source_dir = os.path.dirname(os.path.abspath(game_path))
+        for name in os.listdir(source_dir):
+            path = os.path.join(source_dir, name)
+            if name.startswith(".") or name == "__pycache__":
+                continue
+            if os.path.isdir(path):
+                shutil.copytree(path, os.path.join(scratch, name))
+            else:
+                shutil.copy2(path, scratch)
+        yield os.path.join(scratch, os.path.basename(game_path))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def fuzz_session(game_path: str, seed: int, frames: int = DEFAULT_SESSION_FRAMES) -> Dict[str, Any]:
+    """One fuzz session; the recording is returned only when the session found a crash."""
+    with open(game_path, "r", encoding="utf-8") as file:
+        key_names = game_keys(file.read())
+    recording = Recording(game_path=game_path, game_sha256=file_sha256(game_path), seed=seed, epoch=FUZZ_EPOCH)
+    recorder = Recorder(recording)
+    with _scratch_copy(game_path) as scratch_path:
+        watcher = ExceptionWatcher(scratch_path)
+        fuzzer = InputFuzzer(seed, watcher.game_path, key_names)
+        result = run_headless(scratch_path, max_frames=frames, on_frame=fuzzer.step,
+                              hooks=[recorder.install, watcher.install])
+    crash = watcher.outcome(result)
+    recording.frames = watcher.hook.frames if watcher.hook else 0
+    return {"seed": seed, "status": result["status"], "frames": result.get("frames", 0), "crash": crash,
+            "recording": recording.model_dump() if crash else None}
+
+
+def replay_crash(recording: Dict[str, Any], game_path: Optional[str] = None) -> Dict[str, Any]:
+    """Replay a recording under the exception watcher and report the crash it produces, if any."""
+    recording = Recording.model_validate(recording)
+    game_path = game_path or recording.game_path
+    player = Player(recording)
+    with _scratch_copy(game_path) as scratch_path:
+        watcher = ExceptionWatcher(scratch_path)
+        result = run_headless(scratch_path, max_frames=recording.frames + 1, hooks=[player.install, watcher.install])
+    return {"status": result["status"], "frames": result.get("frames", 0), "crash": watcher.outcome(result)}
+
+
+# Orchestration ---------------------------------------------------------------
+
+class _ReplayBudget:
+    def __init__(self, pool: Any, game_path: str, crash_id: str, max_replays: int):
+        self.pool = pool
+        self.game_path = game_path
+        self.crash_id = crash_id
+        self.remaining = max_replays
+
+    def first_reproducing(self, candidates: List[Dict[str, Any]]) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """The first candidate recording that still produces the crash, with its crash; replays run in parallel."""
+        candidates = candidates[:self.remaining]
+        self.remaining -= len(candidates)
+        futures = [self.pool.submit(REPLAY_HANDLER, recording=candidate, game_path=self.game_path)
+                   for candidate in candidates]
+        for candidate, future in zip(candidates, futures):
+            crash = future.result().get("crash")
+            if crash and crash["id"] == self.crash_id:
+                for other in futures:
+                    other.cancel()
+                return candidate, crash
+        return None
+
+
+def minimize(pool: Any, game_path: str, recording: Dict[str, Any], crash: Dict[str, Any],
+             max_replays: int = DEFAULT_MAX_REPLAYS) -> Tuple[Dict[str, Any], bool]:
+    """Smallest recording found (ddmin over events) that still reproduces ``crash``; and whether it reproduced at all."""
+    budget = _ReplayBudget(pool, game_path, crash["id"], max_replays)
+
+    def with_events(events: List[Any], frames: int) -> Dict[str, Any]:
+        return dict(recording, events=[event for event in events if event[0] <= frames], frames=frames)
+
+    events = [event for event in recording["events"] if event[0] <= crash["frame"]]
+    current = with_events(events, crash["frame"])
+    found = budget.first_reproducing([with_events([], crash["frame"]), current])
+    if found is None:
+        return recording, False
+    current, reproduced = found
+    events = current["events"]
+
+    chunks = 2
+    while len(events) >= 2 and budget.remaining > 0:
+        size = -(-len(events) // chunks)
+        parts = [events[start:start + size] for start in range(0, len(events), size)]
+        complements = [with_events([event for other, part in enumerate(parts) if other != index for event in part],
+                                   reproduced["frame"]) for index in range(len(parts))]
+        found = budget.first_reproducing(complements)
+        if found is not None:
+            current, reproduced = found
+            events = current["events"]
+            chunks = max(chunks - 1, 2)
+        elif chunks >= len(events):
+            break
+        else:
+            chunks = min(len(events), chunks * 2)
+    return with_events(events, reproduced["frame"]), True
+
+
+def fuzz_game(game_path: str, sessions: int = DEFAULT_SESSIONS, frames: int = DEFAULT_SESSION_FRAMES,
+              workers: Optional[int] = None, seed: int = 0, out_dir: Optional[str] = None,
+              max_replays: int = DEFAULT_MAX_REPLAYS,
+              session_timeout_s: int = DEFAULT_SESSION_TIMEOUT_S) -> Dict[str, Any]:
+    """Run ``sessions`` fuzz sessions across a sandbox pool and save a minimal replay per unique crash."""
+    from .sandbox import SandboxPool
+
+    game_path = os.path.abspath(game_path)
+    out_dir = out_dir or os.path.join(DEFAULT_FUZZ_ROOT, os.path.basename(os.path.dirname(game_path)))
+    workers = workers or os.cpu_count() or 2
+    statuses: collections.Counter = collections.Counter()
+    crashes: Dict[str, Dict[str, Any]] = {}
+    recordings: Dict[str, Dict[str, Any]] = {}
+
+    started = time.perf_counter()
+    with SandboxPool(workers, wall_timeout_s=session_timeout_s, preload=(__name__,)) as pool:
+        warm = time.perf_counter() - started
+        futures = [pool.submit(SESSION_HANDLER, game_path=game_path, seed=seed + index, frames=frames)
+                   for index in range(sessions)]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            crash = result.get("crash")
+            status = "crash" if crash else result.get("status", "unknown")
+            statuses[status] += 1
+            if status in _LIMIT_STATUSES:
+                # The child was killed, so there is no recording; the seed regenerates the session
+                crash = {"signature": status, "id": status, "type": status, "message": result.get("error"),
+                         "frame": None, "stack": [], "caught": False}
+            if not crash:
+                continue
+            entry = crashes.setdefault(crash["id"], dict(crash, count=0, seeds=[]))
+            entry["count"] += 1
+            entry["seeds"].append(result.get("seed"))
+            recording = result.get("recording")
+            if recording and (crash["id"] not in recordings or crash["frame"] < entry["frame"]):
+                recordings[crash["id"]] = recording
+                entry.update(crash, count=entry["count"], seeds=entry["seeds"])
+        fuzz_s = time.perf_counter() - started - warm
+
+        os.makedirs(out_dir, exist_ok=True)
+        for crash_id, entry in crashes.items():
+            entry["seeds"] = sorted(seed for seed in entry["seeds"] if seed is not None)
+            if crash_id not in recordings:
+                continue
+            original = recordings[crash_id]
+            minimal, reproducible = minimize(pool, game_path, original, entry, max_replays=max_replays)
+            path = os.path.join(out_dir, f"{crash_id}.json")
+            Recording.model_validate(minimal).save(path)
+            entry.update(replay=path, reproducible=reproducible, replay_frames=minimal["frames"],
+                         replay_events=len(minimal["events"]), original_events=len(original["events"]))
+
+    summary = {
+        "game_path": game_path,
+        "sessions": sessions,
+        "frames_per_session": frames,
+        "workers": workers,
+        "statuses": dict(statuses),
+        "warmup_s": round(warm, 2),
+        "fuzz_s": round(fuzz_s, 2),
+        "sessions_per_minute": round(sessions / fuzz_s * 60, 1) if fuzz_s > 0 else None,
+        "crashes": sorted(crashes.values(), key=lambda entry: -entry["count"]),
+    }
+    with open(os.path.join(out_dir, "crashes.json"), "w", encoding="utf-8") as file:
+        json.dump(summary, file, indent=2, default=str)
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line interface: fuzz a game, or replay a saved crash."""
+    parser = argparse.ArgumentParser(prog="fuzz", description="Fuzz generated games with random, state-aware input.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="Run fuzz sessions in parallel and minimize each unique crash")
+    run.add_argument("game_path")
+    run.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS)
+    run.add_argument("--frames", type=int, default=DEFAULT_SESSION_FRAMES, help="Frames per session")
+    run.add_argument("--workers", type=int, help="Sandbox workers (default: one per CPU)")
+    run.add_argument("--seed", type=int, default=0, help="Seed of the first session; session i uses seed + i")
+    run.add_argument("--out", help=f"Folder for crash replays (default: {DEFAULT_FUZZ_ROOT}/<game>)")
+    run.add_argument("--max-replays", type=int, default=DEFAULT_MAX_REPLAYS, help="Replays spent minimizing each crash")
+    run.add_argument("--session-timeout", type=int, default=DEFAULT_SESSION_TIMEOUT_S,
+                     help="Wall-clock seconds before a session counts as hung")
+    replay = sub.add_parser("replay", help="Replay a saved crash and report whether it still happens")
+    replay.add_argument("recording_path")
+    replay.add_argument("--game", help="Game to replay against (default: the recorded one)")
+    args = parser.parse_args(argv)
+
+    if args.command == "replay":
+        result = replay_crash(Recording.load(args.recording_path).model_dump(), game_path=args.game)
+        print(json.dumps(result, indent=2))
+        return 1 if result["crash"] else 0
+
+    summary = fuzz_game(args.game_path, sessions=args.sessions, frames=args.frames, workers=args.workers,
+                        seed=args.seed, out_dir=args.out, max_replays=args.max_replays,
+                        session_timeout_s=args.session_timeout)
+    statuses = ", ".join(f"{count} {status}" for status, count in sorted(summary["statuses"].items()))
+    print(f"{summary['sessions']} sessions x {summary['frames_per_session']} frames on {summary['workers']} workers "
+          f"in {summary['fuzz_s']}s ({summary['sessions_per_minute']} sessions/min): {statuses}")
+    for entry in summary["crashes"]:
+        print(f"  {entry['count']:>5}x  {entry['signature']}")
+        if entry.get("message"):
+            print(f"         {entry['type']}: {entry['message']}")
+        if entry.get("replay"):
+            state = "reproduces" if entry["reproducible"] else "did not reproduce"
+            print(f"         replay {entry['replay']} ({state}; {entry['replay_events']} of "
+                  f"{entry['original_events']} events, {entry['replay_frames']} frames)")
+        else:
+            print(f"         no replay; rerun with --seed {entry['seeds'][0]} --sessions 1" if entry["seeds"] else "")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
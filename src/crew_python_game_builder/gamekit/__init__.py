@@ -0,0 +1,108 @@
+"""
+Reusable runtime modules for generated games.
+
+Generated games import these instead of re-implementing the same subsystems
+in every file, e.g.::
+
+    from crew_python_game_builder.gamekit.particles import ParticleSystem
+
+Each module depends only on pygame, NumPy and the standard library. The prompt
+text in ``MODULES`` is what ``code_task`` sees (through ``{gamekit_reference}``),
+so keep it in step with the modules' public APIs.
+"""
+from typing import Iterable, Optional
+
+
+MODULES = {
+    "particles": (
+        "from crew_python_game_builder.gamekit.particles import ParticleSystem\n"
+        "ParticleSystem(capacity=2048, gravity=(0, 0), drag=1.0): particles in preallocated NumPy arrays.\n"
+        "  spawn(pos, count, spread, base_vel, color, life, radius, glow=False)  # burst around pos\n"
+        "  emit(positions, velocities, color, life, radius, glow=False)        # explicit arrays\n"
+        "  update(dt=1.0)  # vectorized move, age and O(n) removal of dead particles\n"
+        "  draw(surface)   # circles, with a halo when glow=True\n"
+        "  len(system), clear(), dropped (spawns refused because the system was full)\n"
+        "Use it for sparks, trails, explosions and ambient particles instead of Particle classes."
+    ),
+    "pool": (
+        "from crew_python_game_builder.gamekit.pool import ObjectPool\n"
+        "ObjectPool(factory, size): reusable objects (bullets, enemies, particles with custom logic).\n"
+        "  acquire() -> obj or None when full, release(obj), activate(obj)  # all O(1)\n"
+        "  for obj in pool: ...  # live objects only; pool.slots lists every object\n"
+        "  retain(keep)          # release live objects for which keep(obj) is false\n"
+        "  stats()               # capacity, peak_active, exhausted: size the pool from real play\n"
+        "Never scan a list of slots for an inactive flag to spawn or update."
+    ),
+    "glow": (
+        "from crew_python_game_builder.gamekit.glow import shared_cache\n"
+        "GLOW = shared_cache(): LRU cache of pre-rendered glow surfaces under a memory cap.\n"
+        "  GLOW.circle(radius, color, alpha)                 # radial gradient sprite, 2*radius wide\n"
+        "  GLOW.blit_circle(surface, center, radius, color, alpha, special_flags=0)\n"
+        "  GLOW.rect(size, color, alpha, border_radius=0)   # translucent (rounded) rect\n"
+        "  GLOW.sprite(key, render)  # any surface: render() runs only when key is not cached\n"
+        "  GLOW.stats()              # hits, misses, hit_rate, bytes, evictions\n"
+        "Never build an SRCALPHA Surface per object per frame for glows, shadows or halos."
+    ),
+    "text": (
+        "from crew_python_game_builder.gamekit.text import get_font, render_text, blit_text\n"
+        "get_font(name=None, size=24, bold=False, italic=False)  # font file path, system name or None; loaded once\n"
+        "render_text(text, font, color, shadow=None)  # cached drop-in for font.render(text, True, color)\n"
+        "blit_text(surface, text, pos, font, color, center=False, shadow=None, shadow_offset=(2, 2)) -> Rect\n"
+        "Never construct pygame.font.Font/SysFont inside draw or update code; HUD labels are only\n"
+        "re-rendered when their text changes."
+    ),
+    "physics": (
+        "from crew_python_game_builder.gamekit.physics import DiscWorld, SpatialHash\n"
+        "world = DiscWorld(capacity, bounds=(left, top, right, bottom), friction=per_dt_factor,\n"
+        "                  restitution=1.0, wall_restitution=0.8, gravity=(0, 0), min_speed=0.05, sleep_frames=3)\n"
+        "  add(position, radius, mass=1.0, velocity=(0, 0), asleep=False) -> index; remove(index)\n"
+        "  world.pos / world.vel arrays; set_velocity(index, v) wakes a sleeping body\n"
+        "  step(dt, on_substep=None) -> {'substeps', 'contacts': [(i, j)], 'wall_hits': [i], 'moved': [i]}\n"
+        "  awake_count == 0 means everything has stopped (O(1)); only copy back bodies in 'moved'\n"
+        "  Sub-steps adaptively so fast bodies cannot tunnel; on_substep(world) may return True to stop early\n"
+        "SpatialHash(cell_size)  # cell_size >= largest body diameter\n"
+        "  pairs(positions, awake=None) -> sorted [(i, j)] of bodies in neighbouring cells;\n"
+        "  with awake, pairs where both bodies rest are skipped\n"
+        "Keep disc positions/velocities in a DiscWorld instead of integrating and colliding each object in Python; "
+        "copy them back to the game objects after step() for drawing."
+    ),
+    "loop": (
+        "from crew_python_game_builder.gamekit.loop import FixedStepLoop, lerp\n"
+        "loop = FixedStepLoop(step_hz=60, fps=60, max_steps=5)\n"
+        "  run(update, render, handle_events=None)  # update(dt) at a fixed dt, render(alpha) once per frame\n"
+        "  stop() ends run(); draw fast movers at lerp(prev, current, alpha)\n"
+        "Drive the main loop with FixedStepLoop instead of clock.tick(): move objects only inside update(dt), "
+        "by a fixed amount per step or scaled by dt, never by measured frame time. The game then plays the same "
+        "at any frame rate, and headless runs are deterministic and faster than real time."
+    ),
+    "grid": (
+        "from crew_python_game_builder.gamekit.grid import TileGrid\n"
+        "grid = TileGrid.from_layout(layout_rows, tile_size, solid_chars='#')  # once, when the level is parsed\n"
+        "  box_blocked(left, top, width, height) / circle_blocked(x, y, radius) -> bool  # same result as colliderect\n"
+        "  is_solid(col, row), tile_at(x, y) -> (col, row), tile_center(col, row)\n"
+        "Test movement in tile mazes against the grid instead of looping over a list of wall rects."
+    ),
+    "pathfinding": (
+        "from crew_python_game_builder.gamekit.pathfinding import DistanceField, next_hop_table\n"
+        "chase = DistanceField(grid)  # one per target, shared by every chaser\n"
+        "  update(col, row) each frame with the target's tile; re-floods only when the tile changes\n"
+        "  direction(col, row) -> (dx, dy) first step of a shortest path, or None; distance(col, row)\n"
+        "next_hop_table(grid).direction(from_col, from_row, to_col, to_row)  # any pair, cached per maze layout\n"
+        "Steer maze enemies with these lookups at tile centers instead of greedy moves towards the target."
+    ),
+    "bitboard": (
+        "from crew_python_game_builder.gamekit.bitboard import BitBoard, piece_masks\n"
+        "MASKS = {name: piece_masks(rotation_matrices) for name, rotation_matrices in SHAPES.items()}  # once\n"
+        "board = BitBoard(width, height)  # rows[y] is an int, bit x = column x; colors[y][x] for drawing\n"
+        "  fits(mask, x, y) -> bool; drop_distance(mask, x, y); place(mask, x, y, color) -> rows touched\n"
+        "  full_rows(rows_touched) -> full rows; clear_rows(rows); cells() -> (x, y, color); copy() for bots\n"
+        "Use it for falling-block wells instead of a list-of-lists grid."
+    ),
+}
+
+
+def gamekit_reference(modules: Optional[Iterable[str]] = None) -> str:
+    """Prompt block describing the game kit modules (all of them by default)."""
+    names = list(modules) if modules else list(MODULES)
+    blocks = [MODULES[name] for name in names if name in MODULES]
+    return "\n\n".join(blocks) if blocks else "None."
@@ -0,0 +1,136 @@
+"""
+Bitboard for falling-block games (Tetris and friends).
+
+Block games tend to store the well as a list of lists, test a move by
+building the piece's block list and indexing the grid per block, find full
+rows with ``all(row)`` over every row, and clear them with ``del`` plus
+``insert(0, ...)`` per line. ``BitBoard`` keeps each row as an integer, with
+bit ``x`` set when column ``x`` is filled:
+
+- ``piece_masks`` turns each rotation of a piece into row masks once, with
+  the columns it spans. ``fits`` is then a bounds check plus one shift and
+  ``&`` per piece row, and ``drop_distance`` repeats that down the well;
+- a row is full when it equals ``full``. ``place`` returns the rows the piece
+  touched, and only those can have become full, so line detection after a
+  lock checks at most four integers;
+- ``clear_rows`` rebuilds the row list in one pass, however many lines go;
+- colors live in a separate layer (``colors[y][x]``), read only for drawing.
+
+``copy()`` is cheap (one list of ints plus the color rows), so bots can try
+every placement of a piece on scratch boards when benchmarking headless.
+"""
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class PieceMask(NamedTuple):
+    """One rotation of a piece: (row offset, bits) for each non-empty row, and the columns it spans."""
+    rows: Tuple[Tuple[int, int], ...]
+    left: int
+    right: int
+
+
+def piece_mask(shape: Sequence[Sequence[int]]) -> PieceMask:
+    """Masks for a piece given as a matrix of 0/1 cells (row by row)."""
+    rows = []
+    columns = []
+    for dy, line in enumerate(shape):
+        bits = 0
+        for dx, cell in enumerate(line):
+            if cell:
+                bits |= 1 << dx
+                columns.append(dx)
+        if bits:
+            rows.append((dy, bits))
+    if not rows:
+        raise ValueError("piece has no blocks")
+    return PieceMask(tuple(rows), min(columns), max(columns))
+
+
+def piece_masks(rotations: Iterable[Sequence[Sequence[int]]]) -> List[PieceMask]:
+    """``piece_mask`` for every rotation of a piece."""
+    return [piece_mask(shape) for shape in rotations]
+
+
+class BitBoard:
+    """``width`` x ``height`` well; row 0 is the top."""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.full = (1 << width) - 1
+        self.rows: List[int] = [0] * height
+        self.colors: List[List[Optional[Any]]] = [[None] * width for _ in range(height)]
+
+    def copy(self) -> "BitBoard":
+        board = BitBoard.__new__(BitBoard)
+        board.width, board.height, board.full = self.width, self.height, self.full
+        board.rows = list(self.rows)
+        board.colors = [list(row) for row in self.colors]
+        return board
+
+    def clear(self) -> None:
+        self.rows = [0] * self.height
+        self.colors = [[None] * self.width for _ in range(self.height)]
+
+    def fits(self, piece: PieceMask, x: int, y: int) -> bool:
+        """True if the piece at column ``x``, row ``y`` is inside the well and overlaps nothing."""
+        if x + piece.left < 0 or x + piece.right >= self.width:
+            return False
+        rows, height = self.rows, self.height
+        for dy, bits in piece.rows:
+            row = y + dy
+            if not 0 <= row < height:
+                return False
+            if rows[row] & (bits << x if x >= 0 else bits >> -x):
+                return False
+        return True
+
+    def drop_distance(self, piece: PieceMask, x: int, y: int) -> int:
+        """How many rows the piece can fall from (x, y) before it rests."""
+        distance = 0
+        while self.fits(piece, x, y + distance + 1):
+            distance += 1
+        return distance
+
+    def place(self, piece: PieceMask, x: int, y: int, color: Any = True) -> List[int]:
+        """Fill the piece's cells; returns the rows it touched, the only ones that can have become full."""
+        touched = []
+        for dy, bits in piece.rows:
+            row = y + dy
+            shifted = bits << x if x >= 0 else bits >> -x
+            self.rows[row] |= shifted
+            colors = self.colors[row]
+            while shifted:
+                low = shifted & -shifted
+                colors[low.bit_length() - 1] = color
+                shifted ^= low
+            touched.append(row)
+        return touched
+
+    def full_rows(self, candidates: Optional[Iterable[int]] = None) -> List[int]:
+        """Full rows among ``candidates`` (every row by default), top to bottom."""
+        rows, full = self.rows, self.full
+        if candidates is None:
+            return [y for y, row in enumerate(rows) if row == full]
+        return sorted(y for y in set(candidates) if rows[y] == full)
+
+    def clear_rows(self, lines: Iterable[int]) -> int:
+        """Remove ``lines`` and drop the rows above them; returns how many were removed."""
+        gone = set(lines)
+        if not gone:
+            return 0
+        kept = [y for y in range(self.height) if y not in gone]
+        removed = self.height - len(kept)
+        self.rows = [0] * removed + [self.rows[y] for y in kept]
+        self.colors = [[None] * self.width for _ in range(removed)] + [self.colors[y] for y in kept]
+        return removed
+
+    def cells(self) -> Iterator[Tuple[int, int, Any]]:
+        """(x, y, color) for every filled cell, for drawing."""
+        for y, row in enumerate(self.rows):
+            colors = self.colors[y]
+            while row:
+                low = row & -row
+                x = low.bit_length() - 1
+                yield x, y, colors[x]
+                row ^= low
@@ -0,0 +1,134 @@
+"""
+Pre-rendered glow sprites with LRU eviction under a memory cap.
+
+Neon effects tend to build an ``SRCALPHA`` surface, draw a circle or rounded
+rect into it and blit it, for every glowing object on every frame. The shapes
+barely change from frame to frame, so ``GlowCache`` renders each one once and
+hands back the same surface afterwards; glow drawing becomes a dict lookup and
+a blit.
+
+- Keys are quantized: radius and size to whole pixels, color channels and alpha
+  to ``color_step``/``alpha_step``. Slowly fading or pulsing glows then map to a
+  few dozen sprites instead of one per frame.
+- Entries are kept in least-recently-used order. When the pixel memory of the
+  cached surfaces (width * height * 4 bytes) exceeds ``max_bytes``, the oldest
+  are dropped.
+- ``stats()`` reports hits, misses, evictions, entries and bytes, so the cap and
+  quantization steps can be checked against a real session.
+
+``sprite(key, render)`` caches any surface the game builds itself; ``circle``
+and ``rect`` build the common shapes. Games share one cache through
+``shared_cache()``.
+"""
+import collections
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+import pygame
+
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_COLOR_STEP = 8
+DEFAULT_ALPHA_STEP = 8
+# Concentric rings per radial gradient; more rings than pixels of radius are pointless
+GRADIENT_RINGS = 24
+
+
+def quantize(value: float, step: int) -> int:
+    """``value`` rounded to the nearest multiple of ``step``, clamped to 0..255."""
+    return min(255, max(0, int(round(value / step)) * step))
+
+
+class GlowCache:
+    """LRU cache of glow surfaces, bounded by the pixel memory they hold."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, color_step: int = DEFAULT_COLOR_STEP,
+                 alpha_step: int = DEFAULT_ALPHA_STEP):
+        self.max_bytes = max_bytes
+        self.color_step = max(1, color_step)
+        self.alpha_step = max(1, alpha_step)
+        self._sprites: "collections.OrderedDict[Hashable, pygame.Surface]" = collections.OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._sprites)
+
+    def sprite(self, key: Hashable, render: Callable[[], pygame.Surface]) -> pygame.Surface:
+        """The surface cached under ``key``, rendered by ``render()`` on a miss."""
+        surface = self._sprites.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._sprites.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = render()
+        self._sprites[key] = surface
+        self.bytes += surface.get_width() * surface.get_height() * 4
+        while self.bytes > self.max_bytes and len(self._sprites) > 1:
+            _, evicted = self._sprites.popitem(last=False)
+            self.bytes -= evicted.get_width() * evicted.get_height() * 4
+            self.evictions += 1
+        return surface
+
+    def _color(self, color: Sequence[float], alpha: float) -> Tuple[int, int, int, int]:
+        return (quantize(color[0], self.color_step), quantize(color[1], self.color_step),
+                quantize(color[2], self.color_step), quantize(alpha, self.alpha_step))
+
+    def circle(self, radius: float, color: Sequence[float], alpha: float = 255) -> pygame.Surface:
+        """Radial gradient of ``2 * radius`` pixels: ``alpha`` at the center, fading to 0 at the edge."""
+        radius = max(1, int(round(radius)))
+        rgba = self._color(color, alpha)
+        return self.sprite(("circle", radius, rgba), lambda: _radial_gradient(radius, rgba))
+
+    def rect(self, size: Sequence[float], color: Sequence[float], alpha: float = 255,
+             border_radius: int = 0) -> pygame.Surface:
+        """Flat translucent (rounded) rectangle, for layered rect glows."""
+        width, height = max(1, int(size[0])), max(1, int(size[1]))
+        rgba = self._color(color, alpha)
+
+        def render() -> pygame.Surface:
+            surface = pygame.Surface((width, height), pygame.SRCALPHA)
+            pygame.draw.rect(surface, rgba, surface.get_rect(), border_radius=border_radius)
+            return surface
+
+        return self.sprite(("rect", width, height, rgba, border_radius), render)
+
+    def blit_circle(self, surface: pygame.Surface, center: Sequence[float], radius: float, color: Sequence[float],
+                    alpha: float = 255, special_flags: int = 0) -> None:
+        glow = self.circle(radius, color, alpha)
+        half = glow.get_width() // 2
+        surface.blit(glow, (int(center[0]) - half, int(center[1]) - half), special_flags=special_flags)
+
+    def clear(self) -> None:
+        self._sprites.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {"entries": len(self._sprites), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None}
+
+
+def _radial_gradient(radius: int, rgba: Tuple[int, int, int, int]) -> pygame.Surface:
+    surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    rings = min(radius, GRADIENT_RINGS)
+    for ring in range(rings):  # Outermost first; each smaller ring overwrites the middle
+        t = ring / rings
+        ring_radius = max(1, int(round(radius * (1 - t))))
+        alpha = int(rgba[3] * (1 - (1 - t) ** 2))
+        pygame.draw.circle(surface, (*rgba[:3], alpha), (radius, radius), ring_radius)
+    return surface
+
+
+_shared: Optional[GlowCache] = None
+
+
+def shared_cache() -> GlowCache:
+    """The process-wide cache, created on first use."""
+    global _shared
+    if _shared is None:
+        _shared = GlowCache()
+    return _shared
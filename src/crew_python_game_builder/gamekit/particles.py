@@ -0,0 +1,144 @@
+"""
+Struct-of-arrays particle system.
+
+Particles live in parallel, preallocated NumPy arrays (position, velocity,
+life, color, radius, glow flag); the first ``len(system)`` slots are alive.
+
+- ``update`` moves, drags and ages every live particle in a handful of vectorized
+  passes, then packs the survivors to the front with one boolean-mask copy per
+  array. Removal is O(n) however many particles die in the frame. A list of
+  particle objects pays for a Python loop plus ``list.remove`` per dead one.
+- ``draw`` converts the live slice to Python lists once and hands every
+  particle to a single ``Surface.blits`` call. Each (color, radius, glow)
+  combination is drawn into a sprite once, radial halo included, and kept in
+  the glow sprite cache (glow.py).
+
+``spawn`` keeps the signature of the ``ParticleManager.spawn`` the generated
+games already use, so a game's manager can be swapped out directly. Randomness
+comes from NumPy's global generator, which recording.py seeds for replays.
+"""
+import math
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pygame
+
+from .glow import GlowCache, shared_cache
+
+
+DEFAULT_CAPACITY = 2048
+# Halo size relative to the particle radius, and its alpha at the center
+GLOW_SCALE = 2
+GLOW_ALPHA = 120
+
+
+class ParticleSystem:
+    """Fixed-capacity particle store with vectorized update and O(n) compaction."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, gravity: Tuple[float, float] = (0.0, 0.0),
+                 drag: float = 1.0, sprites: Optional[GlowCache] = None):
+        self.capacity = capacity
+        self.gravity = np.asarray(gravity, dtype=np.float32)
+        self.drag = float(drag)
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.radius = np.zeros(capacity, dtype=np.int16)
+        self.glow = np.zeros(capacity, dtype=bool)
+        self._arrays = (self.pos, self.vel, self.life, self.color, self.radius, self.glow)
+        self.count = 0
+        self.dropped = 0
+        self.spawned = 0
+        self.peak_active = 0
+        self.sprites = sprites if sprites is not None else shared_cache()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self) -> None:
+        self.count = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Same keys as ObjectPool.stats; ``exhausted`` counts particles refused, not spawn calls."""
+        return {"capacity": self.capacity, "active": self.count, "peak_active": self.peak_active,
+                "acquired": self.spawned, "exhausted": self.dropped}
+
+    def _reserve(self, requested: int) -> slice:
+        """Slots for up to ``requested`` new particles; the overflow is counted in ``dropped``."""
+        granted = min(requested, self.capacity - self.count)
+        self.dropped += requested - granted
+        start = self.count
+        self.count += granted
+        self.spawned += granted
+        self.peak_active = max(self.peak_active, self.count)
+        return slice(start, start + granted)
+
+    def emit(self, positions: Any, velocities: Any, color: Sequence[int], life: Any, radius: Any,
+             glow: bool = False) -> int:
+        """Add particles from arrays (or broadcastable scalars); returns how many were added."""
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 2)
+        slots = self._reserve(len(positions))
+        added = slots.stop - slots.start
+        if added:
+            self.pos[slots] = positions[:added]
+            self.vel[slots] = np.broadcast_to(np.asarray(velocities, dtype=np.float32), (len(positions), 2))[:added]
+            self.life[slots] = np.broadcast_to(np.asarray(life, dtype=np.float32), len(positions))[:added]
+            self.color[slots] = tuple(color)[:3]
+            self.radius[slots] = np.maximum(np.broadcast_to(np.asarray(radius), len(positions))[:added], 1)
+            self.glow[slots] = glow
+        return added
+
+    def spawn(self, pos: Sequence[float], count: int, spread: float, base_vel: Sequence[float],
+              color: Sequence[int], life: float, radius: int, glow: bool = False) -> int:
+        """Burst of ``count`` particles around ``pos``: random direction, speed in [0.5, spread)."""
+        if count <= 0:
+            return 0
+        angle = np.random.uniform(0.0, 2 * math.pi, count)
+        speed = np.random.uniform(0.5, max(spread, 0.5), count)
+        velocities = np.column_stack((base_vel[0] + np.cos(angle) * speed, base_vel[1] + np.sin(angle) * speed))
+        return self.emit(np.broadcast_to(np.asarray(pos, dtype=np.float32), (count, 2)), velocities, color,
+                         life + np.random.randint(-4, 5, count), radius + np.random.randint(-1, 2, count), glow)
+
+    def update(self, dt: float = 1.0) -> None:
+        """Advance every live particle by ``dt`` (frames, or seconds if lives and speeds are in seconds)."""
+        n = self.count
+        if not n:
+            return
+        pos, vel, life = self.pos[:n], self.vel[:n], self.life[:n]
+        pos += vel * dt
+        if self.drag != 1.0:
+            vel *= self.drag ** dt
+        if self.gravity.any():
+            vel += self.gravity * dt
+        life -= dt
+
+        alive = life > 0
+        survivors = int(np.count_nonzero(alive))
+        if survivors < n:
+            for array in self._arrays:
+                array[:survivors] = array[:n][alive]
+            self.count = survivors
+
+    def _sprite(self, color: Tuple[int, int, int], radius: int, glow: bool) -> pygame.Surface:
+        """Particle image, over its radial halo when glowing, from the glow sprite cache."""
+        def render() -> pygame.Surface:
+            half = radius * GLOW_SCALE if glow else radius
+            sprite = pygame.Surface((half * 2 + 1, half * 2 + 1), pygame.SRCALPHA)
+            if glow:
+                sprite.blit(self.sprites.circle(half, color, GLOW_ALPHA), (0, 0))
+            pygame.draw.circle(sprite, color, (half, half), radius)
+            return sprite
+
+        return self.sprites.sprite(("particle", color, radius, glow), render)
+
+    def draw(self, surface: pygame.Surface) -> None:
+        """Blit every live particle in one ``Surface.blits`` call."""
+        n = self.count
+        if not n:
+            return
+        offsets = np.where(self.glow[:n], self.radius[:n] * GLOW_SCALE, self.radius[:n])
+        corners = (self.pos[:n].astype(np.int32) - offsets[:, None]).tolist()
+        keys = zip(map(tuple, self.color[:n].tolist()), self.radius[:n].tolist(), self.glow[:n].tolist())
+        sprite = self._sprite
+        surface.blits([(sprite(*key), corner) for key, corner in zip(keys, corners)], doreturn=False)
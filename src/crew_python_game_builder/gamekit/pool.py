@@ -0,0 +1,104 @@
+"""
+Fixed-size object pool with O(1) acquire and release.
+
+All objects are built up front and kept in one dense list, partitioned so that
+the first ``len(pool)`` entries are live and the rest form the free list. Each
+object's position in that list is tracked, so:
+
+- ``acquire`` takes the first free object and ``release`` swaps an object with
+  the last live one. Both are O(1), where scanning slots for an inactive flag
+  is O(pool size) per spawn;
+- ``active`` and ``retain`` only touch live objects, however large the pool;
+- ``activate`` brings back one particular object, for code that recycles
+  slots by hand.
+
+``stats()`` counts how often the pool ran dry and how many objects were live
+at the peak. allocations.py reports it for every pool a game holds, so pool
+sizes can be tuned from recorded gameplay instead of guessed.
+"""
+from typing import Any, Callable, Dict, Generic, Iterator, List, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class ObjectPool(Generic[T]):
+    """``size`` objects from ``factory``, handed out and taken back in O(1)."""
+
+    def __init__(self, factory: Callable[[], T], size: int):
+        self.slots: List[T] = [factory() for _ in range(size)]  # Stable order, for code that walks every slot
+        self._dense: List[T] = list(self.slots)
+        self._index: Dict[int, int] = {id(obj): i for i, obj in enumerate(self._dense)}
+        self.count = 0
+        self.acquired = 0
+        self.exhausted = 0
+        self.peak_active = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._dense[:self.count])
+
+    @property
+    def active(self) -> List[T]:
+        """Live objects; a copy, so the caller may release while iterating."""
+        return self._dense[:self.count]
+
+    @property
+    def size(self) -> int:
+        return len(self._dense)
+
+    def _swap(self, i: int, j: int) -> None:
+        dense = self._dense
+        dense[i], dense[j] = dense[j], dense[i]
+        self._index[id(dense[i])] = i
+        self._index[id(dense[j])] = j
+
+    def acquire(self) -> Optional[T]:
+        """A free object, now live, or None when every object is in use."""
+        if self.count == len(self._dense):
+            self.exhausted += 1
+            return None
+        obj = self._dense[self.count]
+        self._grow()
+        return obj
+
+    def activate(self, obj: T) -> None:
+        """Mark a specific pooled object live (no-op if it already is)."""
+        i = self._index[id(obj)]
+        if i >= self.count:
+            self._swap(i, self.count)
+            self._grow()
+
+    def _grow(self) -> None:
+        self.count += 1
+        self.acquired += 1
+        if self.count > self.peak_active:
+            self.peak_active = self.count
+
+    def release(self, obj: T) -> None:
+        """Return a live object to the free list (no-op if it is already free)."""
+        i = self._index[id(obj)]
+        if i < self.count:
+            self.count -= 1
+            self._swap(i, self.count)
+
+    def retain(self, keep: Callable[[T], bool]) -> int:
+        """Release every live object for which ``keep`` is false; returns how many were released."""
+        released = 0
+        i = self.count - 1
+        while i >= 0:  # Backwards, so the swap in release only moves already-visited objects
+            obj = self._dense[i]
+            if not keep(obj):
+                self.release(obj)
+                released += 1
+            i -= 1
+        return released
+
+    def clear(self) -> None:
+        self.count = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"capacity": len(self._dense), "active": self.count, "peak_active": self.peak_active,
+                "acquired": self.acquired, "exhausted": self.exhausted}
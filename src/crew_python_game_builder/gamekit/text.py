@@ -0,0 +1,169 @@
+"""
+Font registry and rendered-text cache.
+
+Generated games tend to build a ``pygame.font.Font``/``SysFont`` wherever they
+draw text, and to render every label again on every frame, often twice (shadow
+and text). Both are expensive: opening a font reads and parses the font file,
+and ``Font.render`` rasterizes each glyph.
+
+- ``get_font(name, size, bold, italic)`` opens each font once and returns the
+  same object afterwards. ``name`` is a font file path, a system font name, or
+  None for pygame's default font.
+- ``TextCache.render`` memoizes rendered surfaces per (text, font, color,
+  shadow) in a bounded LRU. A HUD label like ``f"Score: {score}"`` is only
+  rasterized again when the score changes. With a shadow, text and shadow are
+  composed into one surface, so drawing is a single blit.
+- ``blit_text`` renders through the shared cache and places the text by its
+  center or top-left corner, returning the text's rect.
+
+``stats()`` reports hits, misses, evictions and the number of fonts loaded.
+
+Fonts are invalid once pygame (or ``pygame.font``) quits, and using one then
+crashes the interpreter. So ``pygame.quit()`` empties the font registry and
+the shared cache, and ``get_font`` does the same when it finds
+``pygame.font`` shut down. A game run again in the same process then opens
+fresh fonts.
+"""
+import collections
+import os
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+import pygame
+
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_SHADOW_OFFSET = (2, 2)
+FONT_FILE_EXTENSIONS = (".ttf", ".otf", ".fon", ".ttc")
+
+_fonts: Dict[Tuple[Optional[str], int, bool, bool], pygame.font.Font] = {}
+# pygame forgets its quit callbacks once it has called them, so this is re-armed per session
+_quit_registered = False
+
+
+def _forget_fonts() -> None:
+    """Drop every cached font, and the shared surfaces that hold them."""
+    _fonts.clear()
+    if _shared is not None:
+        _shared.clear()
+
+
+def _on_pygame_quit() -> None:
+    global _quit_registered
+    _quit_registered = False
+    _forget_fonts()
+
+
+def get_font(name: Optional[str] = None, size: int = 24, bold: bool = False, italic: bool = False) -> pygame.font.Font:
+    """The font for (name, size, bold, italic), opened on first use."""
+    global _quit_registered
+    if not pygame.font.get_init():
+        # Fonts opened before pygame.font.quit() are unusable
+        _forget_fonts()
+        pygame.font.init()
+    key = (name, int(size), bool(bold), bool(italic))
+    font = _fonts.get(key)
+    if font is None:
+        if not _quit_registered:
+            pygame.register_quit(_on_pygame_quit)
+            _quit_registered = True
+        if name is None or os.path.splitext(name)[1].lower() in FONT_FILE_EXTENSIONS:
+            font = pygame.font.Font(name, key[1])
+            font.set_bold(key[2])
+            font.set_italic(key[3])
+        else:
+            font = pygame.font.SysFont(name, key[1], bold=key[2], italic=key[3])
+        _fonts[key] = font
+    return font
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces, at most ``max_entries`` of them."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        # The entry holds the font too, so its id() cannot be reused while the entry lives
+        self._surfaces: "collections.OrderedDict[Hashable, Tuple[pygame.Surface, pygame.font.Font]]" = \
+            collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def render(self, text: str, font: pygame.font.Font, color: Sequence[int], antialias: bool = True,
+               shadow: Optional[Sequence[int]] = None,
+               shadow_offset: Tuple[int, int] = DEFAULT_SHADOW_OFFSET) -> pygame.Surface:
+        """``font.render(text, antialias, color)``, with ``shadow`` drawn behind at ``shadow_offset``."""
+        key = (text, id(font), tuple(color), antialias, tuple(shadow) if shadow else None,
+               tuple(shadow_offset) if shadow else None)
+        entry = self._surfaces.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return entry[0]
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        if shadow:
+            surface = _with_shadow(surface, font.render(text, antialias, shadow), shadow_offset)
+        self._surfaces[key] = (surface, font)
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self) -> None:
+        self._surfaces.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {"entries": len(self._surfaces), "max_entries": self.max_entries, "fonts": len(_fonts),
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None}
+
+
+def _with_shadow(text: pygame.Surface, shadow: pygame.Surface, offset: Tuple[int, int]) -> pygame.Surface:
+    """Text over its shadow in one surface; the text's top-left corner stays at (0, 0) for offsets >= 0."""
+    dx, dy = offset
+    surface = pygame.Surface((text.get_width() + abs(dx), text.get_height() + abs(dy)), pygame.SRCALPHA)
+    surface.blit(shadow, (max(dx, 0), max(dy, 0)))
+    surface.blit(text, (max(-dx, 0), max(-dy, 0)))
+    return surface
+
+
+_shared: Optional[TextCache] = None
+
+
+def shared_cache() -> TextCache:
+    """The process-wide text cache, created on first use."""
+    global _shared
+    if _shared is None:
+        _shared = TextCache()
+    return _shared
+
+
+def render_text(text: str, font: pygame.font.Font, color: Sequence[int], antialias: bool = True,
+                shadow: Optional[Sequence[int]] = None,
+                shadow_offset: Tuple[int, int] = DEFAULT_SHADOW_OFFSET) -> pygame.Surface:
+    """``TextCache.render`` on the shared cache; a drop-in for ``font.render(text, True, color)``."""
+    return shared_cache().render(text, font, color, antialias, shadow, shadow_offset)
+
+
+def blit_text(surface: pygame.Surface, text: str, pos: Sequence[int], font: pygame.font.Font,
+              color: Sequence[int], center: bool = False, shadow: Optional[Sequence[int]] = None,
+              shadow_offset: Tuple[int, int] = DEFAULT_SHADOW_OFFSET) -> pygame.Rect:
+    """Draw cached text centered on, or with its top-left corner at, ``pos``; returns the text's rect."""
+    rendered = render_text(text, font, color, shadow=shadow, shadow_offset=shadow_offset)
+    width, height = rendered.get_size()
+    if shadow:
+        width, height = width - abs(shadow_offset[0]), height - abs(shadow_offset[1])
+    rect = pygame.Rect(0, 0, width, height)
+    if center:
+        rect.center = (int(pos[0]), int(pos[1]))
+    else:
+        rect.topleft = (int(pos[0]), int(pos[1]))
+    if shadow:
+        surface.blit(rendered, (rect.x - max(-shadow_offset[0], 0), rect.y - max(-shadow_offset[1], 0)))
+    else:
+        surface.blit(rendered, rect)
+    return rect
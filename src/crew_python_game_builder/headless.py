@@ -0,0 +1,297 @@
+"""
+Headless harness for running generated pygame games without a display.
+
+Every generated game drives its main loop through ``pygame.time.Clock.tick``,
+so the harness swaps ``pygame.time.Clock`` for a counting wrapper before the
+game module is executed. Each ``tick`` marks the end of a frame; once the frame
+budget is spent the wrapper raises ``FrameBudgetReached`` (a ``BaseException``,
+so the games' ``except Exception`` blocks cannot swallow it) and the run stops.
+
+The module can be used in-process (``run_headless``) or through a child
+interpreter (``benchmark_game``), which is what the crew uses so a misbehaving
+game can never take the builder down with it. When the shared sandbox pool is
+running (see sandbox.py), ``benchmark_game`` uses one of its pre-warmed workers
+instead of starting a new interpreter.
+"""
+import functools
+import gc
+import json
+import os
+import runpy
+import subprocess
+import sys
+import time
+import traceback
+import types
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+DEFAULT_BENCHMARK_FRAMES = 300
+DEFAULT_BENCHMARK_TIMEOUT = 60
+
+
+class FrameBudgetReached(BaseException):
+    """Raised from the hooked clock once the requested number of frames has run."""
+
+
+def configure_headless_environment() -> None:
+    """Point SDL at its dummy video/audio drivers. Must run before pygame is imported."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+
+class FrameHook:
+    """Frame accounting shared by every clock the game creates."""
+
+    def __init__(self, max_frames: int, on_frame: Optional[Callable[[int], None]] = None,
+                 uncapped: bool = True, fixed_dt: bool = True):
+        self.max_frames = max_frames
+        self.on_frame = on_frame
+        self.uncapped = uncapped
+        self.fixed_dt = fixed_dt
+        self.frames = 0
+        # Last frame-rate cap the game asked for; drives virtual time in replays
+        self.target_fps = 60.0
+        self.frame_times: List[float] = []
+        self.started_at: Optional[float] = None
+        self._last_tick: Optional[float] = None
+
+    def tick(self, real_clock: Any, framerate: float) -> int:
+        """Advance one frame and return the millisecond delta the game should see."""
+        now = time.perf_counter()
+        if self.started_at is None:
+            self.started_at = now
+        elif self._last_tick is not None:
+            self.frame_times.append(now - self._last_tick)
+        self._last_tick = now
+
+        if framerate:
+            self.target_fps = framerate
+        measured = real_clock.tick(0 if self.uncapped else framerate)
+        self.frames += 1
+        if self.on_frame is not None:
+            self.on_frame(self.frames)
+        if self.frames >= self.max_frames:
+            raise FrameBudgetReached()
+
+        # With a fixed dt the simulation advances exactly as it would at the
+        # target frame rate, however fast the headless loop actually runs.
+        if self.fixed_dt and framerate:
+            return int(1000 / framerate)
+        return measured
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarize frame timings collected so far."""
+        elapsed = (self._last_tick - self.started_at) if self.started_at and self._last_tick else 0.0
+        times = sorted(self.frame_times)
+        stats: Dict[str, Any] = {
+            "frames": self.frames,
+            "elapsed_s": round(elapsed, 4),
+            "fps": round(len(times) / elapsed, 2) if elapsed > 0 else None,
+            "mean_frame_ms": None,
+            "p95_frame_ms": None,
+        }
+        if times:
+            stats["mean_frame_ms"] = round(sum(times) / len(times) * 1000, 3)
+            stats["p95_frame_ms"] = round(times[min(len(times) - 1, int(len(times) * 0.95))] * 1000, 3)
+        return stats
+
+
+def install_clock_hook(hook: FrameHook) -> Callable[[], None]:
+    """Replace ``pygame.time.Clock`` with a wrapper that reports to ``hook``.
+
+    Returns a callable that restores the original clock class.
+    """
+    import pygame
+
+    real_clock_cls = pygame.time.Clock
+
+    class HookedClock:
+        def __init__(self, *args, **kwargs):
+            self._clock = real_clock_cls(*args, **kwargs)
+
+        def tick(self, framerate: float = 0) -> int:
+            return hook.tick(self._clock, framerate)
+
+        def tick_busy_loop(self, framerate: float = 0) -> int:
+            return hook.tick(self._clock, framerate)
+
+        def __getattr__(self, name):
+            return getattr(self._clock, name)
+
+    pygame.time.Clock = HookedClock
+
+    def restore() -> None:
+        pygame.time.Clock = real_clock_cls
+
+    return restore
+
+
+def install_uncapped_loop() -> Callable[[], None]:
+    """Put games built on ``gamekit.loop.FixedStepLoop`` in uncapped mode: one fixed step per frame.
+
+    The hooked clock already reports a fixed frame time, but a fixed-step loop
+    would still run 0 or 2 steps on some frames when the frame and step
+    lengths differ (16 ms ticks against 16.67 ms steps). One step per frame
+    keeps runs deterministic and replays frame-exact, and it is installed for
+    recording too, so a session replays step for step. Whether frames wait
+    for the cap is still up to the hooked clock.
+    """
+    from .gamekit.loop import UNCAPPED_ENV
+
+    previous = os.environ.get(UNCAPPED_ENV)
+    os.environ[UNCAPPED_ENV] = "1"
+
+    def restore() -> None:
+        if previous is None:
+            os.environ.pop(UNCAPPED_ENV, None)
+        else:
+            os.environ[UNCAPPED_ENV] = previous
+
+    return restore
+
+
+def forget_local_gamekit() -> None:
+    """Drop a published game's own ``gamekit`` copy from ``sys.modules``.
+
+    Published games import the game kit from a ``gamekit/`` folder next to
+    them (see vendoring.py). Called before each run: otherwise a game run in
+    the same process as an earlier one would get the earlier game's copy,
+    which may lack modules it needs. The copy stays loaded after the run so
+    reports can read its caches.
+    """
+    from .vendoring import LOCAL_PACKAGE
+
+    for name in [name for name in sys.modules if name == LOCAL_PACKAGE or name.startswith(LOCAL_PACKAGE + ".")]:
+        del sys.modules[name]
+
+
+@functools.lru_cache(maxsize=4096)
+def defined_in_game(cls: type, game_path: str) -> bool:
+    """True for classes defined by the game at ``game_path`` (games run as ``__main__``)."""
+    if getattr(cls, "__module__", None) != "__main__":
+        return False
+    # Only the class dict is inspected; proxies and mocks can fail on attribute access
+    return any(isinstance(value, types.FunctionType) and value.__code__.co_filename == game_path
+               for value in vars(cls).values())
+
+
+def game_objects(game_path: str) -> Iterator[Any]:
+    """Live instances of the game's own classes, found through the garbage collector."""
+    for obj in gc.get_objects():
+        cls = type(obj)
+        if defined_in_game(cls, game_path) and not isinstance(obj, type):
+            yield obj
+
+
+def peak_memory_mb() -> Optional[float]:
+    """Peak resident set size of the current process in megabytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 2)
+
+
+def run_headless(game_path: str, max_frames: int = DEFAULT_BENCHMARK_FRAMES,
+                 on_frame: Optional[Callable[[int], None]] = None,
+                 uncapped: bool = True, fixed_dt: bool = True,
+                 hooks: Sequence[Callable[[FrameHook], Callable[[], None]]] = (),
+                 headless: bool = True) -> Dict[str, Any]:
+    """Run a generated game in this process for at most ``max_frames`` frames.
+
+    ``hooks`` are installed after the clock hook, in order, and each returns a
+    callable that undoes it; they are how recording, replay and profiling
+    attach to a game without editing it. ``headless=False`` keeps the real
+    display, e.g. for recording a human session.
+    """
+    if headless:
+        configure_headless_environment()
+    game_path = os.path.abspath(game_path)
+    game_dir = os.path.dirname(game_path)
+
+    hook = FrameHook(max_frames, on_frame=on_frame, uncapped=uncapped, fixed_dt=fixed_dt)
+    result: Dict[str, Any] = {"game_path": game_path, "status": "completed", "error": None}
+
+    previous_cwd = os.getcwd()
+    restores: List[Callable[[], None]] = []
+    try:
+        restores.append(install_clock_hook(hook))
+        if fixed_dt:
+            restores.append(install_uncapped_loop())
+        for install in hooks:
+            restores.append(install(hook))
+        # Games resolve assets relative to their own folder
+        os.chdir(game_dir)
+        sys.path.insert(0, game_dir)
+        forget_local_gamekit()
+        runpy.run_path(game_path, run_name="__main__")
+        result["status"] = "returned"
+    except FrameBudgetReached:
+        result["status"] = "completed"
+    except SystemExit:
+        result["status"] = "exited"
+    except Exception as e:
+        result["status"] = "crashed"
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    finally:
+        for restore in reversed(restores):
+            restore()
+        os.chdir(previous_cwd)
+        if game_dir in sys.path:
+            sys.path.remove(game_dir)
+
+    result.update(hook.stats())
+    result["peak_memory_mb"] = peak_memory_mb()
+    return result
+
+
+def benchmark_game(game_path: str, frames: int = DEFAULT_BENCHMARK_FRAMES,
+                   timeout: int = DEFAULT_BENCHMARK_TIMEOUT) -> Dict[str, Any]:
+    """Benchmark a generated game in a fresh interpreter and return its frame stats."""
+    from .sandbox import shared_pool
+
+    pool = shared_pool()
+    if pool is not None:
+        return pool.run_game(game_path, frames=frames, timeout=timeout)
+
+    command = [sys.executable, "-m", "crew_python_game_builder.headless", game_path, "--frames", str(frames)]
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"game_path": game_path, "status": "timeout", "error": f"No result within {timeout}s",
+                "frames": 0, "fps": None, "peak_memory_mb": None}
+
+    # The result is always the last line; games are free to print before it
+    lines = completed.stdout.strip().splitlines()
+    try:
+        return json.loads(lines[-1])
+    except (IndexError, json.JSONDecodeError):
+        return {"game_path": game_path, "status": "crashed",
+                "error": completed.stderr.strip()[-2000:] or "Benchmark produced no result",
+                "frames": 0, "fps": None, "peak_memory_mb": None}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a generated game headless and report frame stats.")
+    parser.add_argument("game_path", help="Path to generated_game.py")
+    parser.add_argument("--frames", type=int, default=DEFAULT_BENCHMARK_FRAMES)
+    parser.add_argument("--capped", action="store_true", help="Honour the game's frame-rate cap")
+    args = parser.parse_args(argv)
+
+    result = run_headless(args.game_path, max_frames=args.frames, uncapped=not args.capped)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Runtime hotspot profiler for generated games.
+
+Runs a game headless for a fixed number of frames and reports where the frame
+time goes, as structured JSON an agent can act on:
+
+- functions of the game (cProfile, deterministic): calls per frame, and the
+  share of frame time spent inside each function, with and without callees;
+- library calls (``Surface.blit``, ``Font.render``, ``pygame.draw.line``...):
+  their share of frame time, split by the game functions that make them;
+- source lines: a CPU-time sampler (``ITIMER_PROF``, POSIX only) charges each
+  sample to the innermost game line on the stack;
+- constructions: surfaces, fonts and transformed images built per frame and
+  per second, from allocations.ConstructionCounter.
+
+``hotspots`` sums all of that up as short sentences, e.g. "draw_text: 38% of
+frame time (line 39)" or "pygame.font.Font constructed 240 times/sec at line 41
+in draw_text". ``PerformanceOptimizerTool`` returns them next to its static
+advice when an agent asks for a runtime profile.
+"""
+import argparse
+import collections
+import cProfile
+import json
+import os
+import pstats
+import re
+import signal
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .allocations import ConstructionCounter, code_names, enclosing_names
+from .headless import FrameHook, run_headless
+
+
+PROFILE_HANDLER = "crew_python_game_builder.hotspots:profile_hotspots"
+DEFAULT_PROFILE_FRAMES = 300
+DEFAULT_TOP = 8
+SAMPLE_INTERVAL_S = 0.001
+# Shares below this are left out of the summary sentences
+MIN_REPORTED_SHARE = 0.05
+# Constructions at about once per frame or more are reported
+MIN_REPORTED_PER_FRAME = 0.9
+# Functions called less often than this per frame (main, run loops) contain the whole frame; not hotspots
+MIN_FRAME_CALLS = 0.5
+
+_METHOD = re.compile(r"<method '(\w+)' of '(?:[\w.]+\.)?(\w+)' objects>")
+_BUILTIN = re.compile(r"<built-in method ([\w.]+)>")
+
+
+def call_label(function: Tuple[str, int, str]) -> str:
+    """Readable name for a profiled C function, e.g. ``Surface.blit``."""
+    name = function[2]
+    match = _METHOD.match(name)
+    if match:
+        return f"{match.group(2)}.{match.group(1)}"
+    match = _BUILTIN.match(name)
+    return match.group(1) if match else name
+
+
+class LineSampler:
+    """Charges CPU-time samples to the innermost game line on the stack."""
+
+    def __init__(self, game_path: str, interval_s: float = SAMPLE_INTERVAL_S):
+        self.game_path = os.path.abspath(game_path)
+        self.interval_s = interval_s
+        self.lines: collections.Counter = collections.Counter()
+        self.samples = 0
+
+    def _sample(self, signum: int, frame: Any) -> None:
+        self.samples += 1
+        while frame is not None and frame.f_code.co_filename != self.game_path:
+            frame = frame.f_back
+        if frame is not None:
+            self.lines[frame.f_lineno] += 1
+
+    def install(self, hook: FrameHook) -> Callable[[], None]:
+        if not hasattr(signal, "setitimer"):
+            return lambda: None
+        try:
+            previous = signal.signal(signal.SIGPROF, self._sample)
+        except ValueError:  # Not the main thread
+            return lambda: None
+        signal.setitimer(signal.ITIMER_PROF, self.interval_s, self.interval_s)
+
+        def restore() -> None:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, previous)
+
+        return restore
+
+
+class HotspotProfiler:
+    """cProfile, the line sampler and the construction counter over one headless run."""
+
+    def __init__(self, game_path: str):
+        self.game_path = os.path.abspath(game_path)
+        self.profile = cProfile.Profile()
+        self.sampler = LineSampler(game_path)
+        self.constructions = ConstructionCounter(game_path)
+        self.hook: Optional[FrameHook] = None
+
+    def install(self, hook: FrameHook) -> Callable[[], None]:
+        self.hook = hook
+        restores = [self.constructions.install(hook), self.sampler.install(hook)]
+        self.profile.enable()
+
+        def restore() -> None:
+            self.profile.disable()
+            for undo in reversed(restores):
+                undo()
+
+        return restore
+
+    def report(self, run: Dict[str, Any], top: int = DEFAULT_TOP) -> Dict[str, Any]:
+        with open(self.game_path, "r", encoding="utf-8") as file:
+            source_lines = file.read().splitlines()
+        names = enclosing_names("\n".join(source_lines))
+        functions_by_code = code_names("\n".join(source_lines))
+        frames = max(1, self.hook.frames if self.hook else 0)
+        fps = self.hook.target_fps if self.hook else 60.0
+        stats = pstats.Stats(self.profile).stats
+        total_s = max(sum(entry[2] for entry in stats.values()), 1e-9)
+
+        def name_of(line: int, fallback: str) -> str:
+            return names.get(line, fallback)
+
+        def function_of(line: int, code_name: str) -> str:
+            # cProfile keys a function by its code object's first line, a decorator's for decorated ones
+            return functions_by_code.get((line, code_name), name_of(line, code_name))
+
+        def share(seconds: float) -> float:
+            return round(seconds / total_s, 4)
+
+        functions = []
+        for (filename, line, function), (_, calls, self_s, total, _) in stats.items():
+            if filename == self.game_path and function != "<module>":
+                functions.append({"function": function_of(line, function), "line": line,
+                                  "calls_per_frame": round(calls / frames, 2),
+                                  "self_share": share(self_s), "total_share": share(total),
+                                  "total_ms_per_frame": round(total * 1000 / frames, 3)})
+        functions.sort(key=lambda entry: -entry["total_share"])
+
+        calls = []
+        for key, (_, count, self_s, total, callers) in stats.items():
+            if key[0] != "~":
+                continue
+            by_caller = sorted(((caller_total, caller) for caller, (_, _, _, caller_total) in callers.items()
+                                if caller[0] == self.game_path), reverse=True)
+            if not by_caller:
+                continue
+            calls.append({"call": call_label(key), "calls_per_frame": round(count / frames, 2),
+                          "share": share(total),
+                          "callers": [{"function": function_of(caller[1], caller[2]), "line": caller[1],
+                                       "share": share(caller_total)} for caller_total, caller in by_caller[:3]]})
+        calls.sort(key=lambda entry: -entry["share"])
+
+        samples = max(1, self.sampler.samples)
+        lines = [{"line": line, "function": name_of(line, "<module>"), "share": round(count / samples, 4),
+                  "source": source_lines[line - 1].strip() if 0 < line <= len(source_lines) else ""}
+                 for line, count in self.sampler.lines.most_common(top)]
+
+        constructions = [{"call": label, "line": line, "function": name_of(line, "<module>"),
+                          "per_frame": round(count / frames, 2), "per_second": round(count / frames * fps, 1)}
+                         for (label, line), count in self.constructions.counts.most_common(top)]
+
+        hotspots = [f"{entry['function']}: {entry['total_share']:.0%} of frame time (line {entry['line']}, "
+                    f"{entry['total_ms_per_frame']} ms/frame, {entry['calls_per_frame']} calls/frame)"
+                    for entry in functions[:top] if entry["total_share"] >= MIN_REPORTED_SHARE
+                    and entry["calls_per_frame"] >= MIN_FRAME_CALLS]
+        hotspots += [f"{entry['call']}: {entry['share']:.0%} of frame time, {entry['calls_per_frame']} calls/frame, "
+                     f"mostly from {entry['callers'][0]['function']} (line {entry['callers'][0]['line']})"
+                     for entry in calls[:top] if entry["share"] >= MIN_REPORTED_SHARE]
+        hotspots += [f"line {entry['line']} in {entry['function']}: {entry['share']:.0%} of CPU samples - {entry['source']}"
+                     for entry in lines if entry["share"] >= MIN_REPORTED_SHARE]
+        hotspots += [f"{entry['call']} constructed {entry['per_second']:g} times/sec at line {entry['line']} "
+                     f"in {entry['function']}" for entry in constructions if entry["per_frame"] >= MIN_REPORTED_PER_FRAME]
+        return {
+            "status": run["status"],
+            "error": run.get("error"),
+            "frames": run.get("frames"),
+            "fps": run.get("fps"),
+            "mean_frame_ms": run.get("mean_frame_ms"),
+            "functions": functions[:top],
+            "library_calls": calls[:top],
+            "lines": lines,
+            "constructions": constructions,
+            "hotspots": hotspots,
+        }
+
+
+def profile_hotspots(game_path: str, frames: int = DEFAULT_PROFILE_FRAMES, top: int = DEFAULT_TOP,
+                     recording_path: Optional[str] = None) -> Dict[str, Any]:
+    """Run ``game_path`` headless under the profilers and return the hotspot report."""
+    profiler = HotspotProfiler(game_path)
+    hooks = []
+    if recording_path:
+        from .recording import Player, Recording
+        hooks.append(Player(Recording.load(recording_path)).install)
+    hooks.append(profiler.install)
+    run = run_headless(game_path, max_frames=frames, hooks=hooks)
+    return profiler.report(run, top=top)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line interface: profile one game's frame time."""
+    parser = argparse.ArgumentParser(prog="hotspots", description="Profile where a generated game spends its frame time.")
+    parser.add_argument("game_path", help="Path to generated_game.py")
+    parser.add_argument("--frames", type=int, default=DEFAULT_PROFILE_FRAMES)
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    parser.add_argument("--recording", help="Drive the game with a recorded session (see `recording record`)")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    report = profile_hotspots(args.game_path, frames=args.frames, top=args.top, recording_path=args.recording)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{args.game_path}: {report['status']} after {report['frames']} frames, "
+              f"{report['mean_frame_ms']} ms/frame{' - ' + report['error'] if report['error'] else ''}")
+        for hotspot in report["hotspots"] or ["No hotspots above the reporting thresholds."]:
+            print(f"  - {hotspot}")
+    return 0 if report["status"] != "crashed" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,16 @@ import warnings
 import yaml
 
 from crew_python_game_builder.crew import CrewPythonGameBuilder
+from crew_python_game_builder import catalog as build_catalog
+from crew_python_game_builder import artifacts as artifact_store
+from crew_python_game_builder import routing as model_routing
+from crew_python_game_builder import snippets as component_index
+from crew_python_game_builder import sandbox as game_sandbox
+from crew_python_game_builder import recording as session_recording
+from crew_python_game_builder import allocations as allocation_profiler
+from crew_python_game_builder import fuzz as crash_fuzzer
+from crew_python_game_builder import hotspots as hotspot_profiler
+from crew_python_game_builder.settings import parse_overrides
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -12,9 +22,23 @@ warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 # Replace with inputs you want to test with, it will automatically
 # interpolate any tasks and agents information
 
+def _split_overrides(argv):
+    """Separate `--set section.key=value` pairs from positional arguments"""
+    positional, assignments = [], []
+    args = iter(argv)
+    for arg in args:
+        if arg == '--set':
+            assignments.append(next(args, ''))
+        elif arg.startswith('--set='):
+            assignments.append(arg[len('--set='):])
+        else:
+            positional.append(arg)
+    return positional, parse_overrides(assignments)
+
 def run():
     """
     Run the crew.
+    Per-run config overrides: `crewai run pong --set agent_settings.senior_engineer.max_iter=2`
     """
     print("## Welcome to the Game Builder Crew")
     print('-------------------------------')
@@ -23,7 +47,8 @@ def run():
         examples = yaml.safe_load(file)
 
     # Determine game key from command line argument or default
-    game_key = sys.argv[1] if len(sys.argv) > 1 else 'example3_pong'
+    args, config_overrides = _split_overrides(sys.argv[1:])
+    game_key = args[0] if args else 'example3_pong'
     
     if game_key not in examples:
         # Try to find by name matching
@@ -48,8 +73,8 @@ def run():
     print(f"🎮 Generating game: {inputs['game'].get('name', game_key)}")
     print('-------------------------------')
     
+    crew_builder = CrewPythonGameBuilder(game_name=game_name, game_key=game_key, config_overrides=config_overrides)
     try:
-        crew_builder = CrewPythonGameBuilder(game_name=game_name)
         result = crew_builder.crew().kickoff(inputs=inputs)
         
         print("\n\n########################")
@@ -61,11 +86,13 @@ def run():
         print("- ui_design_specs.md (UI/UX design specifications)")
         print("- audio_design_specs.md (Audio design specifications)")
         print("- code_review.md (Code review report)")
+        print("- review_findings.json (Review findings as patches)")
         print("- final_evaluation.md (Final evaluation report)")
         print(f"\nTo run the generated game:")
         print(f"python {crew_builder.output_folder}/generated_game.py")
         print(f"\nCrew execution result: {result}")
     except Exception as e:
+        crew_builder.mark_build_failed()
         raise Exception(f"An error occurred while running the crew: {e}")
 
 
@@ -104,6 +131,60 @@ def replay():
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
 
+def catalog():
+    """
+    Query the build catalog, e.g. `catalog slowest code_task --last 50` or `catalog trend pong`.
+    """
+    sys.exit(build_catalog.main(sys.argv[1:]))
+
+def artifacts():
+    """
+    Browse, restore and prune stored build snapshots, e.g. `artifacts checkout pong_game <snapshot>`.
+    """
+    sys.exit(artifact_store.main(sys.argv[1:]))
+
+def routing():
+    """
+    Explain per-agent model choices or report savings, e.g. `routing explain` or `routing report --last 20`.
+    """
+    sys.exit(model_routing.main(sys.argv[1:]))
+
+def snippets():
+    """
+    Search components of earlier games, e.g. `snippets search "particle pool kind:class"` or `snippets stats`.
+    """
+    sys.exit(component_index.main(sys.argv[1:]))
+
+def sandbox():
+    """
+    Benchmark generated games in pre-warmed sandbox workers, e.g. `sandbox batch --frames 300 --workers 4`.
+    """
+    sys.exit(game_sandbox.main(sys.argv[1:]))
+
+def recording():
+    """
+    Record a play session and replay it deterministically, e.g. `recording play session.json --game output/pong_game/generated_game.py`.
+    """
+    sys.exit(session_recording.main(sys.argv[1:]))
+
+def allocations():
+    """
+    Profile per-frame allocations and leaks of a game, e.g. `allocations output/snake_game/generated_game.py --recording snake.json`.
+    """
+    sys.exit(allocation_profiler.main(sys.argv[1:]))
+
+def fuzz():
+    """
+    Fuzz a game with random input and save a minimal replay per unique crash, e.g. `fuzz run output/simple_tetris/generated_game.py --sessions 2000`.
+    """
+    sys.exit(crash_fuzzer.main(sys.argv[1:]))
+
+def hotspots():
+    """
+    Profile where a game spends its frame time, e.g. `hotspots output/snake_game/generated_game.py --frames 600`.
+    """
+    sys.exit(hotspot_profiler.main(sys.argv[1:]))
+
 def test():
     """
     Test the crew execution and returns the results.
@@ -0,0 +1,319 @@
+"""
+Parallel per-module code generation for large games.
+
+One ``code_task`` completion for a big spec (carrom, kabaddi) gets close to the
+model's output limit, which makes it slow and error-prone. In modular mode the
+code is produced in three steps instead:
+
+1. a small interface skeleton: imports, constants and every class from
+   ``architecture_design.md`` with its method signatures stubbed out;
+2. the classes are split into balanced modules, and each module is implemented
+   concurrently against that shared skeleton;
+3. the modules are merged back into a single ``generated_game.py`` (imports
+   deduplicated, base classes ordered before subclasses) and validated by the
+   usual build checks.
+
+Generation time then scales with the largest module instead of the whole game.
+
+crewAI drives ``code_task`` through an agent, so the generator is exposed as a
+custom LLM (``ModularGenerationLLM``) that answers the code_task prompt with
+the merged file, and hands the prompt to the real model unchanged when the
+architecture is too small to be worth splitting.
+"""
+import ast
+import concurrent.futures
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from crewai import BaseLLM
+
+
+SKELETON_PROMPT = """Write the shared interface skeleton for a Python pygame game.
+
+Game specification:
+{game}
+
+Architecture:
+{architecture}
+
+UI/UX specification (excerpt):
+{ui_spec}
+
+Produce ONE Python file containing:
+- all imports the game needs
+- all constants (screen size, colors, speeds, fonts, states)
+- every one of these classes: {classes}
+  with base classes, a docstring, __init__ assigning every attribute with a
+  type comment, and every public method signature with a one-line docstring
+  and a body of `...`
+- a main() function and the if __name__ == "__main__": block calling it
+
+Do not implement any behaviour. Return only Python code, no markdown."""
+
+MODULE_PROMPT = """You are implementing part of a Python pygame game. Other
+developers implement the remaining classes in parallel against the same
+interface skeleton, so you must keep every signature and attribute name
+exactly as declared.
+
+Game specification:
+{game}
+
+UI/UX specification (excerpt):
+{ui_spec}
+
+Audio specification (excerpt):
+{audio_spec}
+
+Components from earlier games you may adapt:
+{references}
+
+Interface skeleton shared by all modules:
+{skeleton}
+
+Implement ONLY these classes, completely and with comments: {classes}
+You may add private helper functions or classes they need. Do not repeat the
+constants, other classes or main(). Return only Python code, no markdown."""
+
+_FENCE = re.compile(r"^```[a-zA-Z]*\s*\n|\n?```\s*$")
+_CLASS_STATEMENT = re.compile(r"^\s*class\s+([A-Z][A-Za-z0-9_]*)", re.MULTILINE)
+# Box-diagram headers such as "|   PhysicsEngine   |" or "| Striker (inherits Coin) |"
+_BOX_HEADER = re.compile(r"\|\s*([A-Z][A-Za-z0-9_]+)(?:\s*\([^)|]*\))?\s*(?=\|)")
+# Attribute/method lines inside the boxes start with -, + or #
+_MEMBER_LINE = re.compile(r"^\s*\|\s*[-+#]")
+# Markdown tables (header, |---| separator, rows) describe modules, not classes
+_TABLE_SEPARATOR = re.compile(r"^\s*\|?\s*:?-{3,}:?\s*\|")
+_NOT_CLASSES = {"Enum", "List", "Dict", "Tuple", "Optional", "Rect", "Vector2", "Surface", "UML", "API"}
+
+
+def strip_fences(text: str) -> str:
+    return _FENCE.sub("", text.strip()).strip() + "\n"
+
+
+def extract_classes(architecture: str) -> List[str]:
+    """Class names declared in an architecture document, in order of first appearance."""
+    found: List[str] = []
+
+    def add(name: str) -> None:
+        if name not in found and name not in _NOT_CLASSES:
+            found.append(name)
+
+    lines = architecture.splitlines()
+    in_table = set()
+    for index, line in enumerate(lines):
+        if _TABLE_SEPARATOR.match(line):
+            in_table.add(index - 1)
+            row = index
+            while row < len(lines) and lines[row].lstrip().startswith("|"):
+                in_table.add(row)
+                row += 1
+
+    for index, line in enumerate(lines):
+        if _MEMBER_LINE.match(line) or index in in_table:
+            continue
+        for name in _CLASS_STATEMENT.findall(line):
+            add(name)
+        for name in _BOX_HEADER.findall(line):
+            add(name)
+    return found
+
+
+def partition_classes(weights: Dict[str, int], max_modules: int) -> List[List[str]]:
+    """Greedy longest-first split of classes into at most ``max_modules`` balanced groups."""
+    module_count = max(1, min(max_modules, len(weights)))
+    modules: List[List[str]] = [[] for _ in range(module_count)]
+    loads = [0] * module_count
+    for name in sorted(weights, key=lambda name: -weights[name]):
+        index = loads.index(min(loads))
+        modules[index].append(name)
+        loads[index] += weights[name]
+    order = list(weights)
+    return [sorted(module, key=order.index) for module in modules if module]
+
+
+def class_weights(skeleton: str, classes: List[str]) -> Dict[str, int]:
+    """Rough implementation size per class: its declared methods, at least one."""
+    weights = {name: 1 for name in classes}
+    try:
+        tree = ast.parse(skeleton)
+    except SyntaxError:
+        return weights
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            methods = sum(1 for item in node.body if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)))
+            weights[node.name] = max(1, methods)
+    return weights
+
+
+def _segments(code: str) -> Optional[List[Any]]:
+    """Top-level statements as ``(node, source)`` pairs, or None when the code does not parse."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+    lines = code.splitlines()
+    segments = []
+    for index, node in enumerate(tree.body):
+        start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])]) - 1
+        end = tree.body[index + 1].lineno - 1 if index + 1 < len(tree.body) else len(lines)
+        # Trailing comments belong to the next statement, so stop at the node's own end
+        end = min(end, node.end_lineno)
+        segments.append((node, "\n".join(lines[start:end])))
+    return segments
+
+
+def _is_main_block(node: ast.AST) -> bool:
+    return isinstance(node, ast.If) and "__name__" in ast.dump(node.test)
+
+
+def _order_classes(blocks: List[Any]) -> List[Any]:
+    """Move class definitions after the classes they inherit from."""
+    names = {node.name for node, _ in blocks if isinstance(node, ast.ClassDef)}
+    placed: List[Any] = []
+    placed_names = set()
+    pending = list(blocks)
+    while pending:
+        for block in pending:
+            node = block[0]
+            bases = {base.id for base in getattr(node, "bases", []) if isinstance(base, ast.Name)}
+            if not (bases & names) - placed_names:
+                placed.append(block)
+                if isinstance(node, ast.ClassDef):
+                    placed_names.add(node.name)
+                pending.remove(block)
+                break
+        else:
+            # Cyclic or unresolvable bases: keep the remaining order
+            placed.extend(pending)
+            break
+    return placed
+
+
+def merge_modules(skeleton: str, modules: List[str]) -> str:
+    """Merge module implementations into the skeleton as one file."""
+    skeleton_segments = _segments(skeleton)
+    module_segments = [_segments(module) for module in modules]
+    if skeleton_segments is None or any(segments is None for segments in module_segments):
+        # Something doesn't parse: concatenate and let validation and repair point at it
+        body = [skeleton] + modules
+        return "\n\n".join(part.strip() for part in body) + "\n"
+
+    imports: List[str] = []
+    definitions: List[Any] = []
+    for segments in module_segments:
+        for node, source in segments:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                if source not in imports:
+                    imports.append(source)
+            else:
+                definitions.append((node, source))
+
+    skeleton_imports: List[str] = []
+    header: List[str] = []
+    classes: List[Any] = []
+    tail: List[str] = []
+    for node, source in skeleton_segments:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            skeleton_imports.append(source)
+        elif _is_main_block(node) or (isinstance(node, ast.FunctionDef) and node.name == "main"):
+            tail.append(source)
+        elif isinstance(node, (ast.ClassDef, ast.FunctionDef)):
+            classes.append((node, source))
+        else:
+            header.append(source)
+
+    # Implementations replace their stubs in skeleton order; stubs nobody
+    # implemented stay, and module-private helpers go before the classes
+    by_name = {node.name: (node, source) for node, source in definitions
+               if isinstance(node, (ast.ClassDef, ast.FunctionDef))}
+    declared = {node.name for node, _ in classes}
+    helpers = [block for block in definitions if getattr(block[0], "name", None) not in declared]
+    ordered = _order_classes(helpers + [by_name.get(node.name, (node, source)) for node, source in classes])
+    imports = skeleton_imports + [source for source in imports if source not in skeleton_imports]
+    parts = ["\n".join(imports), "\n".join(header)] + [source for _, source in ordered] + tail
+    return "\n\n\n".join(part.strip("\n") for part in parts if part.strip()) + "\n"
+
+
+class ModularGenerator:
+    """Skeleton first, then modules in parallel, then merge."""
+
+    def __init__(self, complete: Callable[[str], str], max_workers: int = 3,
+                 max_modules: int = 4, spec_excerpt_chars: int = 6000):
+        self.complete = complete
+        self.max_workers = max_workers
+        self.max_modules = max_modules
+        self.spec_excerpt_chars = spec_excerpt_chars
+
+    def generate(self, game: Any, architecture: str, ui_spec: str = "", audio_spec: str = "",
+                 classes: Optional[List[str]] = None, references: str = "") -> Dict[str, Any]:
+        classes = classes or extract_classes(architecture)
+        game_text = game if isinstance(game, str) else json.dumps(game, indent=2)
+        ui_excerpt = ui_spec[:self.spec_excerpt_chars]
+        audio_excerpt = audio_spec[:self.spec_excerpt_chars]
+
+        skeleton = strip_fences(self.complete(SKELETON_PROMPT.format(
+            game=game_text, architecture=architecture, ui_spec=ui_excerpt, classes=", ".join(classes))))
+        modules = partition_classes(class_weights(skeleton, classes), self.max_modules)
+
+        def implement(module: List[str]) -> str:
+            return strip_fences(self.complete(MODULE_PROMPT.format(
+                game=game_text, ui_spec=ui_excerpt, audio_spec=audio_excerpt,
+                references=references or "None", skeleton=skeleton, classes=", ".join(module))))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            implementations = list(executor.map(implement, modules))
+
+        return {
+            "code": merge_modules(skeleton, implementations),
+            "classes": classes,
+            "modules": modules,
+            "skeleton": skeleton,
+        }
+
+
+class ModularGenerationLLM(BaseLLM):
+    """crewAI LLM that answers code_task with modular generation.
+
+    ``load_context`` is called at answer time and returns the game spec and the
+    design documents written by the earlier tasks. Architectures with fewer than
+    ``min_classes`` classes are not worth splitting; their prompt goes to the
+    ``delegate`` LLM unchanged, tools and all.
+    """
+
+    def __init__(self, delegate: Any, load_context: Callable[[], Dict[str, Any]],
+                 min_classes: int = 8, max_workers: int = 3, max_modules: int = 4):
+        super().__init__(model=getattr(delegate, "model", "modular"), temperature=getattr(delegate, "temperature", None))
+        self.delegate = delegate
+        self.load_context = load_context
+        self.min_classes = min_classes
+        self.max_workers = max_workers
+        self.max_modules = max_modules
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        context = self.load_context()
+        classes = extract_classes(context.get("architecture", ""))
+        if len(classes) < self.min_classes or self.last_result is not None:
+            return self.delegate.call(messages, tools=tools, callbacks=callbacks,
+                                      available_functions=available_functions, **kwargs)
+
+        def complete(prompt: str) -> str:
+            return self.delegate.call([{"role": "user", "content": prompt}])
+
+        generator = ModularGenerator(complete, max_workers=self.max_workers, max_modules=self.max_modules)
+        self.last_result = generator.generate(context.get("game", ""), context.get("architecture", ""),
+                                              context.get("ui_spec", ""), context.get("audio_spec", ""), classes,
+                                              context.get("references", ""))
+        print(f"🧩 Generated {len(classes)} classes as {len(self.last_result['modules'])} parallel modules")
+        # The agent executor expects a ReAct-style final answer
+        return f"Thought: I now know the final answer\nFinal Answer: {self.last_result['code']}"
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return getattr(self.delegate, "get_context_window_size", lambda: 128000)()
+
@@ -0,0 +1,167 @@
+"""
+Incremental application of review findings.
+
+``review_patch_task`` asks the QA engineer for machine-readable findings, each
+with a line range and a unified diff against ``generated_game.py``. After the
+crew finishes, every patch is applied on top of the ones already accepted,
+the game is validated and benchmarked headless, and the patch is kept only if
+nothing regressed. The review becomes a cheap incremental pass instead of a
+second full generation.
+
+Model output is rarely a perfect diff, so hunks are located by their context
+lines near the advertised position rather than by line number alone.
+"""
+import json
+import re
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+
+class ReviewFinding(BaseModel):
+    """One review issue with the patch that fixes it."""
+    title: str = Field(..., description="Short summary of the issue")
+    severity: Literal["critical", "major", "minor", "suggestion"] = "minor"
+    start_line: int = Field(..., description="First line of generated_game.py the issue concerns")
+    end_line: int = Field(..., description="Last line of generated_game.py the issue concerns")
+    rationale: str = Field("", description="Why the change is needed")
+    patch: str = Field(..., description="Unified diff against generated_game.py fixing the issue")
+
+
+class ReviewFindings(BaseModel):
+    findings: List[ReviewFinding] = Field(default_factory=list)
+
+
+class PatchError(Exception):
+    """Raised when a diff does not match the code it should apply to."""
+
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+SEVERITY_ORDER = {"critical": 0, "major": 1, "minor": 2, "suggestion": 3}
+
+
+def parse_hunks(patch: str) -> List[Tuple[int, List[str], List[str]]]:
+    """Split a unified diff into ``(old_start, old_lines, new_lines)`` hunks."""
+    hunks = []
+    current = None
+    for line in patch.splitlines():
+        header = _HUNK_HEADER.match(line)
+        if header:
+            current = (int(header.group(1)), [], [])
+            hunks.append(current)
+        elif current is None or line.startswith(("---", "+++")) and not current[1] and not current[2]:
+            continue
+        elif line.startswith("\\"):
+            continue  # "\ No newline at end of file"
+        elif line.startswith("-"):
+            current[1].append(line[1:])
+        elif line.startswith("+"):
+            current[2].append(line[1:])
+        else:
+            # Context line; a bare empty line is an empty context line
+            text = line[1:] if line.startswith(" ") else line
+            current[1].append(text)
+            current[2].append(text)
+    if not hunks:
+        raise PatchError("No hunks found in patch")
+    return hunks
+
+
+def _find_block(lines: List[str], block: List[str], hint: int, fuzz: int) -> int:
+    """Index where ``block`` occurs in ``lines``, searching outward from ``hint``."""
+    if not block:
+        return max(0, min(hint, len(lines)))
+    normalized = [line.rstrip() for line in block]
+    for offset in range(0, fuzz + 1):
+        for candidate in (hint - offset, hint + offset):
+            if 0 <= candidate <= len(lines) - len(block):
+                if [line.rstrip() for line in lines[candidate:candidate + len(block)]] == normalized:
+                    return candidate
+    raise PatchError(f"Hunk context not found near line {hint + 1}")
+
+
+def apply_patch(code: str, patch: str, fuzz: int = 40) -> str:
+    """Apply a unified diff to ``code``; hunks may drift up to ``fuzz`` lines from their header."""
+    lines = code.splitlines()
+    drift = 0
+    for old_start, old_lines, new_lines in parse_hunks(patch):
+        index = _find_block(lines, old_lines, old_start - 1 + drift, fuzz)
+        lines[index:index + len(old_lines)] = new_lines
+        drift += len(new_lines) - len(old_lines)
+    return "\n".join(lines) + ("\n" if code.endswith("\n") else "")
+
+
+def load_findings(path: str) -> ReviewFindings:
+    """Read the review_patch_task output, tolerating a markdown fence around the JSON."""
+    with open(path, "r", encoding="utf-8") as file:
+        text = file.read().strip()
+    text = re.sub(r"^```[a-zA-Z]*\s*\n|\n?```\s*$", "", text)
+    return ReviewFindings.model_validate(json.loads(text))
+
+
+def regression(before: Tuple[Dict[str, Any], Optional[Dict[str, Any]]],
+               after: Tuple[Dict[str, Any], Optional[Dict[str, Any]]],
+               fps_tolerance: float) -> Optional[str]:
+    """Why ``after`` is worse than ``before``, or None if it is not."""
+    validation_before, benchmark_before = before
+    validation_after, benchmark_after = after
+    if validation_before.get("syntax_valid") and not validation_after.get("syntax_valid"):
+        return "breaks syntax: " + "; ".join(validation_after.get("errors", []))
+    if len(validation_after.get("errors", [])) > len(validation_before.get("errors", [])):
+        return "adds validation errors"
+    if len(validation_after.get("warnings", [])) > len(validation_before.get("warnings", [])):
+        return "adds validation warnings"
+    if benchmark_before and benchmark_after:
+        if benchmark_before.get("status") == "completed" and benchmark_after.get("status") != "completed":
+            return f"headless run {benchmark_after.get('status')}: {benchmark_after.get('error')}"
+        fps_before, fps_after = benchmark_before.get("fps"), benchmark_after.get("fps")
+        if fps_before and fps_after and fps_after < fps_before * (1 - fps_tolerance):
+            return f"fps dropped from {fps_before} to {fps_after}"
+    return None
+
+
+def apply_findings(game_path: str, findings: ReviewFindings,
+                   check: Callable[[str], Tuple[Dict[str, Any], Optional[Dict[str, Any]]]],
+                   max_patches: int = 10, fps_tolerance: float = 0.10,
+                   baseline: Optional[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+    """Apply findings most severe first, keeping each patch only if ``check`` shows no regression.
+
+    ``check(game_path)`` returns ``(validation, benchmark)`` for the file on disk.
+    """
+    with open(game_path, "r", encoding="utf-8") as file:
+        code = file.read()
+    current = baseline or check(game_path)
+
+    results = []
+    ordered = sorted(findings.findings, key=lambda finding: SEVERITY_ORDER[finding.severity])
+    for finding in ordered[:max_patches]:
+        result = {"title": finding.title, "severity": finding.severity,
+                  "start_line": finding.start_line, "end_line": finding.end_line,
+                  "status": "applied", "reason": None,
+                  "fps_before": (current[1] or {}).get("fps"), "fps_after": None}
+        try:
+            patched = apply_patch(code, finding.patch)
+        except PatchError as e:
+            result.update(status="failed_to_apply", reason=str(e))
+            results.append(result)
+            continue
+
+        with open(game_path, "w", encoding="utf-8") as file:
+            file.write(patched)
+        candidate = check(game_path)
+        result["fps_after"] = (candidate[1] or {}).get("fps")
+        reason = regression(current, candidate, fps_tolerance)
+        if reason:
+            with open(game_path, "w", encoding="utf-8") as file:
+                file.write(code)
+            result.update(status="rejected", reason=reason)
+        else:
+            code, current = patched, candidate
+        results.append(result)
+
+    return {
+        "applied": sum(1 for result in results if result["status"] == "applied"),
+        "patches": results,
+        "validation": current[0],
+        "benchmark": current[1],
+    }
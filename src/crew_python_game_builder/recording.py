@@ -0,0 +1,366 @@
+"""
+Deterministic input recording and replay for generated games.
+
+Benchmarks of two versions of a game are only comparable when both see the
+same input and the same random numbers. A recording captures one play
+session as:
+
+- the RNG seed the game's ``random`` (and NumPy, when installed) was seeded with;
+- every event ``pygame.event.get``/``poll`` returned, keyed by frame and by call
+  within the frame.
+
+Replaying feeds those events back in the same frames while the live event
+queue is drained and discarded. The frame then runs at uncapped speed under
+the headless harness.
+
+Nothing in the games is edited. The hooks attach to the pygame and stdlib
+functions every generated loop already calls (``Game.run``, ``SnakeGame.run``,
+``TetrisGame.run`` and so on):
+
+- ``pygame.key.get_pressed`` and ``pygame.mouse.get_pos``/``get_pressed`` are
+  answered from the event stream, so held keys and the cursor are replayed too;
+- ``pygame.time.get_ticks`` and ``time.time`` advance by one frame interval per
+  frame, so animations and timers don't depend on how fast the machine is.
+
+Both recording and replay see the same virtual input and time, so a replay
+of an unchanged game reproduces the recorded session exactly.
+"""
+import abc
+import argparse
+import hashlib
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from .headless import FrameHook, run_headless
+
+
+RECORDING_VERSION = 1
+DEFAULT_MAX_RECORD_FRAMES = 60 * 60 * 10  # Ten minutes at 60 FPS
+REPLAY_HANDLER = "crew_python_game_builder.recording:replay_session"
+
+
+class Recording(BaseModel):
+    """One recorded play session."""
+    version: int = RECORDING_VERSION
+    game_path: str
+    game_sha256: str
+    seed: int
+    epoch: float = Field(..., description="time.time() value the virtual clock starts from")
+    frames: int = 0
+    # (frame, call index within the frame, event type, event attributes)
+    events: List[Tuple[int, int, int, Dict[str, Any]]] = Field(default_factory=list)
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.model_dump(), file)
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        with open(path, "r", encoding="utf-8") as file:
+            return cls.model_validate(json.load(file))
+
+
+def file_sha256(path: str) -> str:
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def _encode_attributes(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-safe event attributes; objects such as window handles are dropped."""
+    encoded = {}
+    for key, value in attributes.items():
+        if isinstance(value, (bool, int, float, str)) or value is None:
+            encoded[key] = value
+        elif isinstance(value, tuple) and all(isinstance(item, (int, float)) for item in value):
+            encoded[key] = list(value)
+    return encoded
+
+
+class _PressedKeys:
+    """Stand-in for pygame's ScancodeWrapper, indexed by key constants."""
+
+    def __init__(self, pressed: set):
+        self._pressed = pressed
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self._pressed
+
+    def __len__(self) -> int:
+        return 512
+
+
+class SessionHooks(abc.ABC):
+    """Seeded RNG, virtual time and event-derived input state for one run.
+
+    Subclasses supply the events: ``Recorder`` takes them from pygame and logs
+    them, ``Player`` serves them from a recording.
+    """
+
+    def __init__(self, seed: int, epoch: float):
+        self.seed = seed
+        self.epoch = epoch
+        self.hook: Optional[FrameHook] = None
+        self.pressed: set = set()
+        self.mouse_pos: Tuple[int, int] = (0, 0)
+        self.mouse_buttons = [False, False, False, False, False]
+        self._virtual_ms = 0.0
+        self._time_frame = 0
+        self._call_frame = -1
+        self._call_index = 0
+
+    # Frame bookkeeping ------------------------------------------------------
+
+    def _frame(self) -> int:
+        return self.hook.frames if self.hook is not None else 0
+
+    def _next_call(self) -> Tuple[int, int]:
+        frame = self._frame()
+        if frame != self._call_frame:
+            self._call_frame, self._call_index = frame, 0
+        else:
+            self._call_index += 1
+        return frame, self._call_index
+
+    def virtual_ms(self) -> float:
+        frame = self._frame()
+        if frame != self._time_frame:
+            self._virtual_ms += (frame - self._time_frame) * 1000.0 / self.hook.target_fps
+            self._time_frame = frame
+        return self._virtual_ms
+
+    # Input state ------------------------------------------------------------
+
+    def _track(self, events: List[Any]) -> List[Any]:
+        import pygame
+
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                self.pressed.add(event.key)
+            elif event.type == pygame.KEYUP:
+                self.pressed.discard(event.key)
+            elif event.type == pygame.MOUSEMOTION:
+                self.mouse_pos = tuple(event.pos)
+            elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+                self.mouse_pos = tuple(event.pos)
+                if 1 <= event.button <= len(self.mouse_buttons):
+                    self.mouse_buttons[event.button - 1] = event.type == pygame.MOUSEBUTTONDOWN
+        return events
+
+    @abc.abstractmethod
+    def next_events(self, real_get: Callable[..., List[Any]], *args, **kwargs) -> List[Any]:
+        """Events for one ``pygame.event.get`` call; ``real_get`` is pygame's own."""
+
+    # Installation -----------------------------------------------------------
+
+    def install(self, hook: FrameHook) -> Callable[[], None]:
+        """Patch pygame, random and time for the run; returns the undo callable."""
+        import pygame
+
+        self.hook = hook
+        random.seed(self.seed)
+        try:
+            import numpy
+            numpy.random.seed(self.seed % 2 ** 32)
+        except ImportError:
+            pass
+
+        originals = {
+            (pygame.event, "get"): pygame.event.get,
+            (pygame.event, "poll"): pygame.event.poll,
+            (pygame.key, "get_pressed"): pygame.key.get_pressed,
+            (pygame.mouse, "get_pos"): pygame.mouse.get_pos,
+            (pygame.mouse, "get_pressed"): pygame.mouse.get_pressed,
+            (pygame.time, "get_ticks"): pygame.time.get_ticks,
+            (time, "time"): time.time,
+        }
+        real_get = pygame.event.get
+
+        def get(*args, **kwargs):
+            return self._track(self.next_events(real_get, *args, **kwargs))
+
+        def poll():
+            events = get()
+            if not events:
+                return pygame.event.Event(pygame.NOEVENT)
+            # Anything beyond the first event goes back into the stream for the next call
+            self.requeue(events[1:])
+            return events[0]
+
+        pygame.event.get = get
+        pygame.event.poll = poll
+        pygame.key.get_pressed = lambda: _PressedKeys(self.pressed)
+        pygame.mouse.get_pos = lambda: self.mouse_pos
+        pygame.mouse.get_pressed = lambda num_buttons=3: tuple(self.mouse_buttons[:num_buttons])
+        pygame.time.get_ticks = lambda: int(self.virtual_ms())
+        time.time = lambda: self.epoch + self.virtual_ms() / 1000.0
+
+        def restore() -> None:
+            for (module, name), original in originals.items():
+                setattr(module, name, original)
+
+        return restore
+
+    @abc.abstractmethod
+    def requeue(self, events: List[Any]) -> None:
+        """Return unconsumed events (from ``poll``) to the front of the stream."""
+
+
+class Recorder(SessionHooks):
+    """Passes live events through to the game and logs them."""
+
+    def __init__(self, recording: Recording):
+        super().__init__(recording.seed, recording.epoch)
+        self.recording = recording
+        self._pending: List[Any] = []
+
+    def next_events(self, real_get, *args, **kwargs):
+        events = self._pending + list(real_get(*args, **kwargs))
+        self._pending = []
+        frame, call = self._next_call()
+        for event in events:
+            self.recording.events.append((frame, call, event.type, _encode_attributes(event.dict)))
+        return events
+
+    def requeue(self, events):
+        # Already logged: drop this call's log entries for them and re-log on the next call
+        if events:
+            del self.recording.events[-len(events):]
+            self._pending = list(events)
+
+
+class Player(SessionHooks):
+    """Serves a recording's events in their original frames; live input is discarded."""
+
+    def __init__(self, recording: Recording):
+        super().__init__(recording.seed, recording.epoch)
+        self.by_call: Dict[Tuple[int, int], List[Tuple[int, Dict[str, Any]]]] = {}
+        for frame, call, event_type, attributes in recording.events:
+            self.by_call.setdefault((frame, call), []).append((event_type, attributes))
+        self._pending: List[Any] = []
+        self.replayed = 0
+
+    def next_events(self, real_get, *args, **kwargs):
+        import pygame
+
+        real_get()  # Keep SDL's queue pumped and empty
+        key = self._next_call()
+        events = self._pending + [
+            pygame.event.Event(event_type, {name: tuple(value) if isinstance(value, list) else value
+                                            for name, value in attributes.items()})
+            for event_type, attributes in self.by_call.pop(key, [])
+        ]
+        self._pending = []
+        wanted = args[0] if args else kwargs.get("eventtype")
+        if wanted is not None:
+            wanted = set(wanted) if isinstance(wanted, (list, tuple, set)) else {wanted}
+            events = [event for event in events if event.type in wanted]
+        self.replayed += len(events)
+        return events
+
+    def requeue(self, events):
+        self._pending = list(events)
+
+
+def record_session(game_path: str, recording_path: str, seed: Optional[int] = None,
+                   max_frames: int = DEFAULT_MAX_RECORD_FRAMES) -> Dict[str, Any]:
+    """Play ``game_path`` on the real display and save the session to ``recording_path``."""
+    recording = Recording(
+        game_path=os.path.abspath(game_path),
+        game_sha256=file_sha256(game_path),
+        seed=random.SystemRandom().randrange(2 ** 63) if seed is None else seed,
+        epoch=time.time(),
+    )
+    recorder = Recorder(recording)
+    holder: Dict[str, FrameHook] = {}
+
+    def install(hook: FrameHook) -> Callable[[], None]:
+        holder["hook"] = hook
+        return recorder.install(hook)
+
+    result = run_headless(game_path, max_frames=max_frames, uncapped=False, hooks=[install], headless=False)
+    recording.frames = holder["hook"].frames if "hook" in holder else 0
+    recording.save(recording_path)
+    result["recording"] = {"path": recording_path, "frames": recording.frames,
+                           "events": len(recording.events), "seed": recording.seed}
+    return result
+
+
+def replay_session(recording_path: str, game_path: Optional[str] = None, uncapped: bool = True) -> Dict[str, Any]:
+    """Replay a recording headless against ``game_path`` (default: the recorded game)."""
+    recording = Recording.load(recording_path)
+    game_path = game_path or recording.game_path
+    player = Player(recording)
+    # One frame past the recording lets the final frame's events be consumed
+    result = run_headless(game_path, max_frames=recording.frames + 1, uncapped=uncapped, hooks=[player.install])
+    result["replay"] = {
+        "recording": recording_path,
+        "recorded_frames": recording.frames,
+        "events_replayed": player.replayed,
+        "same_game": file_sha256(game_path) == recording.game_sha256,
+    }
+    return result
+
+
+def compare_versions(recording_path: str, game_paths: List[str], runs: int = 3) -> List[Dict[str, Any]]:
+    """Replay one recording against several versions of a game; medians over ``runs`` replays.
+
+    Replays go through a sandbox pool so each one starts from a clean interpreter.
+    """
+    from .sandbox import SandboxPool
+
+    with SandboxPool(workers=1) as pool:
+        summary = []
+        for game_path in game_paths:
+            results = [pool.submit(REPLAY_HANDLER, recording_path=os.path.abspath(recording_path),
+                                   game_path=os.path.abspath(game_path)).result() for _ in range(runs)]
+            timed = [result for result in results if result.get("mean_frame_ms") is not None]
+            summary.append({
+                "game_path": game_path,
+                "statuses": sorted({result.get("status", "unknown") for result in results}),
+                "frames": max((result.get("frames", 0) for result in results), default=0),
+                "median_mean_frame_ms": statistics.median(r["mean_frame_ms"] for r in timed) if timed else None,
+                "median_p95_frame_ms": statistics.median(r["p95_frame_ms"] for r in timed) if timed else None,
+                "median_fps": statistics.median(r["fps"] for r in timed if r.get("fps")) if timed else None,
+            })
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line interface: record, replay and compare sessions."""
+    parser = argparse.ArgumentParser(prog="recording", description="Record and replay play sessions deterministically.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    record = sub.add_parser("record", help="Play a game and record the session")
+    record.add_argument("game_path")
+    record.add_argument("recording_path")
+    record.add_argument("--seed", type=int, help="RNG seed (default: random)")
+    record.add_argument("--max-frames", type=int, default=DEFAULT_MAX_RECORD_FRAMES)
+    play = sub.add_parser("play", help="Replay a recording headless and print frame stats")
+    play.add_argument("recording_path")
+    play.add_argument("--game", help="Game to replay against (default: the recorded one)")
+    play.add_argument("--capped", action="store_true", help="Honour the game's frame-rate cap")
+    compare = sub.add_parser("compare", help="Replay a recording against several game versions")
+    compare.add_argument("recording_path")
+    compare.add_argument("games", nargs="+")
+    compare.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        result = record_session(args.game_path, args.recording_path, seed=args.seed, max_frames=args.max_frames)
+    elif args.command == "play":
+        result = replay_session(args.recording_path, game_path=args.game, uncapped=not args.capped)
+    else:
+        result = compare_versions(args.recording_path, args.games, runs=args.runs)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+Targeted repair of failing generated code.
+
+Instead of regenerating the whole ``generated_game.py`` when validation or a
+headless run fails, the repair loop:
+
+1. takes the first syntax error (from ``CodeValidationTool``) or the deepest
+   traceback frame inside the game file (from the headless runner);
+2. extracts the smallest function or class enclosing that line;
+3. asks the model for a replacement of only that region;
+4. splices the answer back in and re-validates, for a bounded number of attempts.
+
+Each attempt reports its token use and latency next to the estimated cost of
+regenerating the whole file, so the catalog shows what repairs save.
+"""
+import ast
+import json
+import re
+import textwrap
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .catalog import CHARS_PER_TOKEN
+from .headless import benchmark_game
+from .tools.custom_tool import CodeValidationTool
+
+
+REPAIR_PROMPT = """You are fixing one region of a Python pygame game that fails.
+
+Error:
+{error}
+
+The region below is lines {start}-{end} of the file. It is the smallest
+function or class enclosing the error. Neighbouring code is shown for context
+only and must not be repeated.
+
+Context before:
+{before}
+
+REGION TO REPLACE:
+{region}
+
+Context after:
+{after}
+
+Return ONLY the corrected replacement for the region, as plain Python code with
+the same indentation and the same function or class name. No markdown, no
+explanations, nothing from outside the region."""
+
+_FENCE = re.compile(r"^```[a-zA-Z]*\s*\n|\n?```\s*$")
+_HEADER = re.compile(r"^(\s*)(async\s+def|def|class)\s")
+
+
+class CodeRegion(BaseModel):
+    """1-based, inclusive line range of a function or class."""
+    start: int
+    end: int
+    name: str
+    indent: int
+
+
+class RepairAttempt(BaseModel):
+    attempt: int
+    error: str
+    region: str
+    start_line: int
+    end_line: int
+    succeeded: bool
+    tokens: int
+    latency_s: float
+    full_regeneration_tokens: int
+    full_regeneration_latency_s: Optional[float] = None
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.full_regeneration_tokens - self.tokens
+
+    @property
+    def latency_saved_s(self) -> Optional[float]:
+        if self.full_regeneration_latency_s is None:
+            return None
+        return round(self.full_regeneration_latency_s - self.latency_s, 3)
+
+
+def find_error(validation: Dict[str, Any], benchmark: Optional[Dict[str, Any]],
+               game_path: str) -> Optional[Tuple[int, str]]:
+    """Return ``(line, message)`` of the first failure to repair, or None if the code passed."""
+    for error in validation.get("errors", []):
+        match = re.search(r"line (\d+)", error)
+        if match:
+            return int(match.group(1)), error
+    if benchmark and benchmark.get("status") == "crashed" and benchmark.get("traceback"):
+        file_name = re.escape(game_path.replace("\\", "/").rsplit("/", 1)[-1])
+        frames = re.findall(rf'File "[^"]*{file_name}", line (\d+)', benchmark["traceback"].replace("\\", "/"))
+        if frames:
+            # The deepest frame in the game file is closest to the fault
+            return int(frames[-1]), benchmark["traceback"].strip().splitlines()[-1]
+    return None
+
+
+def enclosing_region(code: str, line: int) -> Optional[CodeRegion]:
+    """Smallest function or class containing ``line``.
+
+    Uses the AST when the file parses (runtime errors) and falls back to
+    indentation when it does not (syntax errors).
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return _region_by_indentation(code.splitlines(), line)
+
+    best: Optional[CodeRegion] = None
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+            if start <= line <= node.end_lineno:
+                if best is None or node.end_lineno - start < best.end - best.start:
+                    best = CodeRegion(start=start, end=node.end_lineno, name=node.name, indent=node.col_offset)
+    return best
+
+
+def _indent_of(text: str) -> int:
+    return len(text) - len(text.lstrip())
+
+
+def _region_by_indentation(lines: List[str], line: int) -> Optional[CodeRegion]:
+    if not 1 <= line <= len(lines):
+        return None
+    error_indent = _indent_of(lines[line - 1]) if lines[line - 1].strip() else None
+
+    # Walk up to the nearest header indented less than the failing line (or the header itself)
+    start = None
+    for index in range(line - 1, -1, -1):
+        match = _HEADER.match(lines[index])
+        if match and (index == line - 1 or error_indent is None or len(match.group(1)) < error_indent):
+            start = index
+            break
+    if start is None:
+        return None
+
+    header_indent = _indent_of(lines[start])
+    end = len(lines) - 1
+    for index in range(start + 1, len(lines)):
+        if lines[index].strip() and _indent_of(lines[index]) <= header_indent and index >= line:
+            end = index - 1
+            break
+    while end > start and not lines[end].strip():
+        end -= 1
+    name = _HEADER.sub("", lines[start]).split("(")[0].split(":")[0].strip()
+    return CodeRegion(start=start + 1, end=end + 1, name=name, indent=header_indent)
+
+
+def splice(code: str, region: CodeRegion, replacement: str) -> str:
+    """Replace ``region`` in ``code`` with ``replacement``, re-indented to the region's level."""
+    replacement = _FENCE.sub("", replacement.strip("\n")).rstrip()
+    replacement = textwrap.indent(textwrap.dedent(replacement), " " * region.indent)
+    lines = code.splitlines()
+    trailing_newline = "\n" if code.endswith("\n") else ""
+    return "\n".join(lines[:region.start - 1] + replacement.splitlines() + lines[region.end:]) + trailing_newline
+
+
+def crewai_completion(model: str, temperature: Optional[float] = None) -> Callable[[str], str]:
+    """Default completion function backed by crewAI's LLM wrapper."""
+    from crewai import LLM
+
+    llm = LLM(model=model, temperature=temperature)
+
+    def complete(prompt: str) -> str:
+        return llm.call([{"role": "user", "content": prompt}])
+
+    return complete
+
+
+class RepairLoop:
+    """Validate, repair the failing region, re-validate; at most ``max_attempts`` times."""
+
+    def __init__(self, complete: Callable[[str], str], max_attempts: int = 3,
+                 runtime_check_frames: int = 0, context_lines: int = 8,
+                 full_regeneration_latency_s: Optional[float] = None):
+        self.complete = complete
+        self.max_attempts = max_attempts
+        self.runtime_check_frames = runtime_check_frames
+        self.context_lines = context_lines
+        self.full_regeneration_latency_s = full_regeneration_latency_s
+
+    def check(self, game_path: str) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Validation result and, when enabled and the syntax is valid, a short headless run."""
+        with open(game_path, "r", encoding="utf-8") as file:
+            validation = json.loads(CodeValidationTool()._run(file.read()))
+        benchmark = None
+        if self.runtime_check_frames and validation.get("syntax_valid"):
+            benchmark = benchmark_game(game_path, frames=self.runtime_check_frames)
+        return validation, benchmark
+
+    def run(self, game_path: str, validation: Optional[Dict[str, Any]] = None,
+            benchmark: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Repair ``game_path`` in place and return the attempts plus the final check results."""
+        if validation is None:
+            validation, benchmark = self.check(game_path)
+        with open(game_path, "r", encoding="utf-8") as file:
+            original = file.read()
+        initial = (validation, benchmark)
+
+        attempts: List[RepairAttempt] = []
+        for attempt in range(1, self.max_attempts + 1):
+            failure = find_error(validation, benchmark, game_path)
+            if failure is None:
+                break
+            line, error = failure
+
+            with open(game_path, "r", encoding="utf-8") as file:
+                code = file.read()
+            region = enclosing_region(code, line)
+            if region is None:
+                # Module-level failure: there is no smaller unit than the file itself
+                break
+
+            lines = code.splitlines()
+            before = "\n".join(lines[max(0, region.start - 1 - self.context_lines):region.start - 1])
+            after = "\n".join(lines[region.end:region.end + self.context_lines])
+            region_source = "\n".join(lines[region.start - 1:region.end])
+            prompt = REPAIR_PROMPT.format(error=error, start=region.start, end=region.end,
+                                          before=before, region=region_source, after=after)
+
+            started = time.perf_counter()
+            replacement = self.complete(prompt)
+            latency = time.perf_counter() - started
+
+            repaired = splice(code, region, replacement)
+            with open(game_path, "w", encoding="utf-8") as file:
+                file.write(repaired)
+            validation, benchmark = self.check(game_path)
+
+            attempts.append(RepairAttempt(
+                attempt=attempt,
+                error=error,
+                region=region.name,
+                start_line=region.start,
+                end_line=region.end,
+                succeeded=find_error(validation, benchmark, game_path) is None,
+                tokens=(len(prompt) + len(replacement)) // CHARS_PER_TOKEN,
+                latency_s=round(latency, 3),
+                # Regenerating means emitting the whole file again
+                full_regeneration_tokens=len(code) // CHARS_PER_TOKEN,
+                full_regeneration_latency_s=self.full_regeneration_latency_s,
+            ))
+
+        repaired = bool(attempts) and attempts[-1].succeeded
+        if attempts and not repaired:
+            # Never hand back code that was rewritten but still fails
+            with open(game_path, "w", encoding="utf-8") as file:
+                file.write(original)
+            validation, benchmark = initial
+
+        return {
+            "repaired": repaired,
+            "attempts": [
+                dict(attempt.model_dump(), tokens_saved=attempt.tokens_saved, latency_saved_s=attempt.latency_saved_s)
+                for attempt in attempts
+            ],
+            "validation": validation,
+            "benchmark": benchmark,
+        }
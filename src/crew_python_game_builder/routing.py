@@ -0,0 +1,223 @@
+"""
+Latency-aware model routing per agent.
+
+``system_config.yaml``'s ``model_routing`` section lists candidate models per
+agent in order of preference. Before each build the router reads the agent's
+recent task runs from the build catalog and picks:
+
+1. the cheapest candidate that has enough history, meets the quality bar
+   (share of runs whose build completed with valid code) and whose median
+   latency is within the agent's budget;
+2. otherwise the first candidate that still lacks history, so new candidates
+   get evaluated;
+3. otherwise, when every candidate is proven too slow or too unreliable, the
+   most reliable one.
+
+The remaining fast candidates become the LLM's fallbacks, and the latency
+budget becomes its request timeout, so a slow model is abandoned mid-build.
+
+``routing report`` compares recent routed builds against the baseline model's
+own history to show the build time and token cost saved.
+"""
+import argparse
+import json
+import statistics
+import sys
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from .catalog import CHARS_PER_TOKEN, DEFAULT_CATALOG_PATH, RunCatalog
+from .settings import SystemConfig, load_system_config
+
+
+class ModelStats(BaseModel):
+    """Observed behaviour of one model for one agent."""
+    model: str
+    samples: int
+    median_latency_s: Optional[float] = None
+    success_rate: Optional[float] = None
+    mean_completion_tokens: Optional[float] = None
+
+    def cost_per_run(self, settings: SystemConfig) -> Optional[float]:
+        """Estimated completion cost in USD, or None without pricing or history."""
+        price = settings.model_routing.pricing.get(self.model)
+        if price is None or self.mean_completion_tokens is None:
+            return None
+        return self.mean_completion_tokens * price.completion / 1_000_000
+
+
+class RoutingDecision(BaseModel):
+    agent: str
+    model: str
+    fallbacks: List[str] = []
+    latency_budget_s: Optional[float] = None
+    reason: str
+
+
+class ModelRouter:
+    """Chooses a model per agent from config and catalog history."""
+
+    def __init__(self, settings: SystemConfig, catalog_path: str = DEFAULT_CATALOG_PATH):
+        self.settings = settings
+        self.routing = settings.model_routing
+        self.catalog_path = catalog_path
+
+    def model_stats(self, agent_name: str) -> Dict[str, ModelStats]:
+        """Per-model latency, reliability and output size from the agent's recent runs."""
+        # The catalog records agents under their agents.yaml key, e.g. senior_engineer_agent
+        agent_key = agent_name if agent_name.endswith('_agent') else f'{agent_name}_agent'
+        with RunCatalog(self.catalog_path) as catalog:
+            rows = catalog.model_history(agent_key, last=self.routing.history_window)
+        grouped: Dict[str, List[Any]] = {}
+        for row in rows:
+            grouped.setdefault(row["model"], []).append(row)
+        stats = {}
+        for model, runs in grouped.items():
+            chars = [run["output_chars"] for run in runs if run["output_chars"] is not None]
+            stats[model] = ModelStats(
+                model=model,
+                samples=len(runs),
+                median_latency_s=statistics.median(run["duration_s"] for run in runs),
+                success_rate=sum(1 for run in runs if run["succeeded"]) / len(runs),
+                mean_completion_tokens=(sum(chars) / len(chars) / CHARS_PER_TOKEN) if chars else None,
+            )
+        return stats
+
+    def choose(self, agent_name: str) -> Optional[RoutingDecision]:
+        """Pick a model for ``agent_name``; None when routing is off or the agent has no route."""
+        route = self.routing.route_for(agent_name)
+        if not self.routing.enabled or route is None:
+            return None
+
+        budget = route.latency_budget_s or self.routing.latency_budget_s
+        min_quality = self.routing.min_quality if route.min_quality is None else route.min_quality
+        history = self.model_stats(agent_name)
+        stats = {model: history.get(model, ModelStats(model=model, samples=0)) for model in route.candidates}
+
+        def proven(model: str) -> bool:
+            return stats[model].samples >= self.routing.min_samples
+
+        def too_slow(model: str) -> bool:
+            return proven(model) and stats[model].median_latency_s > budget
+
+        qualifying = [
+            model for model in route.candidates
+            if proven(model) and not too_slow(model) and stats[model].success_rate >= min_quality
+        ]
+        untested = [model for model in route.candidates if not proven(model)]
+
+        if qualifying:
+            def rank(model: str):
+                cost = stats[model].cost_per_run(self.settings)
+                return (cost if cost is not None else float("inf"), stats[model].median_latency_s)
+            chosen = min(qualifying, key=rank)
+            reason = (f"cheapest candidate within {budget:.0f}s and quality >= {min_quality:.2f} "
+                      f"(median {stats[chosen].median_latency_s:.1f}s, success {stats[chosen].success_rate:.0%})")
+        elif untested:
+            chosen = untested[0]
+            reason = f"collecting history ({stats[chosen].samples}/{self.routing.min_samples} runs)"
+        else:
+            chosen = max(route.candidates, key=lambda model: (stats[model].success_rate, -stats[model].median_latency_s))
+            reason = "no candidate meets the latency and quality bar; using the most reliable one"
+
+        fallbacks = [model for model in qualifying + untested if model != chosen and not too_slow(model)]
+        return RoutingDecision(agent=agent_name, model=chosen, fallbacks=fallbacks,
+                               latency_budget_s=budget, reason=reason)
+
+
+def savings_report(settings: SystemConfig, catalog_path: str = DEFAULT_CATALOG_PATH,
+                   last: int = 20) -> Dict[str, Any]:
+    """Compare recent builds with what the baseline model alone would have cost.
+
+    The baseline for each task is the baseline model's median duration and mean
+    output size for that task across the catalog. Costs are completion-token
+    estimates derived from output size, since crewAI only reports token totals
+    per crew. Tasks the baseline model has never run are left out of the totals.
+    """
+    routing = settings.model_routing
+    baseline_model = routing.baseline_model or settings.default_model()
+    baseline_price = routing.pricing.get(baseline_model)
+
+    with RunCatalog(catalog_path) as catalog:
+        runs = catalog.conn.execute(
+            """
+            SELECT t.task_name, t.model, t.duration_s, t.output_chars FROM task_runs t
+            WHERE t.model IS NOT NULL AND t.build_id IN (
+                SELECT DISTINCT build_id FROM task_runs WHERE model IS NOT NULL AND model != ?
+                ORDER BY build_id DESC LIMIT ?)
+            """,
+            (baseline_model, last),
+        ).fetchall()
+        baseline_rows = catalog.conn.execute(
+            "SELECT task_name, duration_s, output_chars FROM task_runs WHERE model = ?",
+            (baseline_model,),
+        ).fetchall()
+
+    baseline: Dict[str, Dict[str, float]] = {}
+    for task_name in {row["task_name"] for row in baseline_rows}:
+        rows = [row for row in baseline_rows if row["task_name"] == task_name]
+        chars = [row["output_chars"] for row in rows if row["output_chars"] is not None]
+        baseline[task_name] = {
+            "duration_s": statistics.median(row["duration_s"] for row in rows),
+            "tokens": (sum(chars) / len(chars) / CHARS_PER_TOKEN) if chars else 0.0,
+        }
+
+    tasks: Dict[str, Dict[str, Any]] = {}
+    for run in runs:
+        if run["task_name"] not in baseline:
+            continue
+        entry = tasks.setdefault(run["task_name"], {"runs": 0, "models": {}, "duration_s": 0.0,
+                                                    "baseline_duration_s": 0.0, "cost_usd": 0.0,
+                                                    "baseline_cost_usd": 0.0})
+        entry["runs"] += 1
+        entry["models"][run["model"]] = entry["models"].get(run["model"], 0) + 1
+        entry["duration_s"] += run["duration_s"]
+        entry["baseline_duration_s"] += baseline[run["task_name"]]["duration_s"]
+        price = routing.pricing.get(run["model"])
+        if price is not None and run["output_chars"] is not None:
+            entry["cost_usd"] += run["output_chars"] / CHARS_PER_TOKEN * price.completion / 1_000_000
+        if baseline_price is not None:
+            entry["baseline_cost_usd"] += baseline[run["task_name"]]["tokens"] * baseline_price.completion / 1_000_000
+
+    totals = {key: round(sum(entry[key] for entry in tasks.values()), 4)
+              for key in ("duration_s", "baseline_duration_s", "cost_usd", "baseline_cost_usd")}
+    totals["time_saved_s"] = round(totals["baseline_duration_s"] - totals["duration_s"], 2)
+    totals["cost_saved_usd"] = round(totals["baseline_cost_usd"] - totals["cost_usd"], 4)
+    return {
+        "baseline_model": baseline_model,
+        "builds_considered": last,
+        "tasks": {name: {key: (round(value, 4) if isinstance(value, float) else value)
+                         for key, value in entry.items()} for name, entry in tasks.items()},
+        "totals": totals,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line interface: show routing decisions and the savings report."""
+    parser = argparse.ArgumentParser(prog="routing", description="Inspect per-agent model routing.")
+    parser.add_argument("--db", default=DEFAULT_CATALOG_PATH, help="Path to the catalog database")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("explain", help="Show the model each agent would get now, and why")
+    report = sub.add_parser("report", help="Build time and token cost saved versus one model for everything")
+    report.add_argument("--last", type=int, default=20, help="Only consider the last N routed builds")
+    args = parser.parse_args(argv)
+
+    settings = load_system_config()
+    if args.command == "explain":
+        router = ModelRouter(settings, args.db)
+        if not settings.model_routing.enabled:
+            print("Model routing is disabled (model_routing.enabled: false); showing what it would choose.")
+            router.routing = settings.model_routing.model_copy(update={"enabled": True})
+        for agent_name in settings.model_routing.agents:
+            decision = router.choose(agent_name)
+            print(f"{agent_name:>20}  {decision.model:<20} {decision.reason}")
+            if decision.fallbacks:
+                print(f"{'':>20}  fallbacks: {', '.join(decision.fallbacks)}")
+    elif args.command == "report":
+        print(json.dumps(savings_report(settings, args.db, args.last), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
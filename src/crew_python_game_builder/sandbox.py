@@ -0,0 +1,392 @@
+"""
+Pre-warmed sandbox workers for running generated games.
+
+Starting a fresh interpreter, importing pygame and scanning system fonts costs
+more than a short smoke run or a 120-frame repair check itself. A
+``SandboxPool`` keeps a few worker processes that have already done that work
+with SDL's dummy drivers. Each worker is a zygote: for every job it forks a
+child from its warm state, so every job starts from the same clean
+interpreter whatever the previous game did to ``sys.modules``, the working
+directory or pygame's globals. Inside the child it:
+
+- applies CPU-time and address-space limits (``RLIMIT_CPU``, ``RLIMIT_AS``),
+- silences the game's stdout/stderr,
+- calls the job's handler (``"module:function"`` plus keyword arguments) and
+  sends the JSON result back over a pipe.
+
+The zygote also enforces a wall-clock limit and reports ``timeout``,
+``cpu_limit`` or ``killed`` when a child never answers.
+
+One shared pool, started from ``sandbox_settings``, serves the crew's
+benchmark and repair checks (through ``headless.benchmark_game``) and
+``CodeValidationTool``'s optional smoke run. ``sandbox batch`` uses a pool
+of its own to benchmark many games in parallel.
+
+Workers fork, so the pool needs a POSIX system; elsewhere ``shared_pool()``
+stays None and callers fall back to one interpreter per run.
+"""
+import argparse
+import atexit
+import concurrent.futures
+import glob
+import importlib
+import json
+import os
+import queue
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Dict, List, Optional, Sequence
+
+from .headless import DEFAULT_BENCHMARK_FRAMES, configure_headless_environment
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+RUN_GAME_HANDLER = "crew_python_game_builder.headless:run_headless"
+DEFAULT_WORKERS = 2
+DEFAULT_CPU_LIMIT_S = 60
+DEFAULT_MEMORY_LIMIT_MB = 2048
+DEFAULT_WALL_TIMEOUT_S = 90
+# Extra time the pool gives a worker beyond the job's own wall limit
+_PROTOCOL_GRACE_S = 10
+
+
+class SandboxError(Exception):
+    """Raised when a worker cannot be started or stops answering."""
+
+
+def _warm_up(preload: Sequence[str] = ()) -> None:
+    """Import pygame and do its slow one-off work before any job is forked."""
+    configure_headless_environment()
+    import pygame  # noqa: F401
+
+    for module_name in ("crew_python_game_builder.headless",) + tuple(preload):
+        importlib.import_module(module_name)
+    try:
+        # The system font scan behind SysFont runs once per process; do it here
+        pygame.font.init()
+        pygame.font.get_fonts()
+    except Exception:
+        pass
+
+
+def _call_handler(job: Dict[str, Any]) -> Dict[str, Any]:
+    module_name, function_name = job["handler"].split(":", 1)
+    handler = getattr(importlib.import_module(module_name), function_name)
+    return handler(**job.get("kwargs", {}))
+
+
+def _run_child(job: Dict[str, Any], result_fd: int, limits: Dict[str, Any]) -> None:
+    """Body of a forked job process; never returns."""
+    status = 0
+    try:
+        devnull = os.open(os.devnull, os.O_RDWR)
+        for fd in (0, 1, 2):
+            os.dup2(devnull, fd)
+        if resource is not None:
+            cpu = int(limits["cpu_limit_s"])
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+            memory = int(limits["memory_limit_mb"]) * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+        try:
+            result = _call_handler(job)
+        except MemoryError:
+            result = {"status": "memory_limit", "error": f"Exceeded {limits['memory_limit_mb']} MB address space"}
+        except BaseException as e:
+            result = {"status": "crashed", "error": f"{type(e).__name__}: {e}", "traceback": traceback.format_exc()}
+        if str(result.get("error") or "").startswith("MemoryError"):
+            # run_headless reports the game's own MemoryError as a crash
+            result["status"] = "memory_limit"
+        payload = json.dumps(result, default=str).encode("utf-8")
+        while payload:
+            written = os.write(result_fd, payload)
+            payload = payload[written:]
+    except BaseException:
+        status = 1
+    finally:
+        os._exit(status)
+
+
+def _collect_child(pid: int, read_fd: int, wall_timeout: float) -> Dict[str, Any]:
+    """Read a child's result, killing it once ``wall_timeout`` has passed."""
+    chunks: List[bytes] = []
+    deadline = time.monotonic() + wall_timeout
+    timed_out = False
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            break
+        ready, _, _ = select.select([read_fd], [], [], remaining)
+        if not ready:
+            continue
+        chunk = os.read(read_fd, 65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    os.close(read_fd)
+
+    if timed_out:
+        os.kill(pid, signal.SIGKILL)
+    _, wait_status = os.waitpid(pid, 0)
+
+    if timed_out:
+        return {"status": "timeout", "error": f"No result within {wall_timeout:g}s"}
+    if chunks:
+        try:
+            return json.loads(b"".join(chunks).decode("utf-8"))
+        except ValueError:
+            pass
+    if os.WIFSIGNALED(wait_status):
+        signal_number = os.WTERMSIG(wait_status)
+        if signal_number == getattr(signal, "SIGXCPU", None):
+            return {"status": "cpu_limit", "error": "CPU time limit exceeded"}
+        return {"status": "killed", "error": f"Killed by {signal.Signals(signal_number).name}"}
+    return {"status": "crashed", "error": f"Job exited with status {os.WEXITSTATUS(wait_status)} and no result"}
+
+
+def worker_main(limits: Dict[str, Any], preload: Sequence[str] = ()) -> None:
+    """Zygote loop: warm up once, then fork one child per job read from stdin."""
+    # Keep a private handle on stdout for the protocol; anything else printing goes nowhere
+    protocol = os.fdopen(os.dup(1), "w", buffering=1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+
+    started = time.perf_counter()
+    _warm_up(preload)
+    protocol.write(json.dumps({"ready": True, "pid": os.getpid(),
+                               "warmup_s": round(time.perf_counter() - started, 3)}) + "\n")
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        job_limits = dict(limits, **{key: job[key] for key in limits if job.get(key) is not None})
+        read_fd, write_fd = os.pipe()
+        started = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            _run_child(job, write_fd, job_limits)
+        os.close(write_fd)
+        result = _collect_child(pid, read_fd, float(job_limits["wall_timeout_s"]))
+        result.setdefault("sandbox_wall_s", round(time.perf_counter() - started, 3))
+        protocol.write(json.dumps(result, default=str) + "\n")
+
+
+class _Worker:
+    """Handle on one zygote process."""
+
+    def __init__(self, limits: Dict[str, Any], preload: Sequence[str] = ()):
+        self.limits = limits
+        command = [sys.executable, "-m", "crew_python_game_builder.sandbox", "worker",
+                   "--cpu-limit", str(limits["cpu_limit_s"]),
+                   "--memory-limit", str(limits["memory_limit_mb"]),
+                   "--wall-timeout", str(limits["wall_timeout_s"])]
+        for module_name in preload:
+            command += ["--preload", module_name]
+        # A fixed hash seed keeps set and dict-of-str ordering identical across workers,
+        # so a seeded run behaves the same whichever worker it lands on
+        env = dict(os.environ, PYTHONHASHSEED=os.environ.get("PYTHONHASHSEED", "0"))
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, text=True, bufsize=1, env=env)
+        self.ready = self._read_line(timeout=120)
+        if not self.ready.get("ready"):
+            self.close()
+            raise SandboxError(f"Sandbox worker failed to start: {self.ready}")
+
+    def _read_line(self, timeout: float) -> Dict[str, Any]:
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if not ready:
+            raise SandboxError(f"Sandbox worker {self.process.pid} did not answer within {timeout:g}s")
+        line = self.process.stdout.readline()
+        if not line:
+            raise SandboxError(f"Sandbox worker {self.process.pid} exited")
+        return json.loads(line)
+
+    def request(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        wall = job.get("wall_timeout_s") or self.limits["wall_timeout_s"]
+        self.process.stdin.write(json.dumps(job) + "\n")
+        self.process.stdin.flush()
+        return self._read_line(timeout=float(wall) + _PROTOCOL_GRACE_S)
+
+    def close(self) -> None:
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+
+
+class SandboxPool:
+    """Pool of pre-warmed zygote workers; jobs run in forked, resource-limited children.
+
+    ``preload`` names extra modules (typically the handlers' own) the workers
+    import while warming up, so short jobs don't pay for those imports each time.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, cpu_limit_s: int = DEFAULT_CPU_LIMIT_S,
+                 memory_limit_mb: int = DEFAULT_MEMORY_LIMIT_MB, wall_timeout_s: int = DEFAULT_WALL_TIMEOUT_S,
+                 preload: Sequence[str] = ()):
+        if not hasattr(os, "fork"):
+            raise SandboxError("The sandbox pool needs os.fork (POSIX)")
+        self.limits = {"cpu_limit_s": cpu_limit_s, "memory_limit_mb": memory_limit_mb,
+                       "wall_timeout_s": wall_timeout_s}
+        self.size = workers
+        self.preload = tuple(preload)
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        # Workers warm up concurrently
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as starter:
+            for worker in starter.map(lambda _: _Worker(self.limits, self.preload), range(workers)):
+                self._idle.put(worker)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+
+    def __enter__(self) -> "SandboxPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _execute(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        worker = self._idle.get()
+        try:
+            return worker.request(job)
+        except (SandboxError, OSError, ValueError) as e:
+            # A worker that stops answering is replaced, never reused
+            worker.process.kill()
+            worker.close()
+            try:
+                worker = _Worker(self.limits, self.preload)
+            except SandboxError:
+                pass  # The dead handle goes back; the next job retries the restart
+            return {"status": "sandbox_error", "error": str(e)}
+        finally:
+            self._idle.put(worker)
+
+    def submit(self, handler: str, wall_timeout_s: Optional[float] = None, cpu_limit_s: Optional[int] = None,
+               memory_limit_mb: Optional[int] = None, **kwargs: Any) -> "concurrent.futures.Future[Dict[str, Any]]":
+        """Run ``handler(**kwargs)`` (a ``"module:function"`` path) in a fresh child; limits override the pool's."""
+        if self._closed:
+            raise SandboxError("Sandbox pool is closed")
+        job = {"handler": handler, "kwargs": kwargs, "wall_timeout_s": wall_timeout_s,
+               "cpu_limit_s": cpu_limit_s, "memory_limit_mb": memory_limit_mb}
+        return self._executor.submit(self._execute, job)
+
+    def _submit_game(self, game_path: str, frames: int, uncapped: bool,
+                     timeout: Optional[float]) -> "concurrent.futures.Future[Dict[str, Any]]":
+        return self.submit(RUN_GAME_HANDLER, wall_timeout_s=timeout, game_path=os.path.abspath(game_path),
+                           max_frames=frames, uncapped=uncapped)
+
+    @staticmethod
+    def _game_result(result: Dict[str, Any], game_path: str) -> Dict[str, Any]:
+        # Sandbox failures (timeouts, limits) carry no frame stats of their own
+        result.setdefault("game_path", os.path.abspath(game_path))
+        result.setdefault("frames", 0)
+        result.setdefault("fps", None)
+        result.setdefault("peak_memory_mb", None)
+        return result
+
+    def run_game(self, game_path: str, frames: int = DEFAULT_BENCHMARK_FRAMES, uncapped: bool = True,
+                 timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Run a game headless for ``frames`` frames and return ``run_headless``'s result."""
+        return self._game_result(self._submit_game(game_path, frames, uncapped, timeout).result(), game_path)
+
+    def run_games(self, game_paths: List[str], frames: int = DEFAULT_BENCHMARK_FRAMES,
+                  timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Run several games concurrently across the pool, results in input order."""
+        futures = [self._submit_game(path, frames, True, timeout) for path in game_paths]
+        return [self._game_result(future.result(), path) for path, future in zip(game_paths, futures)]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._executor.shutdown(wait=True)
+        while not self._idle.empty():
+            self._idle.get().close()
+
+
+_shared_pool: Optional[SandboxPool] = None
+_shared_lock = threading.Lock()
+
+
+def start_shared_pool(workers: int = DEFAULT_WORKERS, **limits: Any) -> Optional[SandboxPool]:
+    """Start the process-wide pool used by benchmarks and validation; None where forking isn't possible."""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            try:
+                _shared_pool = SandboxPool(workers, **limits)
+            except SandboxError as e:
+                print(f"⚠️ Sandbox pool unavailable, running each check in a new interpreter: {e}")
+                return None
+            atexit.register(stop_shared_pool)
+        return _shared_pool
+
+
+def shared_pool() -> Optional[SandboxPool]:
+    """The running shared pool, if any."""
+    return _shared_pool
+
+
+def stop_shared_pool() -> None:
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is not None:
+            _shared_pool.close()
+            _shared_pool = None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line interface: batch-benchmark games through a pool, or run as a worker."""
+    parser = argparse.ArgumentParser(prog="sandbox", description="Run generated games in pre-warmed sandbox workers.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    batch = sub.add_parser("batch", help="Benchmark several games in parallel")
+    batch.add_argument("games", nargs="*", help="generated_game.py paths (default: output/*/generated_game.py)")
+    batch.add_argument("--frames", type=int, default=DEFAULT_BENCHMARK_FRAMES)
+    batch.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    batch.add_argument("--json", action="store_true", help="Print raw results")
+    worker = sub.add_parser("worker", help=argparse.SUPPRESS)
+    worker.add_argument("--preload", action="append", default=[])
+    for command in (batch, worker):
+        command.add_argument("--cpu-limit", type=int, default=DEFAULT_CPU_LIMIT_S, help="CPU seconds per job")
+        command.add_argument("--memory-limit", type=int, default=DEFAULT_MEMORY_LIMIT_MB, help="Address space MB per job")
+        command.add_argument("--wall-timeout", type=int, default=DEFAULT_WALL_TIMEOUT_S, help="Wall-clock seconds per job")
+    args = parser.parse_args(argv)
+
+    limits = {"cpu_limit_s": args.cpu_limit, "memory_limit_mb": args.memory_limit, "wall_timeout_s": args.wall_timeout}
+    if args.command == "worker":
+        worker_main(limits, args.preload)
+        return 0
+
+    games = args.games or sorted(glob.glob(os.path.join("output", "*", "generated_game.py")))
+    started = time.perf_counter()
+    with SandboxPool(args.workers, **limits) as pool:
+        warm = time.perf_counter() - started
+        results = pool.run_games(games, frames=args.frames)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    for path, result in zip(games, results):
+        fps = f"{result['fps']:.0f} fps" if result.get("fps") else "-"
+        print(f"{os.path.basename(os.path.dirname(path)):<28} {result['status']:<12} {fps:>10}  "
+              f"{result.get('frames', 0):>5} frames  {result.get('sandbox_wall_s', 0):>6.2f}s")
+    print(f"{len(games)} games, pool warm-up {warm:.2f}s, total {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+"""
+Typed loader for ``config/system_config.yaml``.
+
+The YAML is validated into pydantic models once per process and cached. Two
+layers of overrides are merged on top of the base file, in order:
+
+1. Environment overlay: ``config/system_config.<env>.yaml`` when the
+   ``GAME_BUILDER_ENV`` environment variable (or the ``environment`` argument)
+   names one, e.g. ``GAME_BUILDER_ENV=ci`` loads ``system_config.ci.yaml``.
+2. Per-run overrides: a nested dict, usually built from ``--set`` arguments
+   such as ``--set agent_settings.senior_engineer.max_iter=2``.
+"""
+import copy
+import functools
+import os
+from typing import Any, Dict, List, Literal, Optional
+
+import yaml
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+CONFIG_DIR = os.path.join(os.path.dirname(__file__), 'config')
+SYSTEM_CONFIG_PATH = os.path.join(CONFIG_DIR, 'system_config.yaml')
+ENVIRONMENT_VARIABLE = 'GAME_BUILDER_ENV'
+
+# crewAI's own fallback when no model is configured anywhere
+FALLBACK_MODEL = 'gpt-4o-mini'
+
+
+class CrewSettings(BaseModel):
+    """Crew-wide execution and output settings."""
+    model_config = ConfigDict(extra='forbid')
+
+    max_iterations: int = Field(5, ge=1)
+    execution_timeout: int = Field(600, ge=1)
+    memory_enabled: bool = True
+    verbose_logging: bool = True
+    process_type: Literal['sequential', 'hierarchical'] = 'sequential'
+    parallel_execution: bool = False
+    generate_timestamps: bool = True
+    create_backups: bool = True
+    compress_outputs: bool = True
+
+
+class AgentOverride(BaseModel):
+    """Per-agent settings; anything left unset falls back to the global defaults."""
+    model_config = ConfigDict(extra='forbid')
+
+    model: Optional[str] = None
+    max_iter: Optional[int] = Field(None, ge=1)
+    max_execution_time: Optional[int] = Field(None, ge=1)
+    temperature: Optional[float] = Field(None, ge=0.0, le=2.0)
+    enable_delegation: Optional[bool] = None
+    enable_memory: Optional[bool] = None
+
+
+class ResolvedAgentSettings(BaseModel):
+    """Effective settings for one agent after applying defaults."""
+    model: Optional[str]
+    max_iter: int
+    max_execution_time: int
+    temperature: Optional[float]
+    allow_delegation: bool
+    memory: bool
+
+
+class AgentSettings(BaseModel):
+    """Global agent defaults plus per-agent overrides keyed by agent name."""
+    model_config = ConfigDict(extra='forbid')
+
+    default_model: Optional[str] = None
+    default_max_iter: int = Field(3, ge=1)
+    default_max_execution_time: int = Field(180, ge=1)
+    enable_memory: bool = True
+    enable_delegation: bool = False
+    agents: Dict[str, AgentOverride] = Field(default_factory=dict)
+
+    @model_validator(mode='before')
+    @classmethod
+    def collect_agent_overrides(cls, data: Any) -> Any:
+        # In the YAML, per-agent sections sit next to the global defaults
+        if not isinstance(data, dict):
+            return data
+        data = dict(data)
+        agents = dict(data.pop('agents', {}) or {})
+        for key in list(data):
+            if isinstance(data[key], dict):
+                agents[key] = {**(agents.get(key) or {}), **data.pop(key)}
+        data['agents'] = agents
+        return data
+
+    def for_agent(self, agent_name: str) -> ResolvedAgentSettings:
+        """Resolve settings for ``agent_name``; the ``_agent`` suffix used in agents.yaml is optional."""
+        name = agent_name[:-len('_agent')] if agent_name.endswith('_agent') else agent_name
+        override = self.agents.get(name, AgentOverride())
+        return ResolvedAgentSettings(
+            model=override.model or self.default_model,
+            max_iter=override.max_iter or self.default_max_iter,
+            max_execution_time=override.max_execution_time or self.default_max_execution_time,
+            temperature=override.temperature,
+            allow_delegation=self.enable_delegation if override.enable_delegation is None else override.enable_delegation,
+            memory=self.enable_memory if override.enable_memory is None else override.enable_memory,
+        )
+
+
+class ModelPrice(BaseModel):
+    """USD per million tokens."""
+    prompt: float = Field(..., ge=0.0)
+    completion: float = Field(..., ge=0.0)
+
+
+class AgentRoute(BaseModel):
+    """Candidate models for one agent, in order of preference."""
+    model_config = ConfigDict(extra='forbid')
+
+    candidates: List[str] = Field(..., min_length=1)
+    latency_budget_s: Optional[float] = Field(None, gt=0)
+    min_quality: Optional[float] = Field(None, ge=0.0, le=1.0)
+
+
+class ModelRoutingSettings(BaseModel):
+    """Per-agent model routing driven by the build catalog's history."""
+    model_config = ConfigDict(extra='forbid')
+
+    enabled: bool = False
+    # Model the savings report compares against; defaults to the agents' default model
+    baseline_model: Optional[str] = None
+    history_window: int = Field(30, ge=1)
+    min_samples: int = Field(3, ge=1)
+    latency_budget_s: float = Field(240.0, gt=0)
+    min_quality: float = Field(0.8, ge=0.0, le=1.0)
+    pricing: Dict[str, ModelPrice] = Field(default_factory=dict)
+    agents: Dict[str, AgentRoute] = Field(default_factory=dict)
+
+    def route_for(self, agent_name: str) -> Optional[AgentRoute]:
+        name = agent_name[:-len('_agent')] if agent_name.endswith('_agent') else agent_name
+        return self.agents.get(name)
+
+
+class RepairSettings(BaseModel):
+    """Targeted repair of failing generated code (see repair.py)."""
+    model_config = ConfigDict(extra='forbid')
+
+    enabled: bool = True
+    max_attempts: int = Field(3, ge=1)
+    runtime_check_frames: int = Field(120, ge=0)  # 0 skips the headless run
+    context_lines: int = Field(8, ge=0)
+    model: Optional[str] = None  # null uses the senior engineer's model
+    temperature: Optional[float] = Field(0.2, ge=0.0, le=2.0)
+
+
+class ReviewPatchSettings(BaseModel):
+    """Patch-based application of review findings (see patches.py)."""
+    model_config = ConfigDict(extra='forbid')
+
+    enabled: bool = True
+    max_patches: int = Field(10, ge=0)
+    fps_tolerance: float = Field(0.10, ge=0.0, le=1.0)
+
+
+class ModularGenerationSettings(BaseModel):
+    """Parallel per-module code generation for large games (see modular.py)."""
+    model_config = ConfigDict(extra='forbid')
+
+    enabled: bool = False
+    min_classes: int = Field(8, ge=2)  # Smaller architectures are generated in one piece
+    max_modules: int = Field(4, ge=1)
+    max_workers: int = Field(3, ge=1)
+
+
+class SnippetSettings(BaseModel):
+    """Retrieval of components from earlier games for code_task (see snippets.py)."""
+    model_config = ConfigDict(extra='forbid')
+
+    enabled: bool = True
+    max_references: int = Field(4, ge=0)
+    max_reference_chars: int = Field(1500, ge=200)  # Longer snippets are shown as outlines
+    max_snippet_chars: int = Field(6000, ge=200)    # Longer snippets are skipped entirely
+    min_score: float = Field(1.0, ge=0.0)
+
+
+class SandboxSettings(BaseModel):
+    """Pre-warmed worker pool for running generated games (see sandbox.py)."""
+    model_config = ConfigDict(extra='forbid')
+
+    enabled: bool = True
+    workers: int = Field(2, ge=1)
+    cpu_limit_s: int = Field(60, ge=1)
+    memory_limit_mb: int = Field(2048, ge=128)  # Address space per job, pygame and SDL included
+    wall_timeout_s: int = Field(90, ge=1)
+    validation_smoke_frames: int = Field(60, ge=0)  # 0 keeps CodeValidationTool syntax-only
+    optimizer_profile_frames: int = Field(300, ge=0)  # 0 keeps PerformanceOptimizerTool static-only
+
+
+class GamekitSettings(BaseModel):
+    """Runtime modules code_task is told to import instead of re-implementing (see gamekit/)."""
+    model_config = ConfigDict(extra='forbid')
+
+    enabled: bool = True
+    modules: List[str] = Field(default_factory=list)  # Empty offers every module
+
+
+class QualitySettings(BaseModel):
+    model_config = ConfigDict(extra='allow')
+
+    min_code_lines: int = 100
+    max_code_lines: int = 2000
+    target_fps: int = 60
+    max_memory_usage_mb: int = 100
+    startup_time_ms: int = 3000
+
+
+class IntegrationSettings(BaseModel):
+    model_config = ConfigDict(extra='allow')
+
+    run_syntax_check: bool = True
+    run_performance_test: bool = True
+    generate_test_report: bool = True
+
+
+class SystemConfig(BaseModel):
+    """Validated view of system_config.yaml. Sections without behaviour stay loosely typed."""
+    model_config = ConfigDict(extra='allow')
+
+    crew_settings: CrewSettings = Field(default_factory=CrewSettings)
+    agent_settings: AgentSettings = Field(default_factory=AgentSettings)
+    quality_settings: QualitySettings = Field(default_factory=QualitySettings)
+    integration_settings: IntegrationSettings = Field(default_factory=IntegrationSettings)
+    model_routing: ModelRoutingSettings = Field(default_factory=ModelRoutingSettings)
+    repair_settings: RepairSettings = Field(default_factory=RepairSettings)
+    review_patch_settings: ReviewPatchSettings = Field(default_factory=ReviewPatchSettings)
+    modular_generation: ModularGenerationSettings = Field(default_factory=ModularGenerationSettings)
+    snippet_settings: SnippetSettings = Field(default_factory=SnippetSettings)
+    sandbox_settings: SandboxSettings = Field(default_factory=SandboxSettings)
+    gamekit_settings: GamekitSettings = Field(default_factory=GamekitSettings)
+    output_settings: Dict[str, Any] = Field(default_factory=dict)
+    performance_settings: Dict[str, Any] = Field(default_factory=dict)
+    advanced_features: Dict[str, Any] = Field(default_factory=dict)
+
+    def default_model(self) -> str:
+        """Model used when an agent has no explicit one."""
+        return (self.agent_settings.default_model
+                or os.environ.get('MODEL')
+                or os.environ.get('OPENAI_MODEL_NAME')
+                or FALLBACK_MODEL)
+
+
+def deep_merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """Recursively merge ``override`` into a copy of ``base``."""
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def parse_overrides(assignments: List[str]) -> Dict[str, Any]:
+    """Turn ``["a.b.c=1", "x.y=true"]`` into a nested dict, parsing values as YAML scalars."""
+    overrides: Dict[str, Any] = {}
+    for assignment in assignments:
+        if '=' not in assignment:
+            raise ValueError(f"Override '{assignment}' must look like section.key=value")
+        path, raw_value = assignment.split('=', 1)
+        keys = path.strip().split('.')
+        node = overrides
+        for key in keys[:-1]:
+            node = node.setdefault(key, {})
+        node[keys[-1]] = yaml.safe_load(raw_value)
+    return overrides
+
+
+def _read_yaml(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as file:
+        return yaml.safe_load(file) or {}
+
+
+@functools.lru_cache(maxsize=None)
+def _load_raw(environment: Optional[str]) -> Dict[str, Any]:
+    raw = _read_yaml(SYSTEM_CONFIG_PATH)
+    if environment:
+        overlay_path = os.path.join(CONFIG_DIR, f'system_config.{environment}.yaml')
+        if not os.path.exists(overlay_path):
+            raise FileNotFoundError(f"No configuration overlay for environment '{environment}': {overlay_path}")
+        raw = deep_merge(raw, _read_yaml(overlay_path))
+    return raw
+
+
+@functools.lru_cache(maxsize=None)
+def _load_environment(environment: Optional[str]) -> SystemConfig:
+    return SystemConfig.model_validate(_load_raw(environment))
+
+
+def load_system_config(environment: Optional[str] = None,
+                       overrides: Optional[Dict[str, Any]] = None) -> SystemConfig:
+    """Return the validated system config, cached per environment.
+
+    Per-run ``overrides`` are merged on top of the cached config and validated
+    again, so an invalid override fails fast instead of reaching an agent.
+    """
+    environment = environment or os.environ.get(ENVIRONMENT_VARIABLE) or None
+    config = _load_environment(environment)
+    if not overrides:
+        return config
+    return SystemConfig.model_validate(deep_merge(_load_raw(environment), overrides))
+
+
+def clear_config_cache() -> None:
+    """Forget cached configs, e.g. after editing the YAML in a long-running process."""
+    _load_raw.cache_clear()
+    _load_environment.cache_clear()
@@ -0,0 +1,287 @@
+"""
+Index of components from previously generated games.
+
+Every ``output/<game>/generated_game.py`` is split into its top-level classes
+and functions. Each chunk is indexed two ways:
+
+- lexically: identifiers, docstrings and comments are split into terms
+  (``ParticlePool`` -> ``particle``, ``pool``) and ranked with BM25;
+- structurally: kind, base classes, method names and the dotted calls a
+  chunk makes (``pygame.draw.circle``), usable as filters.
+
+``code_task`` receives the best matches for the new game's specification as
+compact references (full source for small chunks, signatures and docstrings
+for large ones), so working particle systems, menus and score boards are
+adapted instead of written from scratch. The senior engineer can query the
+index further with ``ComponentSearchTool``.
+"""
+import argparse
+import ast
+import functools
+import glob
+import math
+import os
+import re
+import sys
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+
+DEFAULT_OUTPUT_ROOT = 'output'
+GAME_FILE = 'generated_game.py'
+
+_WORD = re.compile(r"[A-Za-z][a-z]+|[A-Z]+(?![a-z])|\d+")
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_STOPWORDS = {
+    "self", "the", "and", "for", "with", "from", "import", "return", "def", "class", "none", "true",
+    "false", "not", "in", "is", "if", "else", "elif", "to", "of", "a", "an", "or", "be", "it", "on",
+    "this", "that", "as", "at", "by", "use", "using", "game", "pygame", "create", "should", "must",
+}
+# Structural filters accepted inside a query string, e.g. "particles kind:class method:update"
+_FILTER = re.compile(r"\b(kind|base|method|uses|game):(\S+)")
+
+
+def terms(text: str) -> List[str]:
+    """Lower-case search terms, splitting CamelCase and snake_case identifiers."""
+    found = []
+    for identifier in _IDENTIFIER.findall(text):
+        for word in _WORD.findall(identifier):
+            word = word.lower()
+            if len(word) > 1 and word not in _STOPWORDS:
+                found.append(word)
+    return found
+
+
+def _dotted(node: ast.AST) -> Optional[str]:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        parent = _dotted(node.value)
+        return f"{parent}.{node.attr}" if parent else None
+    return None
+
+
+class Snippet(BaseModel):
+    """One top-level class or function of a generated game."""
+    game: str
+    path: str
+    kind: str  # "class" or "function"
+    name: str
+    start_line: int
+    end_line: int
+    bases: List[str] = []
+    methods: List[str] = []
+    calls: List[str] = []
+    docstring: str = ""
+    source: str
+
+    @property
+    def id(self) -> str:
+        return f"{self.game}:{self.name}"
+
+    def outline(self) -> str:
+        """Signatures and first docstring lines only."""
+        tree = ast.parse(self.source)
+        node = tree.body[0]
+        lines = self.source.splitlines()
+        if isinstance(node, ast.ClassDef):
+            out = [lines[node.lineno - 1]]
+            if self.docstring:
+                out.append(f'    """{self.docstring.splitlines()[0]}"""')
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    out.append(lines[item.lineno - 1])
+                    doc = ast.get_docstring(item)
+                    out.append(f'        """{doc.splitlines()[0]}"""' if doc else "        ...")
+            return "\n".join(out)
+        header = lines[node.lineno - 1]
+        return f'{header}\n    """{self.docstring.splitlines()[0]}"""' if self.docstring else f"{header}\n    ..."
+
+    def reference(self, max_chars: int = 1500) -> str:
+        """Compact reference for a prompt: full source when small, otherwise the outline."""
+        body = self.source if len(self.source) <= max_chars else self.outline()
+        return f"# From {self.game}/{GAME_FILE} (lines {self.start_line}-{self.end_line})\n{body}"
+
+
+def chunk_file(path: str, game: Optional[str] = None) -> List[Snippet]:
+    """Split one generated game into class and function snippets; unparsable files yield none."""
+    with open(path, 'r', encoding='utf-8') as file:
+        code = file.read()
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return []
+    game = game or os.path.basename(os.path.dirname(path))
+    lines = code.splitlines()
+    snippets = []
+    for node in tree.body:
+        if not isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)) or node.name == 'main':
+            continue
+        start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list])
+        calls = sorted({name for name in (_dotted(call.func) for call in ast.walk(node) if isinstance(call, ast.Call))
+                        if name and '.' in name and not name.startswith('self.')})
+        snippets.append(Snippet(
+            game=game,
+            path=path,
+            kind='class' if isinstance(node, ast.ClassDef) else 'function',
+            name=node.name,
+            start_line=start,
+            end_line=node.end_lineno,
+            bases=[name for name in (_dotted(base) for base in getattr(node, 'bases', [])) if name],
+            methods=[item.name for item in getattr(node, 'body', [])
+                     if isinstance(node, ast.ClassDef) and isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))],
+            calls=calls,
+            docstring=ast.get_docstring(node) or "",
+            source="\n".join(lines[start - 1:node.end_lineno]),
+        ))
+    return snippets
+
+
+class SnippetIndex:
+    """BM25 inverted index over snippets, with structural filters."""
+
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self, snippets: Iterable[Snippet]):
+        self.snippets: List[Snippet] = list(snippets)
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.lengths: List[int] = []
+        for index, snippet in enumerate(self.snippets):
+            # Names and docstrings describe what a chunk is; weight them above its body
+            counts = Counter(terms(snippet.source))
+            for term in terms(snippet.name) * 3 + terms(snippet.docstring) * 2:
+                counts[term] += 1
+            self.lengths.append(sum(counts.values()))
+            for term, count in counts.items():
+                self.postings.setdefault(term, []).append((index, count))
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+    @classmethod
+    def from_paths(cls, paths: Iterable[str]) -> 'SnippetIndex':
+        snippets: List[Snippet] = []
+        for path in paths:
+            snippets.extend(chunk_file(path))
+        return cls(snippets)
+
+    def _matches(self, snippet: Snippet, filters: Dict[str, List[str]]) -> bool:
+        checks = {
+            'kind': lambda value: snippet.kind == value,
+            'base': lambda value: value in snippet.bases,
+            'method': lambda value: value in snippet.methods,
+            'uses': lambda value: any(call == value or call.endswith('.' + value) for call in snippet.calls),
+            'game': lambda value: value.lower() in snippet.game.lower(),
+        }
+        return all(checks[key](value) for key, values in filters.items() for value in values)
+
+    def search(self, query: str, limit: int = 5, exclude_games: Iterable[str] = (),
+               **filters: Any) -> List[Tuple[float, Snippet]]:
+        """Best ``(score, snippet)`` pairs for ``query``.
+
+        Filters come as keyword arguments (``kind='class'``, ``method='update'``)
+        or inline in the query (``"particles kind:class uses:pygame.draw.circle"``).
+        One snippet per name is returned, the best-scoring one.
+        """
+        merged: Dict[str, List[str]] = {key: [value] for key, value in filters.items() if value}
+        for key, value in _FILTER.findall(query):
+            merged.setdefault(key, []).append(value)
+        query_terms = terms(_FILTER.sub(" ", query))
+        excluded = set(exclude_games)
+
+        scores: Dict[int, float] = {}
+        total = len(self.snippets)
+        for term in set(query_terms):
+            postings = self.postings.get(term, [])
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for index, count in postings:
+                norm = self.K1 * (1 - self.B + self.B * self.lengths[index] / self.average_length)
+                scores[index] = scores.get(index, 0.0) + idf * count * (self.K1 + 1) / (count + norm)
+        if not query_terms:
+            # A purely structural query: every snippet is a candidate
+            scores = {index: 0.0 for index in range(total)}
+
+        results: List[Tuple[float, Snippet]] = []
+        seen_names = set()
+        for index in sorted(scores, key=lambda index: -scores[index]):
+            snippet = self.snippets[index]
+            if snippet.game in excluded or snippet.name in seen_names or not self._matches(snippet, merged):
+                continue
+            seen_names.add(snippet.name)
+            results.append((round(scores[index], 3), snippet))
+            if len(results) >= limit:
+                break
+        return results
+
+
+def _game_files(output_root: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(output_root, '*', GAME_FILE)))
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_index(files: Tuple[Tuple[str, float], ...]) -> SnippetIndex:
+    return SnippetIndex.from_paths(path for path, _ in files)
+
+
+def load_index(output_root: str = DEFAULT_OUTPUT_ROOT) -> SnippetIndex:
+    """Index of every generated game under ``output_root``, rebuilt only when a file changed."""
+    files = tuple((path, os.path.getmtime(path)) for path in _game_files(output_root))
+    return _cached_index(files)
+
+
+def spec_query(game: Any) -> str:
+    """Search text for a gamedesign.yaml entry: its name, type, description and requirements."""
+    if not isinstance(game, dict):
+        return str(game)
+    parts = [game.get('name', ''), game.get('type', ''), game.get('description', '')]
+    parts.extend(game.get('requirements', []) or [])
+    return "\n".join(str(part) for part in parts)
+
+
+def component_references(game: Any, output_root: str = DEFAULT_OUTPUT_ROOT, limit: int = 4,
+                         max_chars: int = 1500, max_snippet_chars: int = 6000, min_score: float = 1.0,
+                         exclude_games: Iterable[str] = ()) -> str:
+    """Prompt block with the past components that best match a game specification.
+
+    Snippets longer than ``max_snippet_chars`` are skipped: they are whole-game
+    orchestrators, which are the least reusable part of another game.
+    """
+    results = load_index(output_root).search(spec_query(game), limit=limit * 4, exclude_games=exclude_games)
+    references = [snippet.reference(max_chars) for score, snippet in results
+                  if score >= min_score and len(snippet.source) <= max_snippet_chars][:limit]
+    if not references:
+        return "No matching components from earlier games."
+    return "\n\n".join(references)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line interface: search the component index."""
+    parser = argparse.ArgumentParser(prog="snippets", description="Search components of previously generated games.")
+    parser.add_argument("--root", default=DEFAULT_OUTPUT_ROOT, help="Folder holding the generated games")
+    sub = parser.add_subparsers(dest="command", required=True)
+    search = sub.add_parser("search", help="Lexical search with optional kind:/base:/method:/uses:/game: filters")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=5)
+    search.add_argument("--source", action="store_true", help="Print the matching references, not just their names")
+    sub.add_parser("stats", help="Indexed games and snippets")
+    args = parser.parse_args(argv)
+
+    index = load_index(args.root)
+    if args.command == "search":
+        for score, snippet in index.search(args.query, limit=args.limit):
+            print(f"{score:>7.2f}  {snippet.kind:<8} {snippet.id:<40} lines {snippet.start_line}-{snippet.end_line}")
+            if args.source:
+                print(snippet.reference() + "\n")
+    elif args.command == "stats":
+        games = Counter(snippet.game for snippet in index.snippets)
+        for game, count in sorted(games.items()):
+            print(f"{game:<30} {count:>4} snippets")
+        print(f"{'total':<30} {len(index.snippets):>4} snippets, {len(index.postings)} terms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Architecture template library for ``GameArchitectureTool``.
+
+Templates live in ``config/architecture_templates.yaml``, a versioned data file
+with one entry per game type plus feature fragments (particles, AI, menus...)
+that are merged in when the requested features mention them. The file is
+compiled once per process, and recompiled only when it changes on disk, into
+in-memory indexes:
+
+- normalized alias -> template, so "Pac-Man Clone", "pacman" and "maze chase"
+  all resolve to the same template with a dictionary lookup per word n-gram;
+- tag -> templates, for browsing by what a game is (grid, physics, board...);
+- keyword -> feature tag, for mapping free-form feature text to fragments.
+
+Recommendations are memoized per ``(game_type, features)``; repeated lookups
+are a dictionary hit.
+"""
+import functools
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+from pydantic import BaseModel, ConfigDict, Field
+
+from .settings import CONFIG_DIR
+
+
+TEMPLATES_PATH = os.path.join(CONFIG_DIR, 'architecture_templates.yaml')
+# Longest alias, in words, tried when matching inside a longer game type
+MAX_ALIAS_WORDS = 4
+
+BASE_PERFORMANCE_TIPS = [
+    "Use sprite groups for efficient collision detection",
+    "Implement object pooling for frequently created/destroyed objects",
+    "Use dirty rectangle updates for better performance",
+    "Implement frame rate limiting and delta time calculations",
+]
+
+CODE_ORGANIZATION = {
+    "structure": "Separate classes into individual files for larger games",
+    "constants": "Define game constants at the top of the file",
+    "main_loop": "Keep the main game loop clean and delegate to methods",
+}
+
+_NON_WORD = re.compile(r"[^a-z0-9&]+")
+
+
+def normalize(text: str) -> str:
+    """Lower-case words separated by single spaces; punctuation and hyphens become spaces."""
+    return _NON_WORD.sub(" ", str(text).lower()).strip()
+
+
+class ArchitectureTemplate(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
+    aliases: List[str] = Field(default_factory=list)
+    tags: List[str] = Field(default_factory=list)
+    classes: List[str]
+    patterns: List[str] = Field(default_factory=list)
+    components: List[str] = Field(default_factory=list)
+    tips: List[str] = Field(default_factory=list)
+
+
+class FeatureTemplate(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
+    keywords: List[str]
+    classes: List[str] = Field(default_factory=list)
+    components: List[str] = Field(default_factory=list)
+    tips: List[str] = Field(default_factory=list)
+
+
+class TemplateFile(BaseModel):
+    """Schema of architecture_templates.yaml."""
+    model_config = ConfigDict(extra='forbid')
+
+    version: int
+    generic: ArchitectureTemplate
+    templates: Dict[str, ArchitectureTemplate]
+    features: Dict[str, FeatureTemplate] = Field(default_factory=dict)
+
+
+def _merge_unique(*lists: Iterable[str]) -> List[str]:
+    merged: List[str] = []
+    for items in lists:
+        for item in items:
+            if item not in merged:
+                merged.append(item)
+    return merged
+
+
+class TemplateLibrary:
+    """Indexed, memoizing view of a template file."""
+
+    def __init__(self, data: TemplateFile):
+        self.version = data.version
+        self.generic = data.generic
+        self.templates = data.templates
+        self.features = data.features
+
+        self.by_alias: Dict[str, str] = {}
+        self.by_tag: Dict[str, List[str]] = {}
+        for name, template in self.templates.items():
+            for alias in [name] + template.aliases:
+                self.by_alias[normalize(alias)] = name
+            for tag in template.tags:
+                self.by_tag.setdefault(tag, []).append(name)
+        self.by_keyword: Dict[str, str] = {}
+        for tag, feature in self.features.items():
+            for keyword in feature.keywords:
+                self.by_keyword[normalize(keyword)] = tag
+        self._memo: Dict[Tuple[str, Tuple[str, ...]], Dict[str, Any]] = {}
+
+    def resolve_type(self, game_type: str) -> Optional[str]:
+        """Template name for ``game_type``: an exact alias, else the longest alias among its words."""
+        key = normalize(game_type)
+        if key in self.by_alias:
+            return self.by_alias[key]
+        words = key.split()
+        for size in range(min(MAX_ALIAS_WORDS, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                name = self.by_alias.get(" ".join(words[start:start + size]))
+                if name:
+                    return name
+        return None
+
+    def feature_tags(self, features: Iterable[Any]) -> List[str]:
+        """Feature fragments whose keywords appear in the free-form feature descriptions."""
+        tags = set()
+        for feature in features or []:
+            words = normalize(feature).split()
+            for word in words:
+                tag = self.by_keyword.get(word)
+                if tag:
+                    tags.add(tag)
+            for first, second in zip(words, words[1:]):
+                tag = self.by_keyword.get(f"{first} {second}")
+                if tag:
+                    tags.add(tag)
+        return sorted(tags)
+
+    def recommend(self, game_type: str, features: Iterable[Any]) -> Dict[str, Any]:
+        """Architecture recommendation for a game type and feature list; memoized, treat as read-only."""
+        features = [str(feature) for feature in features or []]
+        key = (normalize(game_type), tuple(sorted(normalize(feature) for feature in features)))
+        cached = self._memo.get(key)
+        if cached is not None:
+            return cached
+
+        name = self.resolve_type(game_type)
+        template = self.templates[name] if name else self.generic
+        tags = self.feature_tags(features)
+        fragments = [self.features[tag] for tag in tags]
+        recommendation = {
+            "template": name or "generic",
+            "template_version": self.version,
+            "architecture": {
+                "classes": _merge_unique(template.classes, *(fragment.classes for fragment in fragments)),
+                "patterns": list(template.patterns),
+                "components": _merge_unique(template.components, *(fragment.components for fragment in fragments)),
+            },
+            "game_tags": list(template.tags),
+            "feature_tags": tags,
+            "recommended_features": features,
+            "performance_tips": _merge_unique(template.tips, *(fragment.tips for fragment in fragments),
+                                              BASE_PERFORMANCE_TIPS),
+            "code_organization": CODE_ORGANIZATION,
+        }
+        self._memo[key] = recommendation
+        return recommendation
+
+    def templates_tagged(self, tag: str) -> List[str]:
+        return list(self.by_tag.get(tag, []))
+
+
+@functools.lru_cache(maxsize=4)
+def _compile(path: str, mtime: float) -> TemplateLibrary:
+    with open(path, 'r', encoding='utf-8') as file:
+        return TemplateLibrary(TemplateFile.model_validate(yaml.safe_load(file) or {}))
+
+
+def load_template_library(path: str = TEMPLATES_PATH) -> TemplateLibrary:
+    """Compiled library for ``path``, rebuilt only when the file changes."""
+    return _compile(path, os.path.getmtime(path))
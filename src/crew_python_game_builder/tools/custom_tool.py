@@ -6,6 +6,12 @@ import os
 import ast
 import subprocess
 import sys
+import tempfile
+
+from ..snippets import DEFAULT_OUTPUT_ROOT, load_index
+from ..templates import load_template_library
+from ..sandbox import shared_pool
+from ..hotspots import PROFILE_HANDLER
 
 
 class CodeValidationInput(BaseModel):
@@ -19,6 +25,8 @@ class CodeValidationTool(BaseTool):
         "Returns detailed validation results with specific error locations and suggestions."
     )
     args_schema: Type[BaseModel] = CodeValidationInput
+    # Frames to run in the shared sandbox pool after a clean parse; 0 (or no pool) skips it
+    smoke_frames: int = 0
 
     def _run(self, code: str) -> str:
         """Validate Python code for syntax and basic issues."""
@@ -55,6 +63,10 @@ class CodeValidationTool(BaseTool):
             # Check for game loop
             if "while" not in code.lower():
                 validation_results["warnings"].append("No game loop detected")
+
+            pool = shared_pool() if self.smoke_frames else None
+            if pool is not None:
+                self._smoke_run(pool, code, validation_results)
                 
         except SyntaxError as e:
             validation_results["errors"].append(f"Syntax Error at line {e.lineno}: {e.msg}")
@@ -63,10 +75,22 @@ class CodeValidationTool(BaseTool):
         
         return json.dumps(validation_results, indent=2)
 
+    def _smoke_run(self, pool, code: str, validation_results: Dict[str, Any]) -> None:
+        """Run the code headless for a few frames in a pre-warmed sandbox worker."""
+        with tempfile.TemporaryDirectory() as folder:
+            game_path = os.path.join(folder, "generated_game.py")
+            with open(game_path, "w", encoding="utf-8") as file:
+                file.write(code)
+            result = pool.run_game(game_path, frames=self.smoke_frames)
+        validation_results["runtime"] = {key: result.get(key) for key in ("status", "frames", "fps", "error")}
+        if result.get("status") not in ("completed", "returned", "exited"):
+            validation_results["errors"].append(
+                f"Runtime Error after {result.get('frames', 0)} frames: {result.get('error')}")
+
 
 class GameArchitectureInput(BaseModel):
     """Input schema for Game Architecture Tool."""
-    game_type: str = Field(..., description="Type of game to generate architecture for (e.g., 'snake', 'pong', 'tetris').")
+    game_type: str = Field(..., description="Type of game to generate architecture for (e.g., 'snake', 'pac-man', 'carrom', 'gilli danda').")
     features: list = Field(..., description="List of required game features.")
 
 class GameArchitectureTool(BaseTool):
@@ -78,63 +102,55 @@ class GameArchitectureTool(BaseTool):
     args_schema: Type[BaseModel] = GameArchitectureInput
 
     def _run(self, game_type: str, features: list) -> str:
-        """Generate game architecture recommendations."""
-        architectures = {
-            "snake": {
-                "classes": ["Game", "Snake", "Food", "GameBoard", "ScoreManager", "InputHandler"],
-                "patterns": ["State Machine", "Observer Pattern"],
-                "components": ["Game Loop", "Collision Detection", "Rendering System", "Input System"]
-            },
-            "pong": {
-                "classes": ["Game", "Paddle", "Ball", "ScoreBoard", "GameState", "PhysicsEngine"],
-                "patterns": ["Component System", "State Machine"],
-                "components": ["Physics System", "Collision System", "AI System", "Rendering System"]
-            },
-            "tetris": {
-                "classes": ["Game", "Tetromino", "GameBoard", "ScoreManager", "PieceGenerator", "LineClearing"],
-                "patterns": ["Factory Pattern", "State Machine", "Command Pattern"],
-                "components": ["Piece System", "Grid System", "Rotation Logic", "Line Clear System"]
-            }
-        }
-        
-        arch = architectures.get(game_type.lower(), {
-            "classes": ["Game", "Player", "GameState", "Renderer", "InputHandler"],
-            "patterns": ["State Machine", "Component System"],
-            "components": ["Game Loop", "Rendering System", "Input System", "Update System"]
-        })
-        
-        recommendations = {
-            "architecture": arch,
-            "recommended_features": features,
-            "performance_tips": [
-                "Use sprite groups for efficient collision detection",
-                "Implement object pooling for frequently created/destroyed objects",
-                "Use dirty rectangle updates for better performance",
-                "Implement frame rate limiting and delta time calculations"
-            ],
-            "code_organization": {
-                "structure": "Separate classes into individual files for larger games",
-                "constants": "Define game constants at the top of the file",
-                "main_loop": "Keep the main game loop clean and delegate to methods"
-            }
-        }
-        
-        return json.dumps(recommendations, indent=2)
+        """Generate game architecture recommendations from the template library."""
+        return json.dumps(load_template_library().recommend(game_type, features), indent=2)
+
+
+class ComponentSearchInput(BaseModel):
+    """Input schema for Component Search Tool."""
+    query: str = Field(..., description=(
+        "What to look for, e.g. 'particle pool' or 'score board'. Optional filters: "
+        "kind:class, kind:function, base:<Base>, method:<name>, uses:<call such as pygame.draw.circle>, game:<folder>."
+    ))
+    limit: int = Field(3, description="Maximum number of components to return.")
+
+class ComponentSearchTool(BaseTool):
+    name: str = "Component Library Search"
+    description: str = (
+        "Searches the classes and functions of previously generated games for components that can be adapted, "
+        "such as particle systems, menus, score boards and physics engines. Returns compact source references."
+    )
+    args_schema: Type[BaseModel] = ComponentSearchInput
+    output_root: str = DEFAULT_OUTPUT_ROOT
+
+    def _run(self, query: str, limit: int = 3) -> str:
+        """Return the best matching components as source references."""
+        results = load_index(self.output_root).search(query, limit=limit)
+        if not results:
+            return "No matching components found."
+        return "\n\n".join(snippet.reference() for _, snippet in results)
 
 
 class PerformanceOptimizerInput(BaseModel):
     """Input schema for Performance Optimizer Tool."""
     code: str = Field(..., description="Python game code to analyze for performance optimization opportunities.")
+    profile: bool = Field(False, description=(
+        "Also run the code headless under a profiler and report measured hotspots: functions and library calls "
+        "by share of frame time, the hottest source lines, and surfaces or fonts constructed every frame. Slower."
+    ))
 
 class PerformanceOptimizerTool(BaseTool):
     name: str = "Game Performance Optimizer"
     description: str = (
         "Analyzes game code for performance bottlenecks and provides specific optimization recommendations. "
-        "Identifies inefficient patterns and suggests pygame-specific optimizations."
+        "Identifies inefficient patterns and suggests pygame-specific optimizations. "
+        "With profile=true it also measures where frame time actually goes."
     )
     args_schema: Type[BaseModel] = PerformanceOptimizerInput
+    # Frames to profile in the shared sandbox pool when asked to; 0 (or no pool) keeps the tool static-only
+    profile_frames: int = 0
 
-    def _run(self, code: str) -> str:
+    def _run(self, code: str, profile: bool = False) -> str:
         """Analyze code for performance optimization opportunities."""
         optimizations = {
             "performance_issues": [],
@@ -148,8 +164,11 @@ class PerformanceOptimizerTool(BaseTool):
             optimizations["performance_issues"].append("Multiple image loads detected - consider preloading")
             optimizations["optimizations"].append("Implement asset manager for preloading images")
         
-        if "pygame.font.Font" in code and code.count("pygame.font.Font") > 1:
+        if code.count("pygame.font.Font(") + code.count("pygame.font.SysFont(") > 1:
             optimizations["performance_issues"].append("Multiple font objects - consider reusing font instances")
+            optimizations["optimizations"].append(
+                "Load fonts once with gamekit.text.get_font and draw labels with render_text/blit_text, "
+                "which re-render only when the text changes")
         
         if ".fill(" in code and "pygame.display.flip()" in code:
             optimizations["pygame_specific"].append("Consider using pygame.display.update() with dirty rectangles instead of flip()")
@@ -167,5 +186,23 @@ class PerformanceOptimizerTool(BaseTool):
             "Use pygame.Surface.convert() for faster blitting",
             "Consider using pygame.Surface.convert_alpha() for images with transparency"
         ])
-        
+
+        if profile:
+            self._profile(code, optimizations)
+
         return json.dumps(optimizations, indent=2)
+
+    def _profile(self, code: str, optimizations: Dict[str, Any]) -> None:
+        """Profile the code headless in a sandbox worker and add the measured hotspots."""
+        pool = shared_pool() if self.profile_frames else None
+        if pool is None:
+            optimizations["runtime_profile"] = {"status": "unavailable",
+                                                "error": "Runtime profiling is disabled or the sandbox pool is not running"}
+            return
+        with tempfile.TemporaryDirectory() as folder:
+            game_path = os.path.join(folder, "generated_game.py")
+            with open(game_path, "w", encoding="utf-8") as file:
+                file.write(code)
+            report = pool.submit(PROFILE_HANDLER, game_path=game_path, frames=self.profile_frames).result()
+        optimizations["runtime_profile"] = report
+        optimizations["performance_issues"].extend(report.get("hotspots", []))
@@ -0,0 +1,157 @@
+"""
+Copy the game kit into published games so they run on their own.
+
+Generated code imports ``crew_python_game_builder.gamekit``, which is only
+importable where this package is installed. Published games must run with
+a plain ``python generated_game.py`` (plus pygame and NumPy). So at publish
+time ``vendor_gamekit``:
+
+- finds the kit modules the game imports, plus the kit modules those import
+  (``particles`` pulls in ``glow``);
+- copies them into ``<game_dir>/gamekit/`` next to the game, with a short
+  ``__init__.py``, and deletes copies the game no longer needs;
+- rewrites the game's kit imports to the local package, changing only the
+  module path: ``from crew_python_game_builder.gamekit.text import get_font``
+  becomes ``from gamekit.text import get_font``.
+
+Running it again on a game that is already vendored refreshes the copies
+from the installed kit and changes nothing else.
+"""
+import argparse
+import ast
+import os
+import shutil
+import sys
+from typing import List, Optional, Set
+
+from .artifacts import atomic_write
+
+
+KIT_PACKAGE = "crew_python_game_builder.gamekit"
+LOCAL_PACKAGE = "gamekit"
+GAME_FILE = "generated_game.py"
+KIT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gamekit")
+
+_LOCAL_INIT = (
+    '"""\n'
+    "Game kit modules this game imports, copied from crew_python_game_builder.gamekit\n"
+    "when it was published. Regenerate with ``python -m crew_python_game_builder.vendoring``.\n"
+    '"""\n'
+)
+
+
+def kit_modules() -> Set[str]:
+    """Names of the modules in the installed game kit."""
+    return {name[:-3] for name in os.listdir(KIT_DIR) if name.endswith(".py") and name != "__init__.py"}
+
+
+def _kit_module(module: Optional[str]) -> Optional[str]:
+    """'particles' for 'crew_python_game_builder.gamekit.particles' or 'gamekit.particles', '' for the package."""
+    for package in (KIT_PACKAGE, LOCAL_PACKAGE):
+        if module == package:
+            return ""
+        if module and module.startswith(package + "."):
+            return module[len(package) + 1:]
+    return None
+
+
+def imported_modules(tree: ast.AST) -> Set[str]:
+    """Kit modules a game imports, whichever package path it uses."""
+    available = kit_modules()
+    found: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.level == 0:
+            name = _kit_module(node.module)
+            if name == "":
+                # from crew_python_game_builder.gamekit import particles
+                found.update(alias.name for alias in node.names if alias.name in available)
+            elif name:
+                found.add(name.split(".")[0])
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                name = _kit_module(alias.name)
+                if name:
+                    found.add(name.split(".")[0])
+    return found & available
+
+
+def with_dependencies(modules: Set[str]) -> Set[str]:
+    """``modules`` plus every kit module they import relatively, transitively."""
+    needed: Set[str] = set()
+    pending = list(modules)
+    while pending:
+        name = pending.pop()
+        if name in needed:
+            continue
+        needed.add(name)
+        with open(os.path.join(KIT_DIR, f"{name}.py"), "r", encoding="utf-8") as file:
+            tree = ast.parse(file.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and node.level == 1:
+                if node.module:
+                    pending.append(node.module.split(".")[0])
+                else:
+                    pending.extend(alias.name for alias in node.names)
+    return needed
+
+
+def localize_imports(source: str) -> str:
+    """Point the game's kit imports at the local ``gamekit`` package."""
+    lines = source.splitlines(keepends=True)
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            names = [node.module] if isinstance(node, ast.ImportFrom) else [alias.name for alias in node.names]
+            if not any(name == KIT_PACKAGE or (name or "").startswith(KIT_PACKAGE + ".") for name in names):
+                continue
+            for line in range(node.lineno - 1, (node.end_lineno or node.lineno)):
+                lines[line] = lines[line].replace(KIT_PACKAGE, LOCAL_PACKAGE)
+    return "".join(lines)
+
+
+def vendor_gamekit(game_dir: str, game_file: str = GAME_FILE) -> List[str]:
+    """Copy the kit modules the game in ``game_dir`` needs and localize its imports.
+
+    Returns the vendored module names; a game that uses no kit module is left
+    untouched (and loses a stale ``gamekit/`` copy, if it had one).
+    """
+    game_path = os.path.join(game_dir, game_file)
+    local_dir = os.path.join(game_dir, LOCAL_PACKAGE)
+    with open(game_path, "r", encoding="utf-8") as file:
+        source = file.read()
+    try:
+        modules = sorted(with_dependencies(imported_modules(ast.parse(source))))
+    except SyntaxError:
+        return []
+    if not modules:
+        if os.path.isdir(local_dir):
+            shutil.rmtree(local_dir)
+        return []
+
+    for name in modules:
+        with open(os.path.join(KIT_DIR, f"{name}.py"), "rb") as file:
+            atomic_write(os.path.join(local_dir, f"{name}.py"), file.read())
+    atomic_write(os.path.join(local_dir, "__init__.py"), _LOCAL_INIT.encode("utf-8"))
+    for name in os.listdir(local_dir):
+        path = os.path.join(local_dir, name)
+        if name == "__pycache__" or (name.endswith(".py") and name != "__init__.py" and name[:-3] not in modules):
+            shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+
+    localized = localize_imports(source)
+    if localized != source:
+        atomic_write(game_path, localized.encode("utf-8"))
+    return modules
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line interface: vendor the game kit into published game folders."""
+    parser = argparse.ArgumentParser(prog="vendoring", description="Copy the game kit into published games.")
+    parser.add_argument("game_dirs", nargs="+", help="Folders holding a generated_game.py")
+    args = parser.parse_args(argv)
+    for game_dir in args.game_dirs:
+        modules = vendor_gamekit(game_dir)
+        print(f"{game_dir}: {', '.join(modules) if modules else 'no game kit modules'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())